@@ -0,0 +1,141 @@
+"""
+JSON parsing backends on a synthetic players dataset.
+
+    python -m benchmarks.bench_json [--files 400] [--players 20] [--repeat 3]
+
+Compares, over the same raw player pages:
+  - parse only: stdlib json / orjson / simdjson (whichever are installed)
+  - parse + player_columns (what a transform worker does per file)
+  - DuckDB read_json → Arrow fact_player_season columns (no Python dicts)
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import tempfile
+import time
+from benchmarks.synthetic import synthetic_page
+from src.extract import utils_json
+from src.transform.transform_players import player_columns
+
+# fact_player_season columns straight from the JSON with DuckDB
+DUCKDB_PLAYER_QUERY = """
+    WITH items AS (
+        SELECT unnest(response) AS item FROM {raw}
+    ),
+    stats AS (
+        SELECT item.player.id AS player_id, unnest(item.statistics) AS s FROM items
+    )
+    SELECT
+        player_id,
+        s.team.id AS team_id,
+        s.league.id AS league_id,
+        s.league.season AS season_year,
+        s.games.position AS position,
+        s.games.appearences AS appearances,
+        s.games.minutes AS minutes,
+        s.games.rating AS rating,
+        s.goals.total AS goals,
+        s.goals.assists AS assists,
+        s.cards.yellow AS yellow_cards,
+        s.cards.red AS red_cards
+    FROM stats
+"""
+
+
+# -------------------------
+# SYNTHETIC DATA
+# -------------------------
+def write_dataset(root, files, players, seed=0):
+    """Pretty-printed pages (like JsonRawStore writes them); returns (paths, total bytes)."""
+    rng = random.Random(seed)
+    paths = []
+    for n in range(files):
+        team_id, page = 500 + n // 3, n % 3 + 1
+        path = os.path.join(root, f"la_liga_2023_team_{team_id}_page_{page}.json")
+        with open(path, "w") as f:
+            json.dump(synthetic_page(rng, page, players, team_id), f, indent=2)
+        paths.append(path)
+    return paths, sum(os.path.getsize(p) for p in paths)
+
+
+# -------------------------
+# CASES
+# -------------------------
+def available_parsers():
+    parsers = []
+    for name in utils_json.PARSERS:
+        try:
+            utils_json.set_json_backend(name)
+            parsers.append(name)
+        except ImportError:
+            pass
+    return parsers
+
+
+def parse_only(paths, blobs):
+    for raw in blobs:
+        utils_json.loads(raw)
+    return len(blobs)
+
+
+def parse_and_columns(paths, blobs):
+    rows = 0
+    entry = {"team_id": 0, "season": 2023}
+    for raw in blobs:
+        rows += len(player_columns(entry, utils_json.loads(raw))["fact_player_season"]["player_id"])
+    return rows
+
+
+def duckdb_columns(paths, blobs):
+    return utils_json.read_json_arrow(paths, DUCKDB_PLAYER_QUERY).num_rows
+
+
+def best_of(fn, paths, blobs, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(paths, blobs)
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+
+def run_benchmark(files=400, players=20, repeat=3):
+    root = tempfile.mkdtemp(prefix="bench_json_")
+    try:
+        paths, total_bytes = write_dataset(root, files, players)
+        blobs = []
+        for path in paths:
+            with open(path, "rb") as f:
+                blobs.append(f.read())
+
+        print(f"Synthetic players: {files} files, {files * players} players, {total_bytes / 1e6:.1f} MB "
+              f"(best of {repeat})\n")
+        print(f"{'case':<34}{'seconds':>10}{'MB/s':>10}{'result':>10}")
+
+        results = {}
+        for parser in available_parsers():
+            utils_json.set_json_backend(parser)
+            for label, fn in [("parse", parse_only), ("parse + player_columns", parse_and_columns)]:
+                seconds, result = best_of(fn, paths, blobs, repeat)
+                results[f"{parser}: {label}"] = seconds
+                print(f"{parser + ': ' + label:<34}{seconds:>10.3f}{total_bytes / 1e6 / seconds:>10.1f}{result:>10}")
+
+        seconds, result = best_of(duckdb_columns, paths, blobs, repeat)
+        results["duckdb read_json → arrow"] = seconds
+        print(f"{'duckdb read_json → arrow':<34}{seconds:>10.3f}{total_bytes / 1e6 / seconds:>10.1f}{result:>10}")
+        return results
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+        utils_json.set_json_backend(utils_json.load_json_settings())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark JSON parsing backends on synthetic player pages")
+    parser.add_argument("--files", type=int, default=400, help="Raw player pages to generate")
+    parser.add_argument("--players", type=int, default=20, help="Players per page")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per case (best is reported)")
+    args = parser.parse_args()
+
+    run_benchmark(files=args.files, players=args.players, repeat=args.repeat)
@@ -0,0 +1,274 @@
+"""
+Transform / load / dashboard benchmark on a synthetic raw tree.
+
+    python -m benchmarks.bench_pipeline [--leagues 10] [--seasons 3] [--teams 20] [--pages 3]
+        [--players 20] [--backend json] [--engine pandas] [--workers N] [--repeat 3]
+        [--cases transform.players,load.full] [--workdir DIR] [--compare]
+
+Cases, in pipeline order (each repetition runs in a fresh process, the
+fastest one is reported):
+  - transform.<step>: run_transform_pipeline(only=step, engine=...)
+  - load.full: run_load_pipeline(full=True) into an empty snapshot
+  - load.incremental: run_load_pipeline() with nothing changed
+  - dashboard: the Streamlit queries (all leagues, all seasons) on the
+    promoted snapshot, uncached
+
+Per case: wall / CPU seconds (worker processes included), peak RSS of
+the process and its workers, rows produced, rows/s and input MB/s.
+
+Every run appends one JSON line to --output with the commit, library
+versions and parameters; the generator is seeded, so runs with the same
+parameters on different commits are directly comparable (--compare
+prints the ratio to the last such run).
+"""
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+import duckdb
+import pandas
+import pyarrow
+from benchmarks.synthetic import build_workspace
+from src.extract.manifest import get_manifest
+from src.load.load_dimensions import DIMENSIONS
+from src.load.load_facts import FACTS
+from src.load.load_marts import MARTS
+from src.load.pipeline_load import run_load_pipeline
+from src.load.utils_db import get_cursor, parquet_scan
+from src.transform.engine_streaming import TRANSFORMS
+from src.transform.pipeline_transform import STEPS, run_transform_pipeline
+from src.transform.utils_parquet import clean_table_path
+from streamlit_app.queries import LEAGUE_SEASON_STATS_SQL, LEAGUES_SQL, SEASONS_SQL
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+OUTPUT_PATH = "data/metrics/bench_pipeline.jsonl"
+
+CASES = [f"transform.{step}" for step in STEPS] + ["load.full", "load.incremental", "dashboard"]
+
+
+# -------------------------
+# CASES (run inside the workspace, in a child process)
+# -------------------------
+# Modules are imported above, so import time is not part of any case; they
+# only resolve config/ and data/ when called, i.e. inside the workspace
+def raw_bytes(endpoint: str) -> int:
+    return sum(entry["bytes"] or 0 for entry in get_manifest().entries(endpoint))
+
+
+def clean_rows(table: str) -> int:
+    return duckdb.sql(f"SELECT count(*) FROM {parquet_scan(clean_table_path(table))}").fetchone()[0]
+
+
+def tree_bytes(path: str) -> int:
+    return sum(os.path.getsize(os.path.join(d, f)) for d, _, files in os.walk(path) for f in files)
+
+
+def transform_case(step: str, engine: str, workers: int | None) -> dict:
+    run_transform_pipeline(only=step, engine=engine, workers=workers, full=True)
+
+    endpoint, _, tables = TRANSFORMS[step]
+    return {"rows": sum(clean_rows(table) for table in tables), "input_bytes": raw_bytes(endpoint)}
+
+
+def load_case(full: bool) -> dict:
+    run_load_pipeline(full=full)
+
+    cursor = get_cursor()
+    try:
+        rows = sum(cursor.execute(f"SELECT count(*) FROM {table}").fetchone()[0]
+                   for table in [*DIMENSIONS, *FACTS, *MARTS])
+    finally:
+        cursor.close()
+    return {"rows": rows, "input_bytes": tree_bytes("data/clean")}
+
+
+def dashboard_case(repeat: int) -> dict:
+    """Best-of-`repeat` latency of each dashboard query, with the filters selecting everything."""
+    cursor = get_cursor()
+    try:
+        league_ids = [r[0] for r in cursor.execute("SELECT league_id FROM dim_league").fetchall()]
+        seasons = [r[0] for r in cursor.execute("SELECT DISTINCT season_year FROM mart_league_season").fetchall()]
+        queries = {
+            "leagues": (LEAGUES_SQL, {}),
+            "seasons": (SEASONS_SQL, {"league_ids": league_ids}),
+            "league_season_stats": (LEAGUE_SEASON_STATS_SQL, {"league_ids": league_ids, "seasons": seasons}),
+        }
+
+        latencies, rows = {}, 0
+        for name, (sql, params) in queries.items():
+            cursor.execute(sql, params).df()  # warm-up: first query on the snapshot loads its catalog
+            times = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                df = cursor.execute(sql, params).df()
+                times.append(time.perf_counter() - start)
+            latencies[f"{name}_ms"] = round(min(times) * 1000, 2)
+            rows += len(df)
+    finally:
+        cursor.close()
+    return {"rows": rows, **latencies}
+
+
+def run_case(root: str, case: str, engine: str, workers: int | None, repeat: int) -> dict:
+    """Run one case in `root` and measure it (this process + its worker processes)."""
+    os.chdir(root)
+
+    def usage():
+        own = resource.getrusage(resource.RUSAGE_SELF)
+        children = resource.getrusage(resource.RUSAGE_CHILDREN)
+        cpu = own.ru_utime + own.ru_stime + children.ru_utime + children.ru_stime
+        return time.perf_counter(), cpu, max(own.ru_maxrss, children.ru_maxrss)
+
+    wall_start, cpu_start, _ = usage()
+    with contextlib.redirect_stdout(io.StringIO()):
+        if case.startswith("transform."):
+            result = transform_case(case.split(".", 1)[1], engine, workers)
+        elif case == "load.full":
+            result = load_case(full=True)
+        elif case == "load.incremental":
+            result = load_case(full=False)
+        elif case == "dashboard":
+            result = dashboard_case(repeat)
+        else:
+            raise ValueError(f"Unknown case: {case} (expected one of {', '.join(CASES)})")
+    wall_end, cpu_end, peak_kb = usage()
+
+    wall = wall_end - wall_start
+    return {
+        "wall_s": round(wall, 4),
+        "cpu_s": round(cpu_end - cpu_start, 4),
+        "peak_rss_mb": round(peak_kb / 1024, 1),
+        "rows_per_s": round(result["rows"] / wall, 1) if wall else None,
+        "mb_per_s": round(result["input_bytes"] / 1e6 / wall, 2) if wall and "input_bytes" in result else None,
+        **result,
+    }
+
+
+def in_fresh_process(fn, *args, **kwargs):
+    """Run fn(*args, **kwargs) in a new interpreter (clean imports, caches and peak RSS)."""
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as executor:
+        return executor.submit(fn, *args, **kwargs).result()
+
+
+# -------------------------
+# RESULTS
+# -------------------------
+def environment() -> dict:
+    def git(*args):
+        result = subprocess.run(["git", *args], cwd=REPO_ROOT, capture_output=True, text=True)
+        return result.stdout.strip() if result.returncode == 0 else None
+
+    return {
+        "commit": git("rev-parse", "--short", "HEAD"),
+        "dirty": bool(git("status", "--porcelain", "--untracked-files=no")),
+        "python": platform.python_version(),
+        "pandas": pandas.__version__,
+        "pyarrow": pyarrow.__version__,
+        "duckdb": duckdb.__version__,
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def previous_run(path: str, params: dict, commit: str | None) -> dict | None:
+    """Last recorded run with the same parameters on another commit."""
+    if not os.path.exists(path):
+        return None
+    match = None
+    with open(path, "r") as f:
+        for line in f:
+            record = json.loads(line)
+            if record["params"] == params and record["env"]["commit"] != commit:
+                match = record
+    return match
+
+
+def print_results(cases: dict, baseline: dict | None):
+    header = f"{'case':<22}{'wall s':>9}{'cpu s':>9}{'peak MB':>9}{'rows':>10}{'rows/s':>12}{'MB/s':>8}"
+    if baseline:
+        header += f"{'vs ' + baseline['env']['commit']:>14}"
+    print(header)
+
+    for case, m in cases.items():
+        line = (f"{case:<22}{m['wall_s']:>9.3f}{m['cpu_s']:>9.3f}{m['peak_rss_mb']:>9.1f}{m['rows']:>10}"
+                f"{m['rows_per_s'] or 0:>12.0f}{m['mb_per_s'] or 0:>8.1f}")
+        old = (baseline or {}).get("cases", {}).get(case)
+        if old:
+            line += f"{m['wall_s'] / old['wall_s']:>13.2f}x"
+        print(line)
+
+    dashboard = cases.get("dashboard")
+    if dashboard:
+        print("\ndashboard queries: " + ", ".join(f"{k} {v}" for k, v in dashboard.items() if k.endswith("_ms")))
+
+
+def run_benchmark(leagues=10, seasons=3, teams=20, pages=3, players=20, seed=0, backend="json",
+                  engine="pandas", workers=None, repeat=3, cases=None, workdir=None,
+                  output=OUTPUT_PATH, compare=False) -> dict:
+    """Generate (or reuse) the workspace, run the cases, append the results to `output`."""
+    root = os.path.abspath(workdir) if workdir else tempfile.mkdtemp(prefix="bench_pipeline_")
+    data_params = {"leagues": leagues, "seasons": seasons, "teams": teams, "pages": pages,
+                   "players": players, "seed": seed}
+    params = {**data_params, "backend": backend, "engine": engine, "workers": workers, "repeat": repeat}
+
+    try:
+        in_fresh_process(build_workspace, root, backend=backend, **data_params)
+
+        results = {}
+        for case in cases or CASES:
+            runs = [in_fresh_process(run_case, root, case, engine, workers, repeat) for _ in range(repeat)]
+            results[case] = min(runs, key=lambda m: m["wall_s"])
+            print(f"  {case}: {results[case]['wall_s']:.3f}s")
+    finally:
+        if not workdir:
+            shutil.rmtree(root, ignore_errors=True)
+
+    record = {"ts": time.time(), "env": environment(), "params": params, "cases": results}
+    baseline = previous_run(output, params, record["env"]["commit"]) if compare else None
+
+    print(f"\nSynthetic tree: {leagues} leagues x {seasons} seasons, {teams} teams, "
+          f"{pages} x {players} players per team ({backend} raw, {engine} engine, best of {repeat})\n")
+    print_results(results, baseline)
+
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "a") as f:
+        f.write(json.dumps(record) + "\n")
+    print(f"\nResults appended to {output}")
+    return record
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark transform / load / dashboard on synthetic raw data")
+    parser.add_argument("--leagues", type=int, default=10)
+    parser.add_argument("--seasons", type=int, default=3)
+    parser.add_argument("--teams", type=int, default=20, help="Teams per league")
+    parser.add_argument("--pages", type=int, default=3, help="Player pages per team and season")
+    parser.add_argument("--players", type=int, default=20, help="Players per page")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--backend", choices=["json", "parquet"], default="json", help="Raw storage backend")
+    parser.add_argument("--engine", choices=["pandas", "streaming", "incremental", "sql"], default="pandas",
+                        help="Transform engine")
+    parser.add_argument("--workers", type=int, help="Transform workers / DuckDB threads (default: CPU count)")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per case (fastest is reported)")
+    parser.add_argument("--cases", help=f"Comma-separated subset of: {', '.join(CASES)} "
+                                         "(load / dashboard read what earlier transform / load runs left in --workdir)")
+    parser.add_argument("--workdir", help="Keep the synthetic workspace here (reused when parameters match)")
+    parser.add_argument("--output", default=OUTPUT_PATH, help="JSON lines file the run is appended to")
+    parser.add_argument("--compare", action="store_true",
+                        help="Compare with the last run of the same parameters on another commit")
+    args = parser.parse_args()
+
+    run_benchmark(
+        leagues=args.leagues, seasons=args.seasons, teams=args.teams, pages=args.pages, players=args.players,
+        seed=args.seed, backend=args.backend, engine=args.engine, workers=args.workers, repeat=args.repeat,
+        cases=args.cases.split(",") if args.cases else None, workdir=args.workdir, output=args.output,
+        compare=args.compare,
+    )
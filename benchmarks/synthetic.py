@@ -0,0 +1,286 @@
+"""
+Synthetic API-Football raw tree (leagues, fixtures, teams, players).
+
+    python -m benchmarks.synthetic --out data/bench/10x3 [--leagues 10] [--seasons 3]
+        [--teams 20] [--pages 3] [--players 20] [--backend json|parquet] [--seed 0]
+
+Builds a self-contained workspace (config/ + data/raw/) that the real
+pipelines run against unchanged:
+  - payloads go through save_raw, so files, manifest rows and the raw
+    backend are exactly what the extractors would have written
+  - config/leagues.yaml lists the synthetic leagues (scope / region)
+  - same arguments + seed → byte-identical payloads, so benchmark runs
+    on different commits read the same data
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+from datetime import date, timedelta
+import yaml
+
+REPO_CONFIG = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "config")
+MARKER = "synthetic.json"
+
+POSITIONS = ["Goalkeeper", "Defender", "Midfielder", "Attacker"]
+COUNTRIES = [
+    ("Spain", "ES", "Europe"), ("England", "GB", "Europe"), ("Italy", "IT", "Europe"),
+    ("Germany", "DE", "Europe"), ("France", "FR", "Europe"), ("Portugal", "PT", "Europe"),
+    ("Brazil", "BR", "South America"), ("Argentina", "AR", "South America"),
+    ("Colombia", "CO", "South America"), ("Mexico", "MX", "North America"),
+]
+SURFACES = ["grass", "artificial turf"]
+
+
+# -------------------------
+# PAYLOADS
+# -------------------------
+def synthetic_statistics(rng, team_id, league_id, season):
+    """One API-Football statistics block (all sections, like the real payload)."""
+    appearances = rng.randint(0, 38)
+    return {
+        "team": {"id": team_id, "name": f"Team {team_id}", "logo": f"https://media.example/teams/{team_id}.png"},
+        "league": {"id": league_id, "name": "League", "country": "Spain", "logo": "https://media.example/l.png",
+                   "flag": "https://media.example/es.svg", "season": season},
+        "games": {"appearences": appearances, "lineups": rng.randint(0, appearances),
+                  "minutes": appearances * rng.randint(10, 90), "number": None,
+                  "position": rng.choice(POSITIONS),
+                  "rating": f"{rng.uniform(5.5, 8.5):.6f}" if appearances else None, "captain": False},
+        "substitutes": {"in": rng.randint(0, 10), "out": rng.randint(0, 10), "bench": rng.randint(0, 20)},
+        "shots": {"total": rng.randint(0, 80), "on": rng.randint(0, 40)},
+        "goals": {"total": rng.randint(0, 25), "conceded": 0, "assists": rng.randint(0, 15), "saves": None},
+        "passes": {"total": rng.randint(0, 2000), "key": rng.randint(0, 80), "accuracy": rng.randint(50, 95)},
+        "tackles": {"total": rng.randint(0, 80), "blocks": rng.randint(0, 20), "interceptions": rng.randint(0, 50)},
+        "duels": {"total": rng.randint(0, 400), "won": rng.randint(0, 200)},
+        "dribbles": {"attempts": rng.randint(0, 100), "success": rng.randint(0, 60), "past": None},
+        "fouls": {"drawn": rng.randint(0, 60), "committed": rng.randint(0, 60)},
+        "cards": {"yellow": rng.randint(0, 12), "yellowred": 0, "red": rng.randint(0, 2)},
+        "penalty": {"won": None, "commited": None, "scored": rng.randint(0, 5), "missed": 0, "saved": None},
+    }
+
+
+def synthetic_page(rng, page, players, team_id, league_id=140, season=2023, pages=3):
+    """One /players page of a team (player ids are stable across seasons)."""
+    response = []
+    for i in range(players):
+        player_id = team_id * 1000 + page * players + i
+        response.append({
+            "player": {
+                "id": player_id, "name": f"P. Player{player_id}", "firstname": "Player",
+                "lastname": f"Number {player_id}", "age": rng.randint(17, 38),
+                "birth": {"date": f"{rng.randint(1985, 2006)}-0{rng.randint(1, 9)}-1{rng.randint(0, 9)}",
+                          "place": "Madrid", "country": "Spain"},
+                "nationality": rng.choice(["Spain", "France", "Brazil", "Argentina", "Portugal"]),
+                "height": f"{rng.randint(165, 200)} cm", "weight": f"{rng.randint(60, 95)} kg",
+                "injured": False, "photo": f"https://media.example/players/{player_id}.png",
+            },
+            "statistics": [synthetic_statistics(rng, team_id, league_id, season)],
+        })
+    return {"get": "players", "parameters": {"team": str(team_id), "season": str(season), "page": str(page)},
+            "errors": [], "results": players, "paging": {"current": page, "total": pages}, "response": response}
+
+
+def synthetic_league(rng, league_id, country, season, current):
+    """/leagues?id=&season= payload: the league with the requested season."""
+    name, code, _ = country
+    coverage = {
+        "fixtures": {"events": True, "lineups": True, "statistics": rng.random() < 0.8,
+                     "players": rng.random() < 0.8},
+        "standings": True, "players": True, "top_scorers": True, "top_assists": rng.random() < 0.9,
+        "top_cards": rng.random() < 0.9, "injuries": False, "predictions": True, "odds": False,
+    }
+    item = {
+        "league": {"id": league_id, "name": f"{name} League {league_id}", "type": "League",
+                   "logo": f"https://media.example/leagues/{league_id}.png"},
+        "country": {"name": name, "code": code, "flag": f"https://media.example/flags/{code.lower()}.svg"},
+        "seasons": [{"year": season, "start": f"{season}-08-{rng.randint(10, 20)}",
+                     "end": f"{season + 1}-05-{rng.randint(20, 31)}", "current": current, "coverage": coverage}],
+    }
+    return {"get": "leagues", "parameters": {"id": str(league_id), "season": str(season)},
+            "errors": [], "results": 1, "paging": {"current": 1, "total": 1}, "response": [item]}
+
+
+def synthetic_teams(rng, league_id, season, team_ids, country):
+    """/teams?league=&season= payload: one team + home venue per club."""
+    response = []
+    for team_id in team_ids:
+        response.append({
+            "team": {"id": team_id, "name": f"Team {team_id}", "code": f"T{team_id % 100:02d}",
+                     "country": country[0], "founded": 1880 + team_id % 120, "national": False,
+                     "logo": f"https://media.example/teams/{team_id}.png"},
+            "venue": {"id": team_id, "name": f"Stadium {team_id}", "address": f"{team_id} Main Street",
+                      "city": f"City {team_id}", "capacity": rng.randint(5_000, 90_000),
+                      "surface": rng.choice(SURFACES), "image": f"https://media.example/venues/{team_id}.png"},
+        })
+    return {"get": "teams", "parameters": {"league": str(league_id), "season": str(season)},
+            "errors": [], "results": len(response), "paging": {"current": 1, "total": 1}, "response": response}
+
+
+def synthetic_fixtures(rng, league_id, season, team_ids, current):
+    """
+    /fixtures?league=&season= payload: double round robin.
+
+    Past seasons are fully played (FT / AET / PEN); in the current season
+    the second half of the calendar is still scheduled (NS, no goals).
+    """
+    pairs = [(home, away) for home in team_ids for away in team_ids if home != away]
+    rng.shuffle(pairs)
+
+    response = []
+    for n, (home, away) in enumerate(pairs):
+        played = not current or n < len(pairs) // 2
+        status = rng.choice(["FT"] * 18 + ["AET", "PEN"]) if played else "NS"
+        halftime = (rng.randint(0, 2), rng.randint(0, 2)) if played else (None, None)
+        fulltime = (halftime[0] + rng.randint(0, 2), halftime[1] + rng.randint(0, 2)) if played else (None, None)
+        extratime = fulltime if status in ("AET", "PEN") else (None, None)
+        penalty = (rng.randint(2, 5), rng.randint(2, 5)) if status == "PEN" else (None, None)
+        kickoff = date(season, 8, 15) + timedelta(days=n * 280 // len(pairs))
+
+        response.append({
+            "fixture": {
+                "id": (league_id * 10_000 + season) * 10_000 + n,
+                "referee": f"Referee {rng.randint(1, 40)}", "timezone": "UTC",
+                "date": f"{kickoff.isoformat()}T{rng.choice([13, 16, 19, 21])}:00:00+00:00",
+                "timestamp": None, "periods": {"first": None, "second": None},
+                "venue": {"id": home, "name": f"Stadium {home}", "city": f"City {home}"},
+                "status": {"long": "Match Finished" if played else "Not Started", "short": status,
+                           "elapsed": 90 if played else None},
+            },
+            "league": {"id": league_id, "season": season, "round": f"Regular Season - {n * 2 // len(team_ids) + 1}"},
+            "teams": {"home": {"id": home, "name": f"Team {home}"}, "away": {"id": away, "name": f"Team {away}"}},
+            "goals": {"home": fulltime[0], "away": fulltime[1]},
+            "score": {
+                "halftime": {"home": halftime[0], "away": halftime[1]},
+                "fulltime": {"home": fulltime[0], "away": fulltime[1]},
+                "extratime": {"home": extratime[0], "away": extratime[1]},
+                "penalty": {"home": penalty[0], "away": penalty[1]},
+            },
+        })
+    return {"get": "fixtures", "parameters": {"league": str(league_id), "season": str(season)},
+            "errors": [], "results": len(response), "paging": {"current": 1, "total": 1}, "response": response}
+
+
+# -------------------------
+# WORKSPACE
+# -------------------------
+def prepare_workspace(root: str, backend: str = "json"):
+    """config/ for a synthetic workspace: the repo settings with the chosen raw backend."""
+    os.makedirs(os.path.join(root, "config"), exist_ok=True)
+
+    with open(os.path.join(REPO_CONFIG, "settings.yaml"), "r") as f:
+        settings = yaml.safe_load(f)
+    settings.setdefault("raw_storage", {})["backend"] = backend
+    settings.setdefault("instrumentation", {})["files"] = False
+
+    with open(os.path.join(root, "config", "settings.yaml"), "w") as f:
+        yaml.safe_dump(settings, f, sort_keys=False)
+
+
+def workspace_params(root: str) -> dict | None:
+    """Parameters a workspace was generated with (None if it has no raw tree yet)."""
+    try:
+        with open(os.path.join(root, MARKER), "r") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def generate_raw_tree(leagues: int = 10, seasons: int = 3, teams: int = 20, pages: int = 3, players: int = 20,
+                      first_season: int = 2021, seed: int = 0) -> dict:
+    """
+    Write the raw tree into the current directory (a workspace from
+    prepare_workspace) and return {endpoint: payloads}.
+
+    - leagues × seasons league / teams / fixtures payloads
+    - teams × pages player pages per league-season (players per page)
+    - the last season is the current one (half of its fixtures unplayed)
+    """
+    # Imported here: raw_store / manifest resolve config/ and data/ against the workspace
+    from src.extract.raw_store import flush_raw, save_raw
+
+    rng = random.Random(seed)
+    years = list(range(first_season, first_season + seasons))
+    league_meta = {}
+    counts = {"leagues": 0, "teams": 0, "fixtures": 0, "players": 0}
+
+    for n in range(leagues):
+        league_key = f"synthetic_{n:03d}"
+        league_id = 1000 + n
+        country = COUNTRIES[n % len(COUNTRIES)]
+        team_ids = [10_000 + n * 100 + t for t in range(teams)]
+        league_meta[league_key] = {
+            "league_id": league_id,
+            "scope": "continental" if n % 5 == 4 else "domestic",
+            "region": country[2],
+        }
+
+        for season in years:
+            current = season == years[-1]
+            save_raw("leagues", league_key, season, synthetic_league(rng, league_id, country, season, current))
+            save_raw("teams", league_key, season, synthetic_teams(rng, league_id, season, team_ids, country))
+            save_raw("fixtures", league_key, season, synthetic_fixtures(rng, league_id, season, team_ids, current))
+            counts["leagues"] += 1
+            counts["teams"] += 1
+            counts["fixtures"] += 1
+
+            for team_id in team_ids:
+                for page in range(1, pages + 1):
+                    data = synthetic_page(rng, page, players, team_id, league_id, season, pages)
+                    save_raw("players", league_key, season, data, team_id=team_id, page=page)
+                    counts["players"] += 1
+
+    flush_raw()
+
+    with open(os.path.join("config", "leagues.yaml"), "w") as f:
+        yaml.safe_dump(league_meta, f, sort_keys=False)
+    return counts
+
+
+def build_workspace(root: str, backend: str = "json", force: bool = False, **params) -> dict:
+    """
+    Workspace with a generated raw tree; reused as-is when it was built
+    with the same parameters (unless `force`). Returns the parameters.
+
+    Run it in a fresh process: the raw store and manifest it opens are
+    process-wide and bound to the workspace paths.
+    """
+    marker = {"backend": backend, **params}
+    if not force and workspace_params(root) == marker:
+        return marker
+
+    shutil.rmtree(os.path.join(root, "data"), ignore_errors=True)
+    prepare_workspace(root, backend)
+
+    cwd = os.getcwd()
+    os.chdir(root)
+    try:
+        counts = generate_raw_tree(**params)
+    finally:
+        os.chdir(cwd)
+
+    with open(os.path.join(root, MARKER), "w") as f:
+        json.dump(marker, f, indent=2)
+    print(f"Generated synthetic raw tree in {root}: " + ", ".join(f"{v} {k}" for k, v in counts.items()))
+    return marker
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a synthetic API-Football raw tree")
+    parser.add_argument("--out", required=True, help="Workspace directory (config/ + data/raw/)")
+    parser.add_argument("--leagues", type=int, default=10)
+    parser.add_argument("--seasons", type=int, default=3)
+    parser.add_argument("--teams", type=int, default=20, help="Teams per league")
+    parser.add_argument("--pages", type=int, default=3, help="Player pages per team and season")
+    parser.add_argument("--players", type=int, default=20, help="Players per page")
+    parser.add_argument("--first-season", type=int, default=2021)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--backend", choices=["json", "parquet"], default="json", help="Raw storage backend")
+    parser.add_argument("--force", action="store_true", help="Regenerate even if the workspace matches")
+    args = parser.parse_args()
+
+    build_workspace(
+        args.out, backend=args.backend, force=args.force,
+        leagues=args.leagues, seasons=args.seasons, teams=args.teams, pages=args.pages,
+        players=args.players, first_season=args.first_season, seed=args.seed,
+    )
@@ -1,7 +1,12 @@
-import duckdb
+# Run from the repository root: python -m data.debug_duckdb
+from src.load.utils_db import SnapshotNotFoundError, get_cursor
 
-con = duckdb.connect("data/analytics.duckdb")
+# Read-only cursor on the current snapshot (data/analytics.current)
+try:
+    con = get_cursor()
+except SnapshotNotFoundError as e:
+    raise SystemExit(str(e))
 
 print(con.execute("DESCRIBE dim_league").fetchdf())
 print()
-print(con.execute("SELECT league_id, league_name, country_flag, flag_url, scope, region FROM dim_league").fetchdf())
\ No newline at end of file
+print(con.execute("SELECT league_id, league_name, country_flag, scope, region FROM dim_league").fetchdf())
@@ -1,7 +1,29 @@
 import os
+import random
+import threading
+import time
 import requests
+from requests.adapters import HTTPAdapter
 from dotenv import load_dotenv
 import yaml
+from src.extract.rate_limiter import get_rate_limiter, get_quota_tracker
+from src.extract.response_cache import get_response_cache
+from src.instrumentation import count
+
+# HTTP statuses worth retrying (throttling and transient server failures)
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+_shared_client = None
+_shared_lock = threading.Lock()
+
+
+class APIError(Exception):
+    """Raised when the API returns a non-retryable error."""
+
+
+class QuotaExceededError(APIError):
+    """Raised when the daily request quota is used up (or about to be)."""
+
 
 class APIClient:
     def __init__(self, settings_path="config/settings.yaml"):
@@ -15,26 +37,157 @@ class APIClient:
         with open(settings_path, "r") as f:
             settings = yaml.safe_load(f)
 
+        self.settings = settings
         self.base_url = settings["api_base_url"]
         self.seasons = settings["seasons"]
 
+        # Process-wide token bucket and quota view shared by every client instance
+        self.rate_limiter = get_rate_limiter(settings)
+        self.quota = get_quota_tracker(settings)
+
+        # Persistent response cache (None when disabled in settings.yaml)
+        self.cache = get_response_cache(settings)
+
+        # HTTP behaviour (pooling, timeouts, retries)
+        http_cfg = settings.get("http", {}) or {}
+        self.timeout = http_cfg.get("timeout_seconds", 30)
+        self.max_retries = http_cfg.get("max_retries", 5)
+        self.backoff_base = http_cfg.get("backoff_base_seconds", 1.0)
+        self.backoff_max = http_cfg.get("backoff_max_seconds", 60.0)
+        pool_size = http_cfg.get("pool_size", 10)
+
         # Default headers for API-Football
         self.headers = {
             "x-apisports-key": self.api_key
         }
 
+        # Keep-alive session: one TCP+TLS handshake per pooled connection
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def _backoff(self, attempt, retry_after=None):
+        """Exponential backoff with full jitter (Retry-After wins when present)."""
+        if retry_after is not None:
+            try:
+                return float(retry_after)
+            except ValueError:
+                pass
+        cap = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+        return random.uniform(0, cap)
+
+    def _pace(self, response):
+        """Update the shared quota view and pause the bucket if the minute window is spent."""
+        self.quota.update(response.headers)
+
+        if self.quota.minute_remaining == 0:
+            self.rate_limiter.pause(60)
+
+    @staticmethod
+    def _stale_or_raise(cached, error):
+        """
+        Serve a stale cached body when the API can't answer (retries spent,
+        quota exhausted): slightly old data beats no data for the run.
+        """
+        if cached is None:
+            raise error
+        print(f"  WARNING: {error} — serving the stale cached response.")
+        return cached["body"]
+
     def get(self, endpoint, params=None):
         url = f"{self.base_url}/{endpoint}"
-        response = requests.get(url, headers=self.headers, params=params)
 
-        if response.status_code != 200:
-            raise Exception(f"HTTP error {response.status_code}: {response.text}")
+        # Cache: fresh entries cost no quota; stale ones are revalidated below
+        cached = None
+        conditional_headers = {}
+        if self.cache is not None:
+            cached, is_fresh = self.cache.lookup(endpoint, params)
+            if is_fresh:
+                count("cache_hits")
+                return cached["body"]
+            conditional_headers = self.cache.validators(cached)
+
+        for attempt in range(self.max_retries + 1):
+            # Stop before spending a request we know the plan won't serve
+            if self.quota.daily_exhausted():
+                return self._stale_or_raise(cached, QuotaExceededError("Daily request quota exhausted."))
+
+            # Respect the aggregate request rate (blocks until a token is free)
+            self.rate_limiter.acquire()
+
+            count("api_calls")
+            try:
+                response = self.session.get(
+                    url, params=params, headers=conditional_headers, timeout=self.timeout
+                )
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt == self.max_retries:
+                    return self._stale_or_raise(cached, APIError(f"Network error after {attempt + 1} attempts: {e}"))
+                delay = self._backoff(attempt)
+                print(f"  Network error ({e.__class__.__name__}). Retrying in {delay:.1f}s...")
+                time.sleep(delay)
+                continue
+
+            self._pace(response)
+
+            if response.status_code in RETRYABLE_STATUS and attempt < self.max_retries:
+                delay = self._backoff(attempt, response.headers.get("Retry-After"))
+                print(f"  HTTP {response.status_code}. Retrying in {delay:.1f}s...")
+                time.sleep(delay)
+                continue
+
+            # Not modified → reuse the cached body
+            if response.status_code == 304 and cached is not None:
+                self.cache.refresh(endpoint, params, cached)
+                return cached["body"]
+
+            if response.status_code in RETRYABLE_STATUS:
+                return self._stale_or_raise(
+                    cached, APIError(f"HTTP error {response.status_code} after {attempt + 1} attempts: {response.text}")
+                )
+
+            if response.status_code != 200:
+                raise APIError(f"HTTP error {response.status_code}: {response.text}")
+
+            data = response.json()
+
+            # API-level errors (API-Football answers 200 with an "errors" object)
+            errors = data.get("errors")
+            if errors:
+                if isinstance(errors, dict) and "requests" in errors:
+                    self.quota.mark_exhausted()
+                    return self._stale_or_raise(
+                        cached, QuotaExceededError(f"Daily request limit reached: {errors['requests']}")
+                    )
+
+                if isinstance(errors, dict) and "rateLimit" in errors and attempt < self.max_retries:
+                    self.rate_limiter.pause(60)
+                    print("  Per-minute rate limit hit. Waiting for the next window...")
+                    continue
+
+                print(f"API error: {errors}")
+                return None
+
+            if self.cache is not None:
+                self.cache.store(endpoint, params, data, response.headers)
+
+            return data
+
+        return self._stale_or_raise(cached, APIError(f"Giving up on {endpoint} after {self.max_retries + 1} attempts."))
+
 
-        data = response.json()
+def get_api_client() -> APIClient:
+    """
+    Return the process-wide APIClient, creating it on first use.
 
-        # API-level errors
-        if data.get("errors"):
-            print(f"API error: {data['errors']}")
-            return None
+    Extractors share it (settings read once, one keep-alive session), so a
+    batch over many leagues does not rebuild a client per fetcher call.
+    """
+    global _shared_client
 
-        return data
\ No newline at end of file
+    with _shared_lock:
+        if _shared_client is None:
+            _shared_client = APIClient()
+        return _shared_client
@@ -0,0 +1,211 @@
+import asyncio
+from src.extract.api_client import APIClient, get_api_client
+from src.extract.fetch_matches import fetch_matches_delta
+from src.extract.league_config import get_league_id
+from src.extract.manifest import get_manifest
+from src.extract.raw_store import flush_raw, load_response, save_raw
+from src.extract.team_index import get_team_index
+
+# Endpoint → league param name for one-file-per-season extractors
+SEASON_ENDPOINTS = {
+    "leagues": "id",
+    "fixtures": "league",
+    "teams": "league",
+}
+
+
+class AsyncExtractor:
+    """
+    Concurrent extraction engine built around APIClient.
+
+    - Requests run in worker threads via asyncio.to_thread, so the blocking
+      APIClient.get (and its shared token bucket) is reused unchanged.
+    - A semaphore caps in-flight requests (rate_limit.max_concurrency).
+    - The process-wide token bucket keeps the aggregate request rate inside
+      the plan quota, whatever the number of concurrent tasks.
+    - Responses go through the same raw store and extraction manifest as
+      the sequential fetch_* extractors.
+    """
+
+    def __init__(self, client: APIClient | None = None, max_concurrency: int | None = None):
+        self.client = client or get_api_client()
+        self.manifest = get_manifest()
+        self.team_index = get_team_index()
+
+        if max_concurrency is None:
+            max_concurrency = self.client.settings.get("rate_limit", {}).get("max_concurrency", 4)
+
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+
+    def league_id(self, league_key: str) -> int:
+        return get_league_id(league_key)
+
+    async def get(self, endpoint: str, params: dict):
+        async with self.semaphore:
+            return await asyncio.to_thread(self.client.get, endpoint, params)
+
+    # -------------------------
+    # ONE FILE PER SEASON
+    # -------------------------
+    async def fetch_season_file(self, endpoint: str, league_key: str, season: int,
+                                force_update: bool = False, return_data: bool = True):
+        league_param = SEASON_ENDPOINTS[endpoint]
+
+        entry = self.manifest.get(endpoint, league_key, season)
+        if not force_update and entry is not None:
+            print(f"  [{endpoint}] Skipping {league_key} {season} — already in manifest.")
+            if not return_data:
+                return []
+            return await asyncio.to_thread(load_response, entry)
+
+        params = {
+            league_param: self.league_id(league_key),
+            "season": season,
+        }
+
+        data = await self.get(endpoint, params)
+
+        if data is None:
+            print(f"  [{endpoint}] API error for {league_key} {season}. Skipping.")
+            return []
+
+        response_items = data.get("response", [])
+        print(f"  [{endpoint}] Retrieved {len(response_items)} record(s) for {league_key} {season}.")
+
+        await asyncio.to_thread(save_raw, endpoint, league_key, season, data)
+        if endpoint == "teams":
+            self.team_index.put(league_key, season, response_items)
+
+        return response_items
+
+    async def fetch_seasons(self, endpoint: str, league_key: str, seasons: list[int],
+                            force_update: bool = False, return_data: bool = True):
+        results = await asyncio.gather(*[
+            self.fetch_season_file(endpoint, league_key, s, force_update, return_data)
+            for s in seasons
+        ])
+        return [item for items in results for item in items]
+
+    # -------------------------
+    # PLAYERS (PAGINATED)
+    # -------------------------
+    async def season_teams(self, league_key: str, season: int):
+        """Roster from the shared TeamIndex, fetched only if the season was never stored."""
+        teams = await asyncio.to_thread(self.team_index.get, league_key, season)
+        if teams is None:
+            teams = await self.fetch_season_file("teams", league_key, season, force_update=False)
+        return teams
+
+    async def fetch_player_page(self, league_key: str, season: int, team_id: int, page: int,
+                                force_update: bool = False, return_data: bool = True):
+        """
+        Fetch (or look up) a single player page.
+
+        Returns (total_pages, players), or None if the page is unavailable.
+        Pages already in the manifest are only read when return_data=True.
+        """
+        entry = self.manifest.get("players", league_key, season, team_id, page)
+        if not force_update and entry is not None:
+            players = await asyncio.to_thread(load_response, entry) if return_data else []
+            return entry["paging_total"] or page, players
+
+        params = {
+            "league": self.league_id(league_key),
+            "team": team_id,
+            "season": season,
+            "page": page,
+        }
+
+        data = await self.get("players", params)
+
+        if data is None or not data.get("response"):
+            return None
+
+        await asyncio.to_thread(save_raw, "players", league_key, season, data, team_id, page)
+        return data.get("paging", {}).get("total", 1), data["response"]
+
+    async def fetch_team_players(self, league_key: str, season: int, team_id: int,
+                                 force_update: bool = False, return_data: bool = True):
+        # Page 1 tells us how many pages exist; the rest are fetched concurrently
+        first = await self.fetch_player_page(league_key, season, team_id, 1, force_update, return_data)
+        if first is None:
+            print(f"    [players] No players for team {team_id} ({league_key} {season}).")
+            return []
+
+        total_pages, players = first
+
+        others = await asyncio.gather(*[
+            self.fetch_player_page(league_key, season, team_id, page, force_update, return_data)
+            for page in range(2, total_pages + 1)
+        ])
+
+        players = list(players)
+        for result in others:
+            if result is not None:
+                players.extend(result[1])
+
+        print(f"    [players] Team {team_id} ({league_key} {season}): {total_pages} page(s).")
+        return players
+
+    async def fetch_players(self, league_key: str, seasons: list[int],
+                            force_update: bool = False, return_data: bool = True):
+        # Teams are always fetched incrementally (force_update applies only to players)
+        teams_per_season = await asyncio.gather(*[self.season_teams(league_key, s) for s in seasons])
+
+        tasks = []
+        for s, teams in zip(seasons, teams_per_season):
+            if not teams:
+                print(f"  [players] No teams found for {league_key} {s}. Skipping.")
+                continue
+
+            for team in teams:
+                tasks.append(self.fetch_team_players(league_key, s, team["team"]["id"], force_update, return_data))
+
+        results = await asyncio.gather(*tasks)
+        return [player for players in results for player in players]
+
+
+async def run_async_extraction(league_keys: list, seasons: list | None, force_update: bool, only: str | None,
+                               live: bool = False):
+    """
+    Async counterpart of run_pipeline.
+
+    League metadata, matches and teams are independent, so they run
+    concurrently across all leagues and seasons. Players depend on teams and
+    fan out over leagues, seasons, teams and pages. Every league shares one
+    extractor, so the semaphore and token bucket spread the request budget
+    across leagues instead of running them one after another. With
+    `live=True` matches are refreshed through fetch_matches_delta (a single
+    windowed request per league).
+    """
+    extractor = AsyncExtractor()
+    seasons_to_fetch = seasons or extractor.client.seasons
+
+    jobs = []
+    for league_key in league_keys:
+        if only is None or only == "league":
+            jobs.append(extractor.fetch_seasons("leagues", league_key, seasons_to_fetch, force_update,
+                                                return_data=False))
+        if (only is None or only == "matches") and live:
+            for season in seasons or [None]:
+                jobs.append(asyncio.to_thread(fetch_matches_delta, league_key, season))
+        elif only is None or only == "matches":
+            jobs.append(extractor.fetch_seasons("fixtures", league_key, seasons_to_fetch, force_update,
+                                                return_data=False))
+        if only is None or only == "teams":
+            jobs.append(extractor.fetch_seasons("teams", league_key, seasons_to_fetch, force_update,
+                                                return_data=False))
+
+    await asyncio.gather(*jobs)
+
+    # Make buffered teams visible in the manifest before players look them up
+    flush_raw()
+
+    if only is None or only == "players":
+        await asyncio.gather(*[
+            extractor.fetch_players(league_key, seasons_to_fetch, force_update, return_data=False)
+            for league_key in league_keys
+        ])
+        for league_key in league_keys:
+            total_players = extractor.manifest.total_results("players", league_key, seasons_to_fetch)
+            print(f"\n>>> Total players extracted so far ({league_key}): {total_players}")
@@ -1,13 +1,9 @@
-import json
-import os
-import yaml
-from src.extract.api_client import APIClient
+from src.extract.api_client import get_api_client
+from src.extract.league_config import get_league_id
+from src.extract.manifest import get_manifest
+from src.extract.raw_store import load_response, save_raw
 
-def load_league_config(path: str = "config/leagues.yaml") -> dict:
-    with open(path, "r") as f:
-        return yaml.safe_load(f)
-
-def fetch_league_data(league_key: str = "la_liga", season: int | None = None, force_update: bool = False):
+def fetch_league_data(league_key: str = "la_liga", season: int | None = None, force_update: bool = False, return_data: bool = True):
     """
     Fetch league metadata for all configured seasons for a given league_key.
 
@@ -15,19 +11,13 @@ def fetch_league_data(league_key: str = "la_liga", season: int | None = None, fo
     - Saves one file per season under data/raw/leagues/.
     - If season=None → fetch all seasons from APIClient.seasons
     - If season=YYYY → fetch only that season
-    - Skips seasons where the file already exists unless force_update=True.
+    - Skips seasons already recorded in the extraction manifest unless force_update=True.
+    - return_data=False skips loading existing payloads (only newly fetched items are returned).
     - Returns a list with all league responses (data["response"] merged).
     """
-    client = APIClient()
-    leagues_cfg = load_league_config()
-
-    if league_key not in leagues_cfg:
-        raise ValueError(f"League key '{league_key}' not found in leagues.yaml")
-
-    league_id = leagues_cfg[league_key]["league_id"]
-
-    raw_path = "data/raw/leagues"
-    os.makedirs(raw_path, exist_ok=True)
+    client = get_api_client()
+    manifest = get_manifest()
+    league_id = get_league_id(league_key)
 
     all_leagues = []
 
@@ -37,17 +27,12 @@ def fetch_league_data(league_key: str = "la_liga", season: int | None = None, fo
     for season in seasons_to_fetch:
         print(f"\n=== Fetching league data for {league_key} - season {season} ===")
 
-        file_path = os.path.join(raw_path, f"{league_key}_{season}.json")
-
         # Incremental: skip if already fetched and not forcing update
-        if not force_update and os.path.exists(file_path):
-            print(f"  Skipping season {season} — file already exists.")
-            # Load existing file if you want it in the return object
-            with open(file_path, "r") as f:
-                existing_data = json.load(f)
-            # existing_data is the full JSON, we want its "response"
-            if "response" in existing_data:
-                all_leagues.extend(existing_data["response"])
+        entry = manifest.get("leagues", league_key, season)
+        if not force_update and entry is not None:
+            print(f"  Skipping season {season} — already in manifest.")
+            if return_data:
+                all_leagues.extend(load_response(entry))
             continue
 
         params = {
@@ -70,8 +55,7 @@ def fetch_league_data(league_key: str = "la_liga", season: int | None = None, fo
             print(f"  Retrieved {len(response_items)} league record(s) for season {season}.")
 
         # Save full JSON (including paging, parameters, etc.)
-        with open(file_path, "w") as f:
-            json.dump(data, f, indent=2)
+        save_raw("leagues", league_key, season, data)
 
         all_leagues.extend(response_items)
 
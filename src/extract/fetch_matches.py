@@ -1,33 +1,33 @@
-import json
 import os
-import yaml
-from src.extract.api_client import APIClient
+from datetime import date, datetime, timezone
+import pandas as pd
+from src.extract.api_client import get_api_client
+from src.extract.league_config import get_league_id
+from src.extract.manifest import get_manifest
+from src.extract.raw_store import load_payload, load_response, save_raw
+from src.transform.utils_parquet import clean_table_exists, read_clean_table
 
-def load_league_config(path: str = "config/leagues.yaml") -> dict:
-    with open(path, "r") as f:
-        return yaml.safe_load(f)
+CLEAN_PATH = "data/clean"
 
-def fetch_matches(league_key: str = "la_liga", season: int | None = None, force_update: bool = False):
+# Fixture statuses that won't change any more (everything else gets refreshed)
+FINAL_STATUSES = {"FT", "AET", "PEN", "AWD", "WO", "CANC", "ABD"}
+
+
+def fetch_matches(league_key: str = "la_liga", season: int | None = None, force_update: bool = False, return_data: bool = True):
     """
     Fetch match fixtures for a given league.
 
     - If season=None → fetch all seasons from APIClient.seasons
     - If season=YYYY → fetch only that season
-    - Skips existing files unless force_update=True
+    - Skips files recorded in the extraction manifest unless force_update=True
+    - return_data=False skips loading existing payloads (only newly fetched items are returned)
     - Saves full JSON (not only response)
     - Returns a merged list of all fixtures (data["response"])
     """
 
-    client = APIClient()
-    leagues_cfg = load_league_config()
-
-    if league_key not in leagues_cfg:
-        raise ValueError(f"League key '{league_key}' not found in leagues.yaml")
-
-    league_id = leagues_cfg[league_key]["league_id"]
-
-    raw_path = "data/raw/matches"
-    os.makedirs(raw_path, exist_ok=True)
+    client = get_api_client()
+    manifest = get_manifest()
+    league_id = get_league_id(league_key)
 
     all_matches = []
 
@@ -37,15 +37,12 @@ def fetch_matches(league_key: str = "la_liga", season: int | None = None, force_
     for s in seasons_to_fetch:
         print(f"\n=== Fetching matches for {league_key} - season {s} ===")
 
-        file_path = os.path.join(raw_path, f"{league_key}_{s}.json")
-
         # Incremental extraction
-        if not force_update and os.path.exists(file_path):
-            print(f"  Skipping season {s} — file already exists.")
-            with open(file_path, "r") as f:
-                existing_data = json.load(f)
-            if "response" in existing_data:
-                all_matches.extend(existing_data["response"])
+        entry = manifest.get("fixtures", league_key, s)
+        if not force_update and entry is not None:
+            print(f"  Skipping season {s} — already in manifest.")
+            if return_data:
+                all_matches.extend(load_response(entry))
             continue
 
         params = {
@@ -63,13 +60,140 @@ def fetch_matches(league_key: str = "la_liga", season: int | None = None, force_
         print(f"  Retrieved {len(response_items)} fixtures for season {s}.")
 
         # Save full JSON
-        with open(file_path, "w") as f:
-            json.dump(data, f, indent=2)
+        save_raw("fixtures", league_key, s, data)
 
         all_matches.extend(response_items)
 
     return all_matches
 
+
+def load_season_bounds(league_id: int, season: int):
+    """Return (start_date, end_date) from dim_season, or (None, None) if unknown."""
+    path = os.path.join(CLEAN_PATH, "dim_season.parquet")
+    if not os.path.exists(path):
+        return None, None
+
+    df = pd.read_parquet(path, columns=["league_id", "season_year", "start_date", "end_date"])
+    df = df[(df["league_id"] == league_id) & (df["season_year"] == season)]
+    if df.empty:
+        return None, None
+
+    row = df.iloc[0]
+    return pd.to_datetime(row["start_date"]).date(), pd.to_datetime(row["end_date"]).date()
+
+
+def load_pending_fixture_dates(league_id: int, season: int, entry: dict):
+    """
+    Dates of stored fixtures whose status is not final.
+
+    Uses fact_match (status column) when the clean layer exists, otherwise
+    falls back to the stored raw season data.
+    """
+    if clean_table_exists("fact_match", CLEAN_PATH):
+        # Partition pruning: only league_id=/season_year= of this season is read
+        df = read_clean_table(
+            "fact_match",
+            columns=["date", "status"],
+            filters=[("league_id", "=", league_id), ("season_year", "=", season)],
+            output_dir=CLEAN_PATH,
+        ).to_pandas()
+        pending = df[~df["status"].isin(FINAL_STATUSES)]
+        return [d.date() for d in pd.to_datetime(pending["date"], utc=True).dropna()]
+
+    dates = []
+    for item in load_response(entry):
+        fixture = item.get("fixture", {})
+        if fixture.get("status", {}).get("short") not in FINAL_STATUSES and fixture.get("date"):
+            dates.append(pd.to_datetime(fixture["date"], utc=True).date())
+    return dates
+
+
+def fetch_matches_delta(league_key: str = "la_liga", season: int | None = None,
+                        from_date: date | None = None, to_date: date | None = None,
+                        status: str | None = None):
+    """
+    Incremental fixtures refresh for a live season.
+
+    - Requests only fixtures in a date window (and optionally a status filter,
+      e.g. "NS-PST-1H-HT-2H") instead of the whole season.
+    - Default window: from the oldest non-final fixture that should already
+      have been played (fact_match.status) up to today, clamped to
+      dim_season.start_date / end_date.
+    - Merges the returned fixtures into the stored season file by fixture id
+      and updates the extraction manifest.
+    - Falls back to a full season pull when the season was never fetched.
+    - Returns the list of fixtures that changed.
+    """
+
+    client = get_api_client()
+    manifest = get_manifest()
+    league_id = get_league_id(league_key)
+    season = season or max(client.seasons)
+
+    print(f"\n=== Refreshing live fixtures for {league_key} - season {season} ===")
+
+    entry = manifest.get("fixtures", league_key, season)
+    if entry is None:
+        print("  Season not fetched yet. Running a full season pull.")
+        return fetch_matches(league_key=league_key, season=season)
+
+    today = datetime.now(timezone.utc).date()
+    season_start, season_end = load_season_bounds(league_id, season)
+
+    if from_date is None:
+        pending = [d for d in load_pending_fixture_dates(league_id, season, entry) if d <= today]
+        from_date = min(pending) if pending else today
+    if to_date is None:
+        to_date = today
+
+    if season_start:
+        from_date = max(from_date, season_start)
+    if season_end:
+        to_date = min(to_date, season_end)
+
+    if from_date > to_date:
+        print(f"  Nothing to refresh (window {from_date} → {to_date}).")
+        return []
+
+    params = {
+        "league": league_id,
+        "season": season,
+        "from": from_date.isoformat(),
+        "to": to_date.isoformat(),
+    }
+    if status:
+        params["status"] = status
+
+    data = client.get("fixtures", params=params)
+
+    if data is None:
+        print(f"  API error for window {from_date} → {to_date}. Skipping.")
+        return []
+
+    delta = data.get("response", [])
+    print(f"  Retrieved {len(delta)} fixtures for {from_date} → {to_date}.")
+
+    if not delta:
+        return []
+
+    # Merge into the stored season file (fixture id → latest payload)
+    stored = load_payload(entry)
+
+    fixtures = {item["fixture"]["id"]: item for item in stored.get("response", [])}
+    changed = [item for item in delta if fixtures.get(item["fixture"]["id"]) != item]
+
+    for item in delta:
+        fixtures[item["fixture"]["id"]] = item
+
+    stored["response"] = sorted(fixtures.values(), key=lambda item: item["fixture"].get("date") or "")
+    stored["results"] = len(stored["response"])
+
+    save_raw("fixtures", league_key, season, stored)
+    print(f"  Merged {len(changed)} changed fixture(s) into the {league_key} {season} season data.")
+
+    return changed
+
+
 if __name__ == "__main__":
     import argparse
 
@@ -95,6 +219,15 @@ if __name__ == "__main__":
         help="Force update even if files already exist"
     )
 
+    parser.add_argument(
+        "--live",
+        action="store_true",
+        help="Only refresh fixtures in the live window and merge them into the season file"
+    )
+
     args = parser.parse_args()
 
-    fetch_matches(league_key=args.league_key, season=args.season, force_update=args.force)
\ No newline at end of file
+    if args.live:
+        fetch_matches_delta(league_key=args.league_key, season=args.season)
+    else:
+        fetch_matches(league_key=args.league_key, season=args.season, force_update=args.force)
\ No newline at end of file
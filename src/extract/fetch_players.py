@@ -1,147 +1,165 @@
-import json
-import os
-import time
-import yaml
-from src.extract.api_client import APIClient
+from src.extract.api_client import APIClient, APIError, QuotaExceededError, get_api_client
 from src.extract.fetch_teams import fetch_teams
+from src.extract.league_config import get_league_id
+from src.extract.manifest import get_manifest
+from src.extract.player_queue import DONE, EMPTY, FAILED, MISSING_PAGE, PlayerTaskQueue, task_priority
+from src.extract.raw_store import flush_raw, load_response, save_raw
+from src.extract.team_index import get_team_index
 
-def load_league_config(path: str = "config/leagues.yaml") -> dict:
-    with open(path, "r") as f:
-        return yaml.safe_load(f)
-
-def load_settings(path: str = "config/settings.yaml") -> dict:
-    with open(path, "r") as f:
-        return yaml.safe_load(f)
-
-def fetch_players(league_key: str = "la_liga", season: int | None = None, force_update: bool = False):
+def run_player_tasks(client: APIClient, queue: PlayerTaskQueue, league_ids: dict, seasons: list | None = None) -> bool:
     """
-    Fetch player statistics for a given league.
-
-    - If season=None → fetch all seasons from APIClient.seasons
-    - If season=YYYY → fetch only that season
-    - Teams are always fetched incrementally (force_update applies only to players)
-    - Stops immediately if daily request limit is reached
-    - Saves full JSON per page
-    - Returns merged list of all players (data["response"])
+    Fetch queued player pages until the queue is empty or the daily limit is hit.
+
+    - Tasks come from PlayerTaskQueue.next_task (priority order,
+      round-robin across the leagues in `league_ids`)
+    - A fetched page 1 enqueues pages 2..N of its team
+    - Returns False when stopped by the daily limit (the current task
+      stays pending, so the next run resumes with it)
+    - Any other API failure only marks its task failed (re-queued by the
+      next plan), so the other teams and leagues keep going
     """
-
-    client = APIClient()
-    leagues_cfg = load_league_config()
-    settings = load_settings()
-
-    delay_seconds = settings.get("rate_limit", {}).get("delay_seconds", 6)
-
-    if league_key not in leagues_cfg:
-        raise ValueError(f"League key '{league_key}' not found in leagues.yaml")
-
-    league_id = leagues_cfg[league_key]["league_id"]
-
-    raw_path = "data/raw/players"
-    os.makedirs(raw_path, exist_ok=True)
-
-    all_players = []
-
-    # Determine which seasons to fetch
-    seasons_to_fetch = [season] if season else client.seasons
-
-    for s in seasons_to_fetch:
-        print(f"\n=== Fetching players for {league_key} - season {s} ===")
-
-        # Fetch teams WITHOUT forcing update
-        teams = fetch_teams(league_key=league_key, season=s, force_update=False)
-
-        if not teams:
-            print(f"  No teams found for season {s}. Skipping.")
+    served = {}
+    all_seasons = client.seasons
+
+    while True:
+        task = queue.next_task(list(league_ids), seasons, served)
+        if task is None:
+            return True
+
+        league_key, s, team_id, page = task["league_key"], task["season"], task["team_id"], task["page"]
+        print(f"    [{league_key} {s}] team {team_id}: fetching page {page}...")
+
+        params = {
+            "league": league_ids[league_key],
+            "team": team_id,
+            "season": s,
+            "page": page
+        }
+
+        # Detect daily limit (raised by APIClient before the quota is burnt)
+        try:
+            data = client.get("players", params=params)
+        except QuotaExceededError as e:
+            print(f"    Daily limit reached: {e}")
+            print("    Stopping extraction early (remaining pages stay queued).")
+            return False
+        except APIError as e:
+            print(f"    {e}. Page will be retried on the next run.")
+            served[league_key] = served.get(league_key, 0) + 1
+            queue.mark(task, FAILED)
             continue
 
-        for team in teams:
-            team_id = team["team"]["id"]
-            team_name = team["team"]["name"]
-
-            print(f"\n  Team: {team_name} ({team_id})")
+        served[league_key] = served.get(league_key, 0) + 1
 
-            page = 1
-            total_pages = None
-
-            while True:
-                file_path = os.path.join(
-                    raw_path,
-                    f"{league_key}_{s}_team_{team_id}_page_{page}.json"
-                )
-
-                # Incremental extraction for players
-                if not force_update and os.path.exists(file_path):
-                    print(f"    Skipping page {page} — already exists.")
-
-                    with open(file_path, "r") as f:
-                        existing_data = json.load(f)
+        if data is None:
+            print("    API error. Page will be retried on the next run.")
+            queue.mark(task, FAILED)
+            continue
 
-                    # Merge existing players
-                    if "response" in existing_data:
-                        all_players.extend(existing_data["response"])
+        # No more players
+        if not data.get("response", []):
+            print("    No players on this page.")
+            queue.mark(task, EMPTY)
+            continue
 
-                    # Read pagination info from existing file
-                    paging = existing_data.get("paging", {})
-                    current = paging.get("current", page)
-                    total_pages = paging.get("total", page)
+        # Save full JSON
+        save_raw("players", league_key, s, data, team_id=team_id, page=page)
+        queue.mark(task, DONE)
 
-                    # If this was the last page → stop
-                    if current >= total_pages:
-                        print(f"    All {total_pages} pages already fetched for team {team_id}.")
-                        break
+        # First page tells how many pages the team has
+        if page == 1:
+            total_pages = data.get("paging", {}).get("total", 1) or 1
+            queue.enqueue(league_key, s, [
+                (team_id, p, task_priority(s, all_seasons, MISSING_PAGE)) for p in range(2, total_pages + 1)
+            ])
 
-                    # Otherwise continue to next page
-                    page += 1
-                    continue
+def plan_player_pages(client: APIClient, queue: PlayerTaskQueue, league_key: str, seasons: list, force_update: bool = False):
+    """
+    Queue the player pages of every team of `league_key` in `seasons`.
 
-                print(f"    Fetching page {page}/{total_pages}...")
+    Rosters come from the shared TeamIndex; only league-seasons whose teams
+    were never fetched go through fetch_teams (WITHOUT forcing update).
+    """
+    index = get_team_index()
+    for s in seasons:
+        team_ids = index.team_ids(league_key, s)
+        if team_ids is None:
+            fetch_teams(league_key=league_key, season=s, force_update=False, return_data=False)
+            team_ids = index.team_ids(league_key, s)
+
+        if not team_ids:
+            print(f"  No teams found for {league_key} {s}. Skipping.")
+            continue
 
-                params = {
-                    "league": league_id,
-                    "team": team_id,
-                    "season": s,
-                    "page": page
-                }
+        pending = queue.plan(league_key, s, team_ids, client.seasons, force=force_update)
+        print(f"  {league_key} {s}: {pending} player page(s) queued.")
 
-                data = client.get("players", params=params)
+def fetch_players(league_key: str = "la_liga", season: int | None = None, force_update: bool = False, return_data: bool = True):
+    """
+    Fetch player statistics for a given league.
 
-                if data is None:
-                    print("    API error. Skipping this page.")
-                    break
+    - If season=None → fetch all seasons from APIClient.seasons
+    - If season=YYYY → fetch only that season
+    - Teams are always fetched incrementally (force_update applies only to players)
+    - Pages to fetch are planned from the extraction manifest into a durable
+      task queue (player_queue.py): current season first, missing pages of
+      partly fetched teams before new teams
+    - Stops immediately if daily request limit is reached (raises
+      QuotaExceededError); the next run resumes with the first page that
+      was not fetched
+    - Saves full JSON per page
+    - Returns merged list of all players (data["response"]);
+      return_data=False skips loading existing pages
+    """
 
-                # Detect daily limit
-                errors = data.get("errors", {})
-                if errors:
-                    print(f"    Daily limit reached: {errors}")
-                    print("    Stopping extraction early.")
-                    return all_players
+    client = get_api_client()
+    manifest = get_manifest()
+    queue = PlayerTaskQueue(manifest)
+    league_id = get_league_id(league_key)
 
-                response_items = data.get("response", [])
+    # Determine which seasons to fetch
+    seasons_to_fetch = [season] if season else client.seasons
 
-                # No more players
-                if not response_items:
-                    print("    No more players for this team.")
-                    break
+    plan_player_pages(client, queue, league_key, seasons_to_fetch, force_update)
 
-                # Save full JSON
-                with open(file_path, "w") as f:
-                    json.dump(data, f, indent=2)
+    print(f"\n=== Fetching players for {league_key} ===")
+    finished = run_player_tasks(client, queue, {league_key: league_id}, seasons_to_fetch)
+    print(f"  Queue: {queue.summary([league_key])}")
+    if not finished:
+        raise QuotaExceededError("Daily request limit reached (remaining player pages stay queued)")
 
-                all_players.extend(response_items)
+    if not return_data:
+        return []
 
-                # Determine total pages
-                if total_pages is None:
-                    total_pages = data.get("paging", {}).get("total", 1)
+    # Merge stored pages (buffered Parquet rows must reach the manifest first)
+    flush_raw()
+    all_players = []
+    for s in seasons_to_fetch:
+        for entry in manifest.entries("players", league_key, s):
+            all_players.extend(load_response(entry))
+    return all_players
 
-                if page >= total_pages:
-                    print(f"    Completed all {total_pages} pages.")
-                    break
 
-                # Respect rate limit (configurable)
-                time.sleep(delay_seconds)
-                page += 1
+def fetch_players_batch(league_keys: list, seasons: list | None = None, force_update: bool = False) -> bool:
+    """
+    Fetch player statistics for several leagues as one batch.
 
-    return all_players
+    - Pages of every league are planned first, then fetched from one queue
+      round-robin across leagues (one shared client and rate limiter)
+    - Returns False when stopped by the daily limit
+    """
+    client = get_api_client()
+    queue = PlayerTaskQueue(get_manifest())
+    league_ids = {league_key: get_league_id(league_key) for league_key in league_keys}
+    seasons_to_fetch = seasons or client.seasons
+
+    for league_key in league_keys:
+        plan_player_pages(client, queue, league_key, seasons_to_fetch, force_update)
+
+    print(f"\n=== Fetching players for {len(league_keys)} league(s) ===")
+    finished = run_player_tasks(client, queue, league_ids, seasons_to_fetch)
+    print(f"  Queue: {queue.summary(league_keys)}")
+    return finished
 
 
 if __name__ == "__main__":
@@ -1,33 +1,27 @@
-import json
-import os
-import yaml
-from src.extract.api_client import APIClient
+from src.extract.api_client import get_api_client
+from src.extract.league_config import get_league_id
+from src.extract.manifest import get_manifest
+from src.extract.raw_store import save_raw
+from src.extract.team_index import get_team_index
 
-def load_league_config(path: str = "config/leagues.yaml") -> dict:
-    with open(path, "r") as f:
-        return yaml.safe_load(f)
-
-def fetch_teams(league_key: str = "la_liga", season: int | None = None, force_update: bool = False):
+def fetch_teams(league_key: str = "la_liga", season: int | None = None, force_update: bool = False, return_data: bool = True):
     """
     Fetch teams for a given league.
 
     - If season=None → fetch all seasons from APIClient.seasons
     - If season=YYYY → fetch only that season
-    - Skips existing files unless force_update=True
+    - Skips files recorded in the extraction manifest unless force_update=True
+    - return_data=False skips loading existing payloads (only newly fetched items are returned)
     - Saves full JSON (not only response)
+    - Rosters go through the shared TeamIndex (team_index.py), so a stored
+      season is parsed at most once per process
     - Returns a merged list of all teams (data["response"])
     """
 
-    client = APIClient()
-    leagues_cfg = load_league_config()
-
-    if league_key not in leagues_cfg:
-        raise ValueError(f"League key '{league_key}' not found in leagues.yaml")
-
-    league_id = leagues_cfg[league_key]["league_id"]
-
-    raw_path = "data/raw/teams"
-    os.makedirs(raw_path, exist_ok=True)
+    client = get_api_client()
+    manifest = get_manifest()
+    index = get_team_index()
+    league_id = get_league_id(league_key)
 
     all_teams = []
 
@@ -37,15 +31,12 @@ def fetch_teams(league_key: str = "la_liga", season: int | None = None, force_up
     for s in seasons_to_fetch:
         print(f"\n=== Fetching teams for {league_key} - season {s} ===")
 
-        file_path = os.path.join(raw_path, f"{league_key}_{s}.json")
-
         # Incremental extraction
-        if not force_update and os.path.exists(file_path):
-            print(f"  Skipping season {s} — file already exists.")
-            with open(file_path, "r") as f:
-                existing_data = json.load(f)
-            if "response" in existing_data:
-                all_teams.extend(existing_data["response"])
+        entry = manifest.get("teams", league_key, s)
+        if not force_update and entry is not None:
+            print(f"  Skipping season {s} — already in manifest.")
+            if return_data:
+                all_teams.extend(index.get(league_key, s))
             continue
 
         params = {
@@ -63,8 +54,8 @@ def fetch_teams(league_key: str = "la_liga", season: int | None = None, force_up
         print(f"  Retrieved {len(response_items)} teams for season {s}.")
 
         # Save full JSON
-        with open(file_path, "w") as f:
-            json.dump(data, f, indent=2)
+        save_raw("teams", league_key, s, data)
+        index.put(league_key, s, response_items)
 
         all_teams.extend(response_items)
 
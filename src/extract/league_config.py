@@ -0,0 +1,50 @@
+import threading
+import yaml
+
+LEAGUES_PATH = "config/leagues.yaml"
+
+_shared_configs = {}
+_shared_lock = threading.Lock()
+
+
+def load_league_config(path: str = LEAGUES_PATH) -> dict:
+    """
+    Return leagues.yaml, parsed once per process.
+
+    Every extractor (and every league of a batch run) reads the same
+    dict, so treat it as read-only.
+    """
+    with _shared_lock:
+        if path not in _shared_configs:
+            with open(path, "r") as f:
+                _shared_configs[path] = yaml.safe_load(f) or {}
+        return _shared_configs[path]
+
+
+def get_league_id(league_key: str, path: str = LEAGUES_PATH) -> int:
+    leagues_cfg = load_league_config(path)
+    if league_key not in leagues_cfg:
+        raise ValueError(f"League key '{league_key}' not found in leagues.yaml")
+    return leagues_cfg[league_key]["league_id"]
+
+
+def get_league_key(league_id: int, path: str = LEAGUES_PATH) -> str | None:
+    """leagues.yaml key of an API league id (None if the league is not configured)."""
+    for league_key, cfg in load_league_config(path).items():
+        if cfg.get("league_id") == league_id:
+            return league_key
+    return None
+
+
+def resolve_league_keys(leagues, path: str = LEAGUES_PATH) -> list:
+    """'all', a comma-separated string or a list of leagues.yaml keys → list of keys."""
+    configured = list(load_league_config(path))
+    if leagues == "all":
+        return configured
+    if isinstance(leagues, str):
+        leagues = leagues.split(",")
+    keys = [key.strip() for key in leagues if key.strip()]
+    unknown = [key for key in keys if key not in configured]
+    if unknown:
+        raise ValueError(f"League key(s) not found in leagues.yaml: {', '.join(unknown)}")
+    return keys
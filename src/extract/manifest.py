@@ -0,0 +1,193 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from src.extract.utils_json import loads
+from src.transform.utils_filename import parse_generic_filename, parse_player_filename
+
+MANIFEST_PATH = "data/raw/manifest.sqlite"
+
+# Raw folder per API endpoint (same layout the fetch_* modules write to)
+RAW_DIRS = {
+    "leagues": "data/raw/leagues",
+    "fixtures": "data/raw/matches",
+    "teams": "data/raw/teams",
+    "players": "data/raw/players",
+}
+
+_shared_manifest = None
+_shared_lock = threading.Lock()
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS raw_files (
+    endpoint        TEXT    NOT NULL,
+    league_key      TEXT    NOT NULL,
+    season          INTEGER NOT NULL,
+    team_id         INTEGER NOT NULL DEFAULT 0,
+    page            INTEGER NOT NULL DEFAULT 0,
+    path            TEXT    NOT NULL,
+    fetched_at      REAL    NOT NULL,
+    paging_current  INTEGER,
+    paging_total    INTEGER,
+    results         INTEGER,
+    bytes           INTEGER,
+    sha256          TEXT,
+    PRIMARY KEY (endpoint, league_key, season, team_id, page)
+)
+"""
+
+
+class Manifest:
+    """
+    Extraction state store (SQLite) for the raw landing zone.
+
+    One row per raw file, keyed by (endpoint, league_key, season, team_id, page).
+    team_id / page are 0 for endpoints that store one file per season.
+
+    Skip decisions become index lookups instead of os.path.exists + json.load,
+    and paging totals are known without re-reading player pages.
+    """
+
+    def __init__(self, path: str = MANIFEST_PATH):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.lock = threading.Lock()
+        self.con = sqlite3.connect(path, check_same_thread=False)
+        self.con.row_factory = sqlite3.Row
+        self.con.execute("PRAGMA journal_mode=WAL")
+        self.con.execute(SCHEMA)
+        self.con.commit()
+        self.indexed = set()
+        # One lock per endpoint: callers wait for a scan in progress instead of seeing a half-built index
+        self.index_locks = {endpoint: threading.Lock() for endpoint in RAW_DIRS}
+
+    # -------------------------
+    # LOOKUPS
+    # -------------------------
+    def get(self, endpoint: str, league_key: str, season: int, team_id: int = 0, page: int = 0):
+        self.ensure_indexed(endpoint)
+        with self.lock:
+            row = self.con.execute(
+                """
+                SELECT * FROM raw_files
+                WHERE endpoint = ? AND league_key = ? AND season = ? AND team_id = ? AND page = ?
+                """,
+                (endpoint, league_key, season, team_id or 0, page or 0),
+            ).fetchone()
+        return dict(row) if row else None
+
+    def entries(self, endpoint: str, league_key: str | None = None, season: int | None = None):
+        self.ensure_indexed(endpoint)
+        query = "SELECT * FROM raw_files WHERE endpoint = ?"
+        args = [endpoint]
+        if league_key is not None:
+            query += " AND league_key = ?"
+            args.append(league_key)
+        if season is not None:
+            query += " AND season = ?"
+            args.append(season)
+        query += " ORDER BY league_key, season, team_id, page"
+
+        with self.lock:
+            rows = self.con.execute(query, args).fetchall()
+        return [dict(r) for r in rows]
+
+    def total_results(self, endpoint: str, league_key: str, seasons: list[int] | None = None) -> int:
+        """Sum of `results` over recorded files (e.g. players extracted so far)."""
+        self.ensure_indexed(endpoint)
+        query = "SELECT COALESCE(SUM(results), 0) FROM raw_files WHERE endpoint = ? AND league_key = ?"
+        args = [endpoint, league_key]
+        if seasons:
+            query += f" AND season IN ({','.join('?' for _ in seasons)})"
+            args.extend(seasons)
+
+        with self.lock:
+            return self.con.execute(query, args).fetchone()[0]
+
+    # -------------------------
+    # WRITES
+    # -------------------------
+    def record(self, endpoint: str, league_key: str, season: int, path: str, raw: bytes,
+               data: dict, team_id: int = 0, page: int = 0, fetched_at: float | None = None):
+        paging = data.get("paging", {}) or {}
+        with self.lock:
+            self.con.execute(
+                """
+                INSERT OR REPLACE INTO raw_files
+                    (endpoint, league_key, season, team_id, page, path, fetched_at,
+                     paging_current, paging_total, results, bytes, sha256)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    endpoint, league_key, season, team_id or 0, page or 0, path,
+                    fetched_at or time.time(),
+                    paging.get("current"), paging.get("total"),
+                    data.get("results", len(data.get("response", []) or [])),
+                    len(raw), hashlib.sha256(raw).hexdigest(),
+                ),
+            )
+            self.con.commit()
+
+    def ensure_indexed(self, endpoint: str):
+        """
+        Register raw files already on disk that the manifest doesn't know yet.
+
+        Runs once per endpoint per process. Only unknown files are parsed,
+        so after the first run this is a directory listing plus one query.
+        Files whose (league, season, team, page) already has a row are left
+        alone: that row may point at a Parquet segment (migrated, or newer
+        than the JSON file), which a stale JSON file must not override.
+
+        Thread-safe: concurrent callers (async extractor threads,
+        orchestrator nodes) block until the scan has finished, and the
+        endpoint only counts as indexed once it has.
+        """
+        if endpoint in self.indexed:
+            return
+        with self.index_locks[endpoint]:
+            if endpoint in self.indexed:
+                return
+            self._index_directory(endpoint)
+            self.indexed.add(endpoint)
+
+    def _index_directory(self, endpoint: str):
+        raw_dir = RAW_DIRS[endpoint]
+        if not os.path.isdir(raw_dir):
+            return
+
+        with self.lock:
+            known = {tuple(r) for r in self.con.execute(
+                "SELECT league_key, season, team_id, page FROM raw_files WHERE endpoint = ?", (endpoint,)
+            )}
+
+        for filename in sorted(os.listdir(raw_dir)):
+            if not filename.endswith(".json"):
+                continue
+
+            path = os.path.join(raw_dir, filename)
+            if endpoint == "players":
+                league_key, season, team_id, page = parse_player_filename(filename)
+            else:
+                league_key, season = parse_generic_filename(filename)
+                team_id, page = 0, 0
+
+            if (league_key, season, team_id or 0, page or 0) in known:
+                continue
+
+            with open(path, "rb") as f:
+                raw = f.read()
+
+            self.record(endpoint, league_key, season, path, raw, loads(raw),
+                        team_id=team_id, page=page or 0, fetched_at=os.path.getmtime(path))
+
+
+def get_manifest(path: str = MANIFEST_PATH) -> Manifest:
+    """Return the process-wide Manifest, creating it on first use."""
+    global _shared_manifest
+
+    with _shared_lock:
+        if _shared_manifest is None:
+            _shared_manifest = Manifest(path)
+        return _shared_manifest
+
@@ -1,12 +1,87 @@
 import argparse
+import asyncio
 from src.extract.fetch_league_data import fetch_league_data
-from src.extract.fetch_matches import fetch_matches
+from src.extract.fetch_matches import fetch_matches, fetch_matches_delta
 from src.extract.fetch_teams import fetch_teams
-from src.extract.fetch_players import fetch_players
+from src.extract.fetch_players import fetch_players_batch
+from src.extract.fetch_async import run_async_extraction
+from src.extract.api_client import QuotaExceededError
+from src.extract.league_config import resolve_league_keys
+from src.extract.response_cache import shared_cache_summary
+from src.extract.manifest import get_manifest
+from src.extract.raw_store import flush_raw
+from src.instrumentation import set_profile_stage, stage
+
+def _run_sequential(league_keys: list, seasons: list | None, force_update: bool, only: str | None,
+                    live: bool = False):
+    # None → every season in settings.yaml (the fetchers' default)
+    season_args = seasons or [None]
 
-def run_pipeline(league_key: str, season: int | None, force_update: bool, only: str | None):
+    # 1) LEAGUE DATA
+    if only is None or only == "league":
+        print("\n>>> Extracting LEAGUE data")
+        for league_key in league_keys:
+            with stage("extract.league", league=league_key):
+                for season in season_args:
+                    fetch_league_data(
+                        league_key=league_key,
+                        season=season,
+                        force_update=force_update,
+                        return_data=False
+                    )
+
+    # 2) MATCHES (live mode only refreshes the current window of the season)
+    if (only is None or only == "matches") and live:
+        print("\n>>> Refreshing LIVE MATCHES")
+        for league_key in league_keys:
+            with stage("extract.matches", league=league_key, live=True):
+                for season in season_args:
+                    fetch_matches_delta(league_key=league_key, season=season)
+    elif only is None or only == "matches":
+        print("\n>>> Extracting MATCHES")
+        for league_key in league_keys:
+            with stage("extract.matches", league=league_key):
+                for season in season_args:
+                    fetch_matches(
+                        league_key=league_key,
+                        season=season,
+                        force_update=force_update,
+                        return_data=False
+                    )
+
+    # 3) TEAMS
+    if only is None or only == "teams":
+        print("\n>>> Extracting TEAMS")
+        for league_key in league_keys:
+            with stage("extract.teams", league=league_key):
+                for season in season_args:
+                    fetch_teams(
+                        league_key=league_key,
+                        season=season,
+                        force_update=force_update,
+                        return_data=False
+                    )
+
+    # Make buffered raw responses visible in the manifest before players look up teams
+    flush_raw()
+
+    # 4) PLAYERS (one queue for every league, fetched round-robin)
+    if only is None or only == "players":
+        print("\n>>> Extracting PLAYERS")
+        with stage("extract.players", leagues=",".join(league_keys)):
+            if not fetch_players_batch(league_keys, seasons, force_update):
+                # Stops the run like any other quota stop (pages stay queued)
+                raise QuotaExceededError("Daily request limit reached (remaining player pages stay queued)")
+
+        for league_key in league_keys:
+            total_players = get_manifest().total_results("players", league_key, seasons)
+            print(f"\n>>> Total players extracted so far ({league_key}): {total_players}")
+
+
+def run_pipeline(leagues, seasons, force_update: bool, only: str | None,
+                 use_async: bool = False, live: bool = False):
     """
-    Orchestrates the full Extract pipeline.
+    Orchestrates the full Extract pipeline for one or more leagues.
 
     Steps:
     1. Fetch league metadata
@@ -14,51 +89,52 @@ def run_pipeline(league_key: str, season: int | None, force_update: bool, only:
     3. Fetch teams
     4. Fetch players
 
+    `leagues` is a leagues.yaml key, a list / comma-separated string of keys
+    or "all"; `seasons` a season, a list of seasons or None (every season
+    in settings.yaml). All leagues run as one batch: one API client, one
+    parsed leagues.yaml, player pages fetched round-robin across leagues.
+
     The `only` parameter allows running a specific extractor.
+    With `use_async=True`, requests are issued concurrently across seasons,
+    teams, pages and leagues (see src/extract/fetch_async.py).
+    With `live=True`, matches are refreshed incrementally for the live season
+    (date window / non-final statuses) instead of pulled per season.
+    Every step is timed (wall / CPU / RSS / API calls) into the
+    instrumentation log, see src/instrumentation.py.
     """
 
+    league_keys = resolve_league_keys(leagues)
+    if isinstance(seasons, int):
+        seasons = [seasons]
+
     print("\n==============================")
     print("      GLOBAL EXTRACTION")
     print("==============================\n")
-
-    # 1) LEAGUE DATA
-    if only is None or only == "league":
-        print("\n>>> Extracting LEAGUE data")
-        fetch_league_data(
-            league_key=league_key,
-            season=season,
-            force_update=force_update
-        )
-
-    # 2) MATCHES
-    if only is None or only == "matches":
-        print("\n>>> Extracting MATCHES")
-        fetch_matches(
-            league_key=league_key,
-            season=season,
-            force_update=force_update
-        )
-
-    # 3) TEAMS
-    if only is None or only == "teams":
-        print("\n>>> Extracting TEAMS")
-        fetch_teams(
-            league_key=league_key,
-            season=season,
-            force_update=force_update
-        )
-
-    # 4) PLAYERS
-    if only is None or only == "players":
-        print("\n>>> Extracting PLAYERS")
-        players = fetch_players(
-            league_key=league_key,
-            season=season,
-            force_update=force_update
-        )
-
-        # If daily limit was hit, players extractor returns early
-        print(f"\n>>> Total players extracted so far: {len(players)}")
+    print(f">>> {len(league_keys)} league(s): {', '.join(league_keys)}")
+
+    try:
+        with stage("extract", leagues=",".join(league_keys), mode="async" if use_async else "sequential"):
+            if use_async:
+                asyncio.run(run_async_extraction(
+                    league_keys=league_keys,
+                    seasons=seasons,
+                    force_update=force_update,
+                    only=only,
+                    live=live
+                ))
+            else:
+                _run_sequential(league_keys, seasons, force_update, only, live)
+    except QuotaExceededError as e:
+        # Remaining work is picked up incrementally on the next run
+        print(f"\n>>> Quota exhausted: {e}")
+        print(">>> Stopping extraction early.")
+    finally:
+        # Parquet raw backend buffers responses; make sure they land on disk
+        flush_raw()
+
+    cache_summary = shared_cache_summary()
+    if cache_summary:
+        print(f"\n>>> Response {cache_summary}")
 
     print("\n==============================")
     print("      EXTRACTION COMPLETE")
@@ -69,15 +145,17 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Run the full extraction pipeline")
 
     parser.add_argument(
-        "--league",
+        "--league", "--leagues",
+        dest="leagues",
         default="la_liga",
-        help="League key from leagues.yaml (default: la_liga)"
+        help="League key(s) from leagues.yaml, comma-separated, or 'all' (default: la_liga)"
     )
 
     parser.add_argument(
-        "--season",
-        type=int,
-        help="Specific season to fetch (optional)"
+        "--season", "--seasons",
+        dest="seasons",
+        type=lambda value: [int(s) for s in value.split(",")],
+        help="Season(s) to fetch, comma-separated (default: all in settings.yaml)"
     )
 
     parser.add_argument(
@@ -92,11 +170,33 @@ if __name__ == "__main__":
         help="Run only a specific extractor"
     )
 
+    parser.add_argument(
+        "--async",
+        dest="use_async",
+        action="store_true",
+        help="Issue requests concurrently (rate limited by the shared token bucket)"
+    )
+
+    parser.add_argument(
+        "--live",
+        action="store_true",
+        help="Refresh only live-season fixtures (date window / non-final statuses)"
+    )
+
+    parser.add_argument(
+        "--profile",
+        metavar="STAGE",
+        help="Profile one stage, e.g. extract.players (cProfile or pyinstrument, see settings.yaml)"
+    )
+
     args = parser.parse_args()
 
+    set_profile_stage(args.profile)
     run_pipeline(
-        league_key=args.league,
-        season=args.season,
+        leagues=args.leagues,
+        seasons=args.seasons,
         force_update=args.force,
-        only=args.only
+        only=args.only,
+        use_async=args.use_async,
+        live=args.live
     )
\ No newline at end of file
@@ -0,0 +1,196 @@
+import time
+from src.extract.manifest import get_manifest
+from src.extract.raw_store import flush_raw
+
+TASKS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS player_tasks (
+    league_key  TEXT    NOT NULL,
+    season      INTEGER NOT NULL,
+    team_id     INTEGER NOT NULL,
+    page        INTEGER NOT NULL,
+    priority    INTEGER NOT NULL,
+    status      TEXT    NOT NULL DEFAULT 'pending',
+    attempts    INTEGER NOT NULL DEFAULT 0,
+    updated_at  REAL,
+    PRIMARY KEY (league_key, season, team_id, page)
+)
+"""
+
+# Task statuses: pending → done (page stored) | empty (no players) | failed (retried next run)
+PENDING, DONE, EMPTY, FAILED = "pending", "done", "empty", "failed"
+
+# Priority classes within a season (lower runs first): finishing a team whose
+# first page is stored beats discovering a new team
+MISSING_PAGE = 0
+NEW_TEAM = 1
+
+
+def task_priority(season: int, seasons: list, kind: int) -> int:
+    """
+    Lower runs first: current (latest configured) season, then newer
+    seasons before older ones; within a season, missing pages first.
+    """
+    by_recency = sorted(seasons, reverse=True)
+    rank = by_recency.index(season) if season in by_recency else len(by_recency)
+    return rank * 2 + kind
+
+
+class PlayerTaskQueue:
+    """
+    Durable work queue of player pages, stored next to the manifest
+    (same SQLite file).
+
+    - One task per (league_key, season, team_id, page)
+    - Planning only reads the manifest index (no raw files, no API calls)
+    - Tasks are claimed in priority order, round-robin across leagues so
+      the daily quota is spread over all of them
+    - Statuses survive the process: a run stopped by the daily limit
+      resumes with the exact task it could not fetch
+    """
+
+    def __init__(self, manifest=None):
+        self.manifest = manifest or get_manifest()
+        self.con = self.manifest.con
+        self.lock = self.manifest.lock
+        with self.lock:
+            self.con.execute(TASKS_SCHEMA)
+            self.con.commit()
+
+    # -------------------------
+    # PLANNING
+    # -------------------------
+    def plan(self, league_key: str, season: int, team_ids: list, seasons: list, force: bool = False) -> int:
+        """
+        Enqueue the pages of a league-season that are not stored yet.
+
+        - Teams without page 1 in the manifest → page 1 (pages 2..N are
+          added once page 1 tells how many there are)
+        - Teams with page 1 → every missing page up to paging_total
+        - Pages stored by another path (e.g. the async extractor) are
+          marked done; failed tasks are retried
+        - Tasks marked done whose page never reached the manifest (process
+          killed before a buffered Parquet segment was flushed) are
+          re-queued
+        - force=True re-queues every known page
+
+        Returns the number of pending tasks for the league-season.
+        """
+        # Pages buffered by this process must be in the manifest before it is compared with the queue
+        flush_raw()
+        stored = {(e["team_id"], e["page"]): e for e in self.manifest.entries("players", league_key, season)}
+
+        tasks = []
+        for team_id in team_ids:
+            first = stored.get((team_id, 1))
+            if first is None or force:
+                tasks.append((team_id, 1, task_priority(season, seasons, NEW_TEAM)))
+            total_pages = (first or {}).get("paging_total") or 1
+            for page in range(2, total_pages + 1):
+                if (team_id, page) not in stored or force:
+                    tasks.append((team_id, page, task_priority(season, seasons, MISSING_PAGE)))
+
+        self.enqueue(league_key, season, tasks, reset=force)
+
+        with self.lock:
+            if not force:
+                self.con.executemany(
+                    f"""
+                    UPDATE player_tasks SET status = '{DONE}', updated_at = ?
+                    WHERE league_key = ? AND season = ? AND team_id = ? AND page = ? AND status != '{DONE}'
+                    """,
+                    [(time.time(), league_key, season, team_id, page) for team_id, page in stored],
+                )
+            self.con.execute(
+                f"UPDATE player_tasks SET status = '{PENDING}' WHERE league_key = ? AND season = ? AND status = '{FAILED}'",
+                (league_key, season),
+            )
+            done = self.con.execute(
+                f"SELECT team_id, page FROM player_tasks WHERE league_key = ? AND season = ? AND status = '{DONE}'",
+                (league_key, season),
+            ).fetchall()
+            lost = [(team_id, page) for team_id, page in done if (team_id, page) not in stored]
+            if lost:
+                print(f"  {league_key} {season}: {len(lost)} page(s) marked done but not stored, re-queued.")
+                self.con.executemany(
+                    f"""
+                    UPDATE player_tasks SET status = '{PENDING}', updated_at = ?
+                    WHERE league_key = ? AND season = ? AND team_id = ? AND page = ?
+                    """,
+                    [(time.time(), league_key, season, team_id, page) for team_id, page in lost],
+                )
+            self.con.commit()
+            return self.con.execute(
+                f"SELECT count(*) FROM player_tasks WHERE league_key = ? AND season = ? AND status = '{PENDING}'",
+                (league_key, season),
+            ).fetchone()[0]
+
+    def enqueue(self, league_key: str, season: int, tasks: list, reset: bool = False):
+        """Add (team_id, page, priority) tasks; existing tasks keep their status unless `reset`."""
+        status_update = f"status = '{PENDING}', " if reset else ""
+        with self.lock:
+            self.con.executemany(
+                f"""
+                INSERT INTO player_tasks (league_key, season, team_id, page, priority, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (league_key, season, team_id, page)
+                DO UPDATE SET {status_update}priority = excluded.priority
+                """,
+                [(league_key, season, team_id, page, priority, time.time()) for team_id, page, priority in tasks],
+            )
+            self.con.commit()
+
+    # -------------------------
+    # EXECUTION
+    # -------------------------
+    def next_task(self, league_keys: list | None = None, seasons: list | None = None,
+                  served: dict | None = None) -> dict | None:
+        """
+        Highest-priority pending task, taken from the league that has been
+        served least so far in this run (`served`: {league_key: requests}).
+        """
+        query = f"""
+            SELECT * FROM (
+                SELECT *, row_number() OVER (
+                    PARTITION BY league_key ORDER BY priority, season DESC, team_id, page
+                ) AS league_rank
+                FROM player_tasks
+                WHERE status = '{PENDING}'
+        """
+        args = []
+        if league_keys:
+            query += f" AND league_key IN ({','.join('?' for _ in league_keys)})"
+            args.extend(league_keys)
+        if seasons:
+            query += f" AND season IN ({','.join('?' for _ in seasons)})"
+            args.extend(seasons)
+        query += ") WHERE league_rank = 1"
+
+        with self.lock:
+            heads = [dict(r) for r in self.con.execute(query, args).fetchall()]
+        if not heads:
+            return None
+
+        served = served or {}
+        return min(heads, key=lambda t: (served.get(t["league_key"], 0), t["priority"], t["league_key"]))
+
+    def mark(self, task: dict, status: str):
+        with self.lock:
+            self.con.execute(
+                """
+                UPDATE player_tasks SET status = ?, attempts = attempts + 1, updated_at = ?
+                WHERE league_key = ? AND season = ? AND team_id = ? AND page = ?
+                """,
+                (status, time.time(), task["league_key"], task["season"], task["team_id"], task["page"]),
+            )
+            self.con.commit()
+
+    def summary(self, league_keys: list | None = None) -> dict:
+        """{status: count} over the queue (optionally for some leagues)."""
+        query = "SELECT status, count(*) FROM player_tasks"
+        args = []
+        if league_keys:
+            query += f" WHERE league_key IN ({','.join('?' for _ in league_keys)})"
+            args.extend(league_keys)
+        query += " GROUP BY status"
+        with self.lock:
+            return dict(self.con.execute(query, args).fetchall())
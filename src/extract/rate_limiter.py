@@ -0,0 +1,139 @@
+import threading
+import time
+
+_shared_limiter = None
+_shared_quota = None
+_shared_lock = threading.Lock()
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket limiter.
+
+    - rate: tokens refilled per second
+    - capacity: maximum burst size (tokens available at once)
+    - acquire() blocks until a token is available, so it can be called
+      from worker threads spawned by the async extraction engine.
+    """
+
+    def __init__(self, rate: float, capacity: int = 1):
+        if rate <= 0:
+            raise ValueError("Token bucket rate must be positive")
+
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self.tokens = float(self.capacity)
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        elapsed = max(0.0, now - self.updated_at)
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+        self.updated_at = max(self.updated_at, now)
+
+    def pause(self, seconds: float):
+        """Stop handing out tokens for `seconds` (e.g. per-minute quota exhausted)."""
+        with self.lock:
+            self.tokens = 0.0
+            self.updated_at = max(self.updated_at, time.monotonic() + seconds)
+
+    def acquire(self, tokens: int = 1):
+        while True:
+            with self.lock:
+                self._refill()
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+
+                # While paused, updated_at lies in the future: wait it out first
+                paused_for = max(0.0, self.updated_at - time.monotonic())
+                wait = paused_for + (tokens - self.tokens) / self.rate
+
+            time.sleep(wait)
+
+
+def build_rate_limiter(settings: dict) -> TokenBucket:
+    """
+    Build a TokenBucket from the `rate_limit` section of settings.yaml.
+
+    - requests_per_minute → refill rate (falls back to 1 / delay_seconds)
+    - burst → bucket capacity (default 1)
+    """
+    rate_cfg = settings.get("rate_limit", {}) or {}
+
+    requests_per_minute = rate_cfg.get("requests_per_minute")
+    if requests_per_minute:
+        rate = requests_per_minute / 60
+    else:
+        rate = 1 / rate_cfg.get("delay_seconds", 6)
+
+    return TokenBucket(rate=rate, capacity=rate_cfg.get("burst", 1))
+
+
+def get_rate_limiter(settings: dict) -> TokenBucket:
+    """
+    Return the process-wide limiter, creating it on first use.
+
+    Every APIClient in the process shares this bucket, so the aggregate
+    request rate stays inside the plan quota no matter how many clients
+    or concurrent tasks are issuing requests.
+    """
+    global _shared_limiter
+
+    with _shared_lock:
+        if _shared_limiter is None:
+            _shared_limiter = build_rate_limiter(settings)
+        return _shared_limiter
+
+
+class QuotaTracker:
+    """
+    Process-wide view of the plan quota, fed from API response headers.
+
+    - daily_limit / daily_remaining ← x-ratelimit-requests-limit / -remaining
+    - minute_remaining ← X-RateLimit-Remaining
+    - daily_reserve: requests kept in hand; once remaining drops to this
+      value, the quota is treated as exhausted before the next call.
+    """
+
+    def __init__(self, daily_reserve: int = 0):
+        self.daily_reserve = daily_reserve
+        self.daily_limit = None
+        self.daily_remaining = None
+        self.minute_remaining = None
+        self.lock = threading.Lock()
+
+    def update(self, headers):
+        with self.lock:
+            self.daily_limit = _int_header(headers, "x-ratelimit-requests-limit", self.daily_limit)
+            self.daily_remaining = _int_header(headers, "x-ratelimit-requests-remaining", self.daily_remaining)
+            self.minute_remaining = _int_header(headers, "x-ratelimit-remaining", self.minute_remaining)
+
+    def mark_exhausted(self):
+        with self.lock:
+            self.daily_remaining = 0
+
+    def daily_exhausted(self) -> bool:
+        with self.lock:
+            return self.daily_remaining is not None and self.daily_remaining <= self.daily_reserve
+
+
+def _int_header(headers, name: str, default):
+    # requests' CaseInsensitiveDict makes the lookup case-insensitive
+    value = headers.get(name)
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def get_quota_tracker(settings: dict) -> QuotaTracker:
+    """Return the process-wide QuotaTracker, creating it on first use."""
+    global _shared_quota
+
+    with _shared_lock:
+        if _shared_quota is None:
+            reserve = (settings.get("rate_limit", {}) or {}).get("daily_reserve", 0)
+            _shared_quota = QuotaTracker(daily_reserve=reserve)
+        return _shared_quota
@@ -0,0 +1,396 @@
+import atexit
+import json
+import os
+import threading
+import time
+import uuid
+import pyarrow as pa
+import pyarrow.parquet as pq
+import yaml
+from src.extract.manifest import RAW_DIRS, get_manifest
+from src.extract.utils_json import load_file, loads
+from src.instrumentation import file_stage
+
+SETTINGS_PATH = "config/settings.yaml"
+
+# Columns of a raw Parquet segment: manifest key + the untouched API payload
+SEGMENT_SCHEMA = pa.schema([
+    ("endpoint", pa.string()),
+    ("league_key", pa.string()),
+    ("season", pa.int32()),
+    ("team_id", pa.int64()),
+    ("page", pa.int32()),
+    ("fetched_at", pa.float64()),
+    ("payload", pa.string()),
+])
+
+_shared_store = None
+_shared_lock = threading.Lock()
+
+
+def load_raw_settings(path: str = SETTINGS_PATH) -> dict:
+    with open(path, "r") as f:
+        settings = yaml.safe_load(f)
+    return settings.get("raw_storage", {}) or {}
+
+
+def raw_json_path(endpoint: str, league_key: str, season: int, team_id: int = 0, page: int = 0) -> str:
+    """File path used by the JSON backend (same layout the extractors always wrote)."""
+    if endpoint == "players":
+        filename = f"{league_key}_{season}_team_{team_id}_page_{page}.json"
+    else:
+        filename = f"{league_key}_{season}.json"
+    return os.path.join(RAW_DIRS[endpoint], filename)
+
+
+class JsonRawStore:
+    """
+    Original landing zone: one pretty-printed JSON file per season / player page.
+    """
+
+    backend = "json"
+
+    def save(self, endpoint: str, league_key: str, season: int, data: dict, team_id: int = 0, page: int = 0):
+        path = raw_json_path(endpoint, league_key, season, team_id, page)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        raw = json.dumps(data, indent=2).encode("utf-8")
+        with open(path, "wb") as f:
+            f.write(raw)
+
+        get_manifest().record(endpoint, league_key, season, path, raw, data, team_id=team_id, page=page)
+
+    @staticmethod
+    def load(entry: dict) -> dict:
+        with file_stage(f"read.{entry['endpoint']}", path=entry["path"]):
+            return load_file(entry["path"])
+
+    def iter_raw(self, endpoint: str):
+        """Yield (entry, data) for every raw file of an endpoint."""
+        for entry in get_manifest().entries(endpoint):
+            yield entry, load_payload(entry)
+
+    def flush(self) -> list:
+        return []
+
+
+class ParquetRawStore:
+    """
+    Compressed, append-friendly landing zone.
+
+    - Responses are buffered and flushed as zstd-compressed Parquet segments:
+      data/raw_parquet/{endpoint}/segment-{timestamp}-{id}.parquet
+    - Each row keeps the manifest key columns next to the compact JSON payload.
+    - A key written twice (e.g. a live fixtures merge) lives in two segments;
+      the manifest points at the latest one, which is the one readers use.
+    - Buffered rows are recorded in the manifest when their segment is written.
+    - Each row is also appended (and fsynced) to the batch's spool,
+      {endpoint}/spool-{id}.jsonl, before save() returns; the spool is removed
+      once its segment is written. Spools left by a killed process are
+      compacted into a segment the next time the store is opened.
+    """
+
+    backend = "parquet"
+
+    def __init__(self, root: str = "data/raw_parquet", compression: str = "zstd",
+                 compression_level: int | None = None, batch_size: int = 100):
+        self.root = root
+        self.compression = compression
+        self.compression_level = compression_level
+        self.batch_size = batch_size
+        self.buffers = {}
+        self.spools = {}  # endpoint → (path, open file) of the batch being buffered
+        self.lock = threading.Lock()
+        self.recover_spools()
+        atexit.register(self.flush)
+
+    def save(self, endpoint: str, league_key: str, season: int, data: dict, team_id: int = 0, page: int = 0,
+             fetched_at: float | None = None) -> str | None:
+        """Buffer a response; returns the segment path when this save completed a batch."""
+        row = {
+            "endpoint": endpoint,
+            "league_key": league_key,
+            "season": season,
+            "team_id": team_id or 0,
+            "page": page or 0,
+            "fetched_at": fetched_at or time.time(),
+            "payload": json.dumps(data, separators=(",", ":")),
+        }
+
+        with self.lock:
+            # A paid page is on disk before save() returns, even if the process dies before the segment is written
+            if endpoint not in self.spools:
+                folder = os.path.join(self.root, endpoint)
+                os.makedirs(folder, exist_ok=True)
+                spool_path = os.path.join(folder, f"spool-{uuid.uuid4().hex[:8]}.jsonl")
+                self.spools[endpoint] = (spool_path, open(spool_path, "a", encoding="utf-8"))
+            spool_path, spool = self.spools[endpoint]
+            spool.write(json.dumps(row, separators=(",", ":")) + "\n")
+            spool.flush()
+            os.fsync(spool.fileno())
+
+            buffer = self.buffers.setdefault(endpoint, [])
+            buffer.append((row, data))
+            if len(buffer) < self.batch_size:
+                return None
+            self.buffers[endpoint] = []
+            self.spools.pop(endpoint)
+            spool.close()
+
+        return self._write_segment(endpoint, buffer, spool_path)
+
+    def flush(self) -> list:
+        """Write every buffered batch; returns the paths of the segments written."""
+        with self.lock:
+            pending = {endpoint: rows for endpoint, rows in self.buffers.items() if rows}
+            spools = self.spools
+            self.buffers = {}
+            self.spools = {}
+
+        for _, spool in spools.values():
+            spool.close()
+        return [self._write_segment(endpoint, rows, spools[endpoint][0]) for endpoint, rows in pending.items()]
+
+    def recover_spools(self):
+        """Compact spools left behind by a process that died before writing their segment."""
+        if not os.path.isdir(self.root):
+            return
+
+        for endpoint in sorted(os.listdir(self.root)):
+            folder = os.path.join(self.root, endpoint)
+            if not os.path.isdir(folder):
+                continue
+            for filename in sorted(os.listdir(folder)):
+                if not (filename.startswith("spool-") and filename.endswith(".jsonl")):
+                    continue
+
+                spool_path = os.path.join(folder, filename)
+                rows = []
+                with open(spool_path, "r", encoding="utf-8") as f:
+                    for line in f:
+                        try:
+                            row = json.loads(line)
+                        except ValueError:
+                            break  # torn last line: that save() never returned
+                        rows.append((row, loads(row["payload"])))
+
+                if rows:
+                    self._write_segment(endpoint, rows, spool_path)
+                    print(f"  Recovered {len(rows)} buffered {endpoint} response(s) from {spool_path}")
+                else:
+                    os.remove(spool_path)
+
+    def _write_segment(self, endpoint: str, rows: list, spool_path: str | None = None) -> str:
+        folder = os.path.join(self.root, endpoint)
+        os.makedirs(folder, exist_ok=True)
+
+        path = os.path.join(folder, f"segment-{time.strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}.parquet")
+        table = pa.Table.from_pylist([row for row, _ in rows], schema=SEGMENT_SCHEMA)
+
+        # Write-then-rename so readers never see a half-written segment
+        tmp_path = f"{path}.tmp"
+        pq.write_table(table, tmp_path, compression=self.compression,
+                       compression_level=self.compression_level)
+        os.replace(tmp_path, path)
+
+        manifest = get_manifest()
+        for row, data in rows:
+            manifest.record(endpoint, row["league_key"], row["season"], path,
+                            row["payload"].encode("utf-8"), data,
+                            team_id=row["team_id"], page=row["page"], fetched_at=row["fetched_at"])
+
+        # The rows are in the segment and the manifest: the spool has served its purpose
+        if spool_path is not None and os.path.exists(spool_path):
+            os.remove(spool_path)
+        return path
+
+    @staticmethod
+    def load(entry: dict) -> dict:
+        with file_stage(f"read.{entry['endpoint']}", path=entry["path"]):
+            table = pq.read_table(
+                entry["path"],
+                columns=["payload"],
+                filters=[
+                    ("league_key", "=", entry["league_key"]),
+                    ("season", "=", entry["season"]),
+                    ("team_id", "=", entry["team_id"]),
+                    ("page", "=", entry["page"]),
+                ],
+            )
+            # Several versions of a key can share a segment: the last one wins
+            return loads(table.column("payload")[-1].as_py())
+
+    def iter_raw(self, endpoint: str):
+        """
+        Yield (entry, data) for the latest version of every key, streaming
+        one segment (and one row group) at a time.
+
+        Per-file records (instrumentation.files) time the reads of the
+        segment, not the consumer working between two yields.
+        """
+        by_segment = {}
+        for entry in get_manifest().entries(endpoint):
+            # Files not migrated yet are still served from the JSON tree
+            if entry["path"].endswith(".json"):
+                yield entry, JsonRawStore.load(entry)
+                continue
+
+            key = (entry["league_key"], entry["season"], entry["team_id"], entry["page"])
+            by_segment.setdefault(entry["path"], {})[key] = entry
+
+        for path, wanted in sorted(by_segment.items()):
+            # Keep only the last occurrence of each key within the segment
+            last_rows = {}
+            with file_stage(f"read.{endpoint}", path=path, columns="keys"):
+                parquet_file = pq.ParquetFile(path)
+                keys = parquet_file.read(columns=["league_key", "season", "team_id", "page"]).to_pydict()
+            for i, key in enumerate(zip(keys["league_key"], keys["season"], keys["team_id"], keys["page"])):
+                last_rows[key] = i
+
+            offset = 0
+            for row_group in range(parquet_file.num_row_groups):
+                with file_stage(f"read.{endpoint}", path=path, row_group=row_group):
+                    columns = parquet_file.read_row_group(row_group).to_pydict()
+                num_rows = len(columns["payload"])
+                for i in range(num_rows):
+                    key = (columns["league_key"][i], columns["season"][i], columns["team_id"][i], columns["page"][i])
+                    if key in wanted and last_rows.get(key) == offset + i:
+                        yield wanted[key], loads(columns["payload"][i])
+                offset += num_rows
+
+
+def get_raw_store():
+    """Return the process-wide raw store configured in settings.yaml (raw_storage)."""
+    global _shared_store
+
+    with _shared_lock:
+        if _shared_store is None:
+            cfg = load_raw_settings()
+            if cfg.get("backend", "json") == "parquet":
+                _shared_store = ParquetRawStore(
+                    root=cfg.get("path", "data/raw_parquet"),
+                    compression=cfg.get("compression", "zstd"),
+                    compression_level=cfg.get("compression_level"),
+                    batch_size=cfg.get("batch_size", 100),
+                )
+            else:
+                _shared_store = JsonRawStore()
+        return _shared_store
+
+
+# -------------------------
+# CONVENIENCE API (used by extractors and transforms)
+# -------------------------
+def save_raw(endpoint: str, league_key: str, season: int, data: dict, team_id: int = 0, page: int = 0):
+    """Persist a raw API response with the configured backend."""
+    get_raw_store().save(endpoint, league_key, season, data, team_id=team_id, page=page)
+
+
+def load_payload(entry: dict) -> dict:
+    """Full raw JSON for a manifest entry (file or Parquet segment)."""
+    if entry["path"].endswith(".json"):
+        return JsonRawStore.load(entry)
+    return ParquetRawStore.load(entry)
+
+
+def load_payloads(entries: list):
+    """
+    Yield (entry, data) for a list of manifest entries, reading each
+    Parquet segment only once (used by parallel transform workers).
+    """
+    by_path = {}
+    for entry in entries:
+        by_path.setdefault(entry["path"], []).append(entry)
+
+    for path, group in by_path.items():
+        if path.endswith(".json"):
+            for entry in group:
+                yield entry, JsonRawStore.load(entry)
+            continue
+
+        with file_stage(f"read.{group[0]['endpoint']}", path=path):
+            columns = pq.read_table(path, columns=["league_key", "season", "team_id", "page", "payload"]).to_pydict()
+        payloads = {}
+        for i, payload in enumerate(columns["payload"]):
+            key = (columns["league_key"][i], columns["season"][i], columns["team_id"][i], columns["page"][i])
+            payloads[key] = payload  # last version in the segment wins
+
+        for entry in group:
+            key = (entry["league_key"], entry["season"], entry["team_id"], entry["page"])
+            yield entry, loads(payloads[key])
+
+
+def load_response(entry: dict) -> list:
+    """The `response` list of a manifest entry (only for callers that need payloads)."""
+    return load_payload(entry).get("response", [])
+
+
+def iter_raw(endpoint: str):
+    """Stream (entry, data) pairs for an endpoint from the configured backend."""
+    return get_raw_store().iter_raw(endpoint)
+
+
+def flush_raw():
+    """Write any buffered raw responses (no-op for the JSON backend)."""
+    get_raw_store().flush()
+
+
+# -------------------------
+# MIGRATION
+# -------------------------
+def migrate_json_tree(delete_json: bool = False, batch_size: int = 500):
+    """
+    Convert the existing data/raw/* JSON tree into Parquet segments.
+
+    - Reads every manifest entry that still points at a .json file
+    - Writes them in large segments (batch_size rows) per endpoint
+    - Re-points the manifest at the segments
+    - Optionally deletes the migrated JSON files
+    """
+    cfg = load_raw_settings()
+    store = ParquetRawStore(
+        root=cfg.get("path", "data/raw_parquet"),
+        compression=cfg.get("compression", "zstd"),
+        compression_level=cfg.get("compression_level"),
+        batch_size=batch_size,
+    )
+    manifest = get_manifest()
+
+    for endpoint in RAW_DIRS:
+        entries = [e for e in manifest.entries(endpoint) if e["path"].endswith(".json")]
+        if not entries:
+            continue
+
+        json_bytes = 0
+        segments = []
+        for entry in entries:
+            json_bytes += entry["bytes"] or 0
+            segment = store.save(endpoint, entry["league_key"], entry["season"], JsonRawStore.load(entry),
+                                 team_id=entry["team_id"], page=entry["page"], fetched_at=entry["fetched_at"])
+            if segment is not None:
+                segments.append(segment)
+        segments.extend(store.flush())
+
+        # Only the segments written by this migration (the folder may hold older ones)
+        segment_bytes = sum(os.path.getsize(path) for path in segments)
+        print(f"  {endpoint}: {len(entries)} files, {json_bytes} B JSON → {segment_bytes} B Parquet")
+
+        if delete_json:
+            for entry in entries:
+                os.remove(entry["path"])
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Raw landing zone utilities")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    migrate_parser = subparsers.add_parser("migrate", help="Convert data/raw/* JSON files to Parquet segments")
+    migrate_parser.add_argument("--delete-json", action="store_true", help="Remove JSON files once migrated")
+    migrate_parser.add_argument("--batch-size", type=int, default=500, help="Rows per Parquet segment")
+
+    args = parser.parse_args()
+
+    if args.command == "migrate":
+        migrate_json_tree(delete_json=args.delete_json, batch_size=args.batch_size)
@@ -0,0 +1,222 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from src.extract.league_config import get_league_key
+from src.extract.manifest import get_manifest
+from src.extract.raw_store import load_payload
+from src.extract.utils_json import loads
+
+# Params of requests that map 1:1 to a raw file (endpoint, league, season, team, page)
+RAW_PARAMS = {"id", "league", "season", "team", "page"}
+
+_shared_cache = None
+_shared_lock = threading.Lock()
+
+
+class ResponseCache:
+    """
+    Persistent on-disk cache for API responses, used inside APIClient.get.
+
+    - Entries are keyed by endpoint + sorted params and stored as
+      data/cache/{endpoint}/{key}.json. A request that maps to a raw file
+      (league / season / team / page params) only stores metadata: the body
+      is read back from the raw store through the manifest, and is only
+      served if its content hash still matches. Other requests (e.g.
+      date windows) keep their body in the entry.
+    - TTLs are configured per endpoint (cache.ttl_seconds). Requests for a
+      season before `current_season` never expire: finished seasons don't change.
+    - Stale entries carrying ETag / Last-Modified validators are revalidated
+      with a conditional request; a 304 refreshes the entry without a new body.
+    - Counters (hits, misses, stale, revalidated, bytes) are kept for the whole process.
+    """
+
+    def __init__(self, cache_dir: str, ttl_seconds: dict, current_season: int | None):
+        self.cache_dir = cache_dir
+        self.ttl_seconds = ttl_seconds or {}
+        self.current_season = current_season
+        self.lock = threading.Lock()
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "stale": 0,
+            "revalidated": 0,
+            "stored": 0,
+            "bytes_read": 0,
+            "bytes_written": 0,
+        }
+
+    # -------------------------
+    # KEYS / PATHS
+    # -------------------------
+    @staticmethod
+    def make_key(endpoint: str, params: dict | None) -> str:
+        payload = json.dumps({"endpoint": endpoint, "params": params or {}}, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _path(self, endpoint: str, key: str) -> str:
+        return os.path.join(self.cache_dir, endpoint, f"{key}.json")
+
+    @staticmethod
+    def body_hash(body: dict) -> str:
+        """Content hash of a payload, independent of how the raw store serialized it."""
+        canonical = json.dumps(body, sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def raw_key(endpoint: str, params: dict | None) -> dict | None:
+        """Manifest key of the raw file a request lands in (None if it has no single one)."""
+        params = params or {}
+        if not params or not set(params) <= RAW_PARAMS or "season" not in params:
+            return None
+        league_id = params.get("league", params.get("id"))
+        league_key = get_league_key(int(league_id)) if league_id is not None else None
+        if league_key is None:
+            return None
+        return {
+            "league_key": league_key,
+            "season": int(params["season"]),
+            "team_id": int(params.get("team") or 0),
+            "page": int(params.get("page") or 0),
+        }
+
+    def _raw_body(self, endpoint: str, entry: dict) -> dict | None:
+        """Body of a metadata-only entry, from the raw store (None if it changed or is gone)."""
+        key = entry["raw"]
+        raw_entry = get_manifest().get(endpoint, key["league_key"], key["season"], key["team_id"], key["page"])
+        if raw_entry is None:
+            return None
+        body = load_payload(raw_entry)
+        return body if self.body_hash(body) == entry.get("body_sha256") else None
+
+    def ttl_for(self, endpoint: str, params: dict | None):
+        """Return the TTL in seconds, or None if the entry never expires."""
+        season = (params or {}).get("season")
+        if season is not None and self.current_season is not None and int(season) < self.current_season:
+            return None
+        return self.ttl_seconds.get(endpoint, self.ttl_seconds.get("default", 0))
+
+    def _count(self, name: str, amount: int = 1):
+        with self.lock:
+            self.stats[name] += amount
+
+    # -------------------------
+    # READ / WRITE
+    # -------------------------
+    def lookup(self, endpoint: str, params: dict | None):
+        """
+        Return (entry, is_fresh).
+
+        entry is None on a miss. A stale entry is still returned so the
+        caller can revalidate it with its validators (or fall back to it
+        when the API can't answer).
+        """
+        path = self._path(endpoint, self.make_key(endpoint, params))
+
+        try:
+            with open(path, "rb") as f:
+                raw = f.read()
+            entry = loads(raw)
+        except (FileNotFoundError, ValueError):
+            # No entry, or a truncated/corrupt one
+            self._count("misses")
+            return None, False
+
+        if "raw" in entry:
+            entry["body"] = self._raw_body(endpoint, entry)
+            if entry["body"] is None:
+                self._count("misses")
+                return None, False
+
+        ttl = self.ttl_for(endpoint, params)
+        is_fresh = ttl is None or (time.time() - entry.get("stored_at", 0)) < ttl
+
+        self._count("hits" if is_fresh else "stale")
+        self._count("bytes_read", len(raw))
+        return entry, is_fresh
+
+    @staticmethod
+    def validators(entry: dict | None) -> dict:
+        """Conditional request headers for a cached entry."""
+        headers = {}
+        if entry:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def store(self, endpoint: str, params: dict | None, body: dict, headers=None):
+        headers = headers or {}
+        entry = {
+            "endpoint": endpoint,
+            "params": params or {},
+            "stored_at": time.time(),
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"),
+        }
+        raw_key = self.raw_key(endpoint, params)
+        if raw_key is not None:
+            entry.update(raw=raw_key, body_sha256=self.body_hash(body))
+        else:
+            entry["body"] = body
+        self._write(endpoint, params, entry)
+        self._count("stored")
+
+    def refresh(self, endpoint: str, params: dict | None, entry: dict):
+        """Mark a revalidated (304) entry as fresh again."""
+        entry["stored_at"] = time.time()
+        self._write(endpoint, params, entry)
+        self._count("revalidated")
+
+    def _write(self, endpoint: str, params: dict | None, entry: dict):
+        path = self._path(endpoint, self.make_key(endpoint, params))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # Bodies of raw-file requests live in the raw store, not in the cache
+        if "raw" in entry:
+            entry = {name: value for name, value in entry.items() if name != "body"}
+        raw = json.dumps(entry).encode("utf-8")
+
+        # Write-then-rename so concurrent readers never see a partial entry
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(raw)
+        os.replace(tmp_path, path)
+
+        self._count("bytes_written", len(raw))
+
+    def summary(self) -> str:
+        with self.lock:
+            s = dict(self.stats)
+        return (
+            f"cache hits={s['hits']} misses={s['misses']} stale={s['stale']} revalidated={s['revalidated']} "
+            f"read={s['bytes_read']}B written={s['bytes_written']}B"
+        )
+
+
+def get_response_cache(settings: dict) -> ResponseCache | None:
+    """
+    Return the process-wide ResponseCache (None when cache.enabled is false).
+    """
+    global _shared_cache
+
+    cache_cfg = settings.get("cache", {}) or {}
+    if not cache_cfg.get("enabled", False):
+        return None
+
+    with _shared_lock:
+        if _shared_cache is None:
+            current_season = cache_cfg.get("current_season") or max(settings.get("seasons") or [0]) or None
+            _shared_cache = ResponseCache(
+                cache_dir=cache_cfg.get("path", "data/cache"),
+                ttl_seconds=cache_cfg.get("ttl_seconds", {}),
+                current_season=current_season,
+            )
+        return _shared_cache
+
+
+def shared_cache_summary() -> str | None:
+    """Counters of the process-wide cache, if one was created during this run."""
+    return _shared_cache.summary() if _shared_cache is not None else None
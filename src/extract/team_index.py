@@ -0,0 +1,61 @@
+import threading
+from src.extract.manifest import get_manifest
+from src.extract.raw_store import load_response
+
+_shared_index = None
+_shared_lock = threading.Lock()
+
+
+class TeamIndex:
+    """
+    In-process league/season → team roster index shared by the extractors.
+
+    - fetch_teams (and the async engine) put every teams payload they fetch
+    - A roster that was not fetched in this process is read from its stored
+      payload once (manifest lookup), then served from memory
+    - Rosters read from disk are keyed on the manifest sha256, so a season
+      re-fetched by another process is read again
+    """
+
+    def __init__(self, manifest=None):
+        self.manifest = manifest or get_manifest()
+        self.rosters = {}  # (league_key, season) → (sha256 or None if fetched here, teams)
+        self.lock = threading.Lock()
+
+    def put(self, league_key: str, season: int, teams: list):
+        """Record the teams (data["response"]) just fetched for a league-season."""
+        with self.lock:
+            self.rosters[(league_key, season)] = (None, list(teams))
+
+    def get(self, league_key: str, season: int) -> list | None:
+        """Teams of a league-season (data["response"]), or None if never fetched."""
+        key = (league_key, season)
+        with self.lock:
+            cached = self.rosters.get(key)
+        if cached is not None and cached[0] is None:
+            return cached[1]
+
+        entry = self.manifest.get("teams", league_key, season)
+        if entry is None:
+            return None
+        if cached is not None and cached[0] == entry["sha256"]:
+            return cached[1]
+
+        teams = load_response(entry)
+        with self.lock:
+            self.rosters[key] = (entry["sha256"], teams)
+        return teams
+
+    def team_ids(self, league_key: str, season: int) -> list | None:
+        teams = self.get(league_key, season)
+        return None if teams is None else [team["team"]["id"] for team in teams]
+
+
+def get_team_index() -> TeamIndex:
+    """Return the process-wide TeamIndex, creating it on first use."""
+    global _shared_index
+
+    with _shared_lock:
+        if _shared_index is None:
+            _shared_index = TeamIndex()
+        return _shared_index
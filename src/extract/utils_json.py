@@ -0,0 +1,103 @@
+import json
+import yaml
+
+SETTINGS_PATH = "config/settings.yaml"
+
+# Fastest first; "auto" picks the first one that is installed
+PARSERS = ["orjson", "simdjson", "stdlib"]
+
+_backend = None
+
+
+# -------------------------
+# PARSER BACKENDS
+# -------------------------
+def _stdlib_loads(raw):
+    return json.loads(raw)
+
+
+def _import_parser(name: str):
+    """loads function of a parser backend (ImportError when not installed)."""
+    if name == "orjson":
+        import orjson
+        return orjson.loads
+    if name == "simdjson":
+        import simdjson
+        return simdjson.loads
+    if name == "stdlib":
+        return _stdlib_loads
+    raise ValueError(f"Unknown JSON parser: {name} (expected auto, {', '.join(PARSERS)})")
+
+
+def load_json_settings(path: str = SETTINGS_PATH) -> str:
+    try:
+        with open(path, "r") as f:
+            settings = yaml.safe_load(f) or {}
+    except FileNotFoundError:
+        return "auto"
+    return (settings.get("raw_storage", {}) or {}).get("json_parser", "auto")
+
+
+def set_json_backend(name: str = "auto") -> str:
+    """
+    Select the parser used by loads() / load_file().
+
+    - "auto": orjson, then simdjson, then the stdlib json module
+    - an explicit name fails loudly when the package is missing
+
+    Returns the name of the backend in use.
+    """
+    global _backend
+
+    if name == "auto":
+        for candidate in PARSERS:
+            try:
+                _backend = (candidate, _import_parser(candidate))
+                break
+            except ImportError:
+                continue
+    else:
+        _backend = (name, _import_parser(name))
+    return _backend[0]
+
+
+def json_backend() -> str:
+    """Name of the active parser (resolved from settings.yaml on first use)."""
+    if _backend is None:
+        set_json_backend(load_json_settings())
+    return _backend[0]
+
+
+# -------------------------
+# PARSING API (raw payloads)
+# -------------------------
+def loads(raw):
+    """Parse a JSON document (bytes or str) with the active backend."""
+    if _backend is None:
+        json_backend()
+    return _backend[1](raw)
+
+
+def load_file(path: str):
+    """Parse a JSON file; read as bytes so fast parsers skip the UTF-8 decode."""
+    with open(path, "rb") as f:
+        return loads(f.read())
+
+
+# -------------------------
+# DUCKDB → ARROW (no Python dicts)
+# -------------------------
+def read_json_arrow(paths: list, query: str = "SELECT * FROM {raw}", con=None):
+    """
+    Read raw JSON files straight into an Arrow table with DuckDB read_json.
+
+    `{raw}` in `query` is replaced by the scan (one row per file, plus a
+    `filename` column), e.g. "SELECT unnest(response, recursive := true)
+    FROM {raw}" flattens the API envelope. Column types are inferred
+    across all files; no Python dicts are built.
+    """
+    import duckdb
+
+    con = con or duckdb.connect()
+    raw = "read_json($paths, format = 'auto', union_by_name = true, filename = true)"
+    return con.execute(query.format(raw=raw), {"paths": list(paths)}).to_arrow_table()
@@ -0,0 +1,254 @@
+import contextvars
+import json
+import os
+import resource
+import threading
+import time
+import uuid
+import yaml
+
+SETTINGS_PATH = "config/settings.yaml"
+METRICS_DIR = "data/metrics"
+
+_settings = None
+_run_id = None
+# Open stages, outermost first. A context variable, so stages opened in
+# parallel threads (asyncio.to_thread, orchestrator nodes) nest under the
+# stage that started them instead of under each other
+_stack = contextvars.ContextVar("instrumentation_stack", default=())
+_lock = threading.Lock()
+_profile_stage = None
+
+
+# -------------------------
+# SETTINGS
+# -------------------------
+def load_instrumentation_settings(path: str = SETTINGS_PATH) -> dict:
+    """instrumentation: section of settings.yaml (defaults when missing)."""
+    global _settings
+
+    if _settings is None:
+        try:
+            with open(path, "r") as f:
+                settings = yaml.safe_load(f) or {}
+        except FileNotFoundError:
+            settings = {}
+        cfg = settings.get("instrumentation", {}) or {}
+        _settings = {
+            "enabled": cfg.get("enabled", True),
+            "path": cfg.get("path", os.path.join(METRICS_DIR, "pipeline.jsonl")),
+            "files": cfg.get("files", False),
+            "profiler": cfg.get("profiler", "cprofile"),
+        }
+    return _settings
+
+
+def run_id() -> str:
+    """Id shared by every record of this process (one pipeline invocation)."""
+    global _run_id
+    if _run_id is None:
+        _run_id = f"{time.strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:6]}"
+    return _run_id
+
+
+def set_profile_stage(name: str | None):
+    """Wrap the stage called `name` (e.g. "transform.players") in the configured profiler."""
+    global _profile_stage
+    _profile_stage = name
+
+
+# -------------------------
+# RESOURCE SNAPSHOTS
+# -------------------------
+def _io_counters() -> tuple:
+    """(bytes read, bytes written) by this process through read/write calls (Linux /proc)."""
+    try:
+        with open("/proc/self/io", "r") as f:
+            fields = dict(line.split(":", 1) for line in f if ":" in line)
+        return int(fields["rchar"]), int(fields["wchar"])
+    except (OSError, KeyError, ValueError):
+        return None, None
+
+
+def _snapshot() -> dict:
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    read_bytes, write_bytes = _io_counters()
+    return {
+        "wall": time.perf_counter(),
+        # worker processes (streaming / incremental engines) count once they have exited
+        "cpu": own.ru_utime + own.ru_stime + children.ru_utime + children.ru_stime,
+        "read_bytes": read_bytes,
+        "write_bytes": write_bytes,
+    }
+
+
+def _peak_rss_mb() -> dict:
+    # ru_maxrss is in KB on Linux: high-water mark of the process / its largest child
+    return {
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "peak_rss_children_mb": round(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024, 1),
+    }
+
+
+# -------------------------
+# STAGES
+# -------------------------
+class Stage:
+    """
+    Timed block of the pipeline, written as one JSON line on exit.
+
+    - wall / CPU seconds, peak RSS, bytes read / written by the process
+    - counters added with add() or count() while the stage is open
+      (api_calls, rows_written, ...); counters of nested stages also
+      roll up into their parents
+    """
+
+    def __init__(self, name: str, kind: str = "stage", enabled: bool = True, **fields):
+        self.name = name
+        self.kind = kind
+        self.enabled = enabled
+        self.fields = fields
+        self.counters = {}
+        self.profiler = None
+
+    def add(self, **counters):
+        with _lock:
+            for key, amount in counters.items():
+                self.counters[key] = self.counters.get(key, 0) + (amount or 0)
+
+    def __enter__(self):
+        if not self.enabled:
+            return self
+        stack = _stack.get()
+        self.parent = stack[-1] if stack else None
+        self.start = _snapshot()
+        self.token = _stack.set(stack + (self,))
+        if self.name == _profile_stage and not any(s.profiler for s in stack):
+            self.profiler = _start_profiler()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if not self.enabled:
+            return False
+        end = _snapshot()
+        _stack.reset(self.token)
+        with _lock:
+            # roll counters up into the enclosing stage
+            if self.parent is not None:
+                for key, amount in self.counters.items():
+                    self.parent.counters[key] = self.parent.counters.get(key, 0) + amount
+
+        record = {
+            "run_id": run_id(),
+            "ts": time.time(),
+            "kind": self.kind,
+            "name": self.name,
+            "parent": self.parent.name if self.parent else None,
+            "status": "error" if exc_type else "ok",
+            "wall_s": round(end["wall"] - self.start["wall"], 4),
+            "cpu_s": round(end["cpu"] - self.start["cpu"], 4),
+            **_peak_rss_mb(),
+            "read_bytes": _delta(self.start["read_bytes"], end["read_bytes"]),
+            "write_bytes": _delta(self.start["write_bytes"], end["write_bytes"]),
+            **self.counters,
+            **self.fields,
+        }
+        if exc_type:
+            record["error"] = f"{exc_type.__name__}: {exc}"
+        if self.profiler is not None:
+            record["profile"] = _stop_profiler(self.profiler, self.name)
+
+        emit(record)
+        if self.kind != "file":
+            print(_format(record))
+        return False
+
+
+def _delta(start, end):
+    return None if start is None or end is None else end - start
+
+
+def _format(record: dict) -> str:
+    extras = ", ".join(f"{key}={record[key]}" for key in ("api_calls", "rows_written", "rows_loaded") if key in record)
+    return (f"  [{record['name']}] {record['wall_s']:.2f}s wall, {record['cpu_s']:.2f}s cpu, "
+            f"peak {record['peak_rss_mb']} MB" + (f", {extras}" if extras else ""))
+
+
+class _NoStage(Stage):
+    def __init__(self):
+        super().__init__("", enabled=False)
+
+    def add(self, **counters):
+        pass
+
+
+def stage(name: str, **fields) -> Stage:
+    """Context manager timing a pipeline stage, e.g. with stage("transform.players") as s."""
+    return Stage(name, enabled=load_instrumentation_settings()["enabled"], **fields)
+
+
+def file_stage(name: str, **fields) -> Stage:
+    """Per-file record (raw file read, clean table written, table loaded) when instrumentation.files is on."""
+    cfg = load_instrumentation_settings()
+    if not (cfg["enabled"] and cfg["files"]):
+        return _NoStage()
+    return Stage(name, kind="file", **fields)
+
+
+def count(name: str, amount: int = 1):
+    """Add to a counter of the innermost open stage (e.g. count("api_calls"))."""
+    stack = _stack.get()
+    if stack:
+        with _lock:
+            stack[-1].counters[name] = stack[-1].counters.get(name, 0) + amount
+
+
+def emit(record: dict):
+    """Append one JSON line to instrumentation.path."""
+    path = load_instrumentation_settings()["path"]
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    line = json.dumps(record, default=str)
+    with _lock:
+        with open(path, "a") as f:
+            f.write(line + "\n")
+
+
+# -------------------------
+# PROFILER HOOK
+# -------------------------
+def _start_profiler():
+    if load_instrumentation_settings()["profiler"] == "pyinstrument":
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            print("  pyinstrument is not installed; profiling with cProfile instead.")
+        else:
+            profiler = Profiler()
+            profiler.start()
+            return profiler
+
+    import cProfile
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    return profiler
+
+
+def _stop_profiler(profiler, name: str) -> str:
+    """Stop the profiler and write its report next to the metrics file; returns the report path."""
+    os.makedirs(METRICS_DIR, exist_ok=True)
+    base = os.path.join(METRICS_DIR, f"profile-{name}-{run_id()}")
+
+    if hasattr(profiler, "output_html"):
+        profiler.stop()
+        path = f"{base}.html"
+        with open(path, "w") as f:
+            f.write(profiler.output_html())
+    else:
+        profiler.disable()
+        path = f"{base}.prof"
+        profiler.dump_stats(path)
+
+    print(f"  Profile of {name} written to {path}")
+    return path
@@ -1,20 +1,32 @@
 from pathlib import Path
-from src.load.utils_db import get_connection, load_parquet_as_table
+from src.instrumentation import file_stage
+from src.load.utils_db import staged_database, upsert_parquet
 
-def load_dimensions():
-    con = get_connection()
+clean_path = Path("data/clean")
 
-    clean_path = Path("data/clean")
+DIMENSIONS = {
+    "dim_team": clean_path / "dim_team.parquet",
+    "dim_player": clean_path / "dim_player.parquet",
+    "dim_venue": clean_path / "dim_venue.parquet",
+    "dim_league": clean_path / "dim_league.parquet",
+}
 
-    dimensions = {
-        "dim_team": clean_path / "dim_team.parquet",
-        "dim_player": clean_path / "dim_player.parquet",
-        "dim_venue": clean_path / "dim_venue.parquet",
-        "dim_league": clean_path / "dim_league.parquet",
-    }
+def load_dimensions(con=None, full=False):
+    """
+    Upsert dimension tables from data/clean (full=True → DROP/CREATE).
 
-    for table_name, parquet_path in dimensions.items():
-        load_parquet_as_table(con, table_name, parquet_path)
+    Returns {table: changed parts} (see upsert_parquet) for the marts.
+    With `con` the caller owns the connection and the transaction;
+    otherwise the load builds and promotes its own database snapshot.
+    """
+    if con is None:
+        with staged_database() as staged_con:
+            return load_dimensions(staged_con, full)
 
-    con.close()
-    print("Dimensions loaded successfully.")
\ No newline at end of file
+    changes = {}
+    for table_name, parquet_path in DIMENSIONS.items():
+        with file_stage(f"load.{table_name}", table=table_name):
+            changes[table_name] = upsert_parquet(con, table_name, parquet_path, full=full)
+
+    print("Dimensions loaded successfully.")
+    return changes
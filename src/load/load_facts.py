@@ -1,19 +1,31 @@
-from pathlib import Path
-from src.load.utils_db import get_connection, load_parquet_as_table
+from src.instrumentation import file_stage
+from src.load.utils_db import staged_database, upsert_parquet
+from src.transform.schemas import PARTITION_COLS
+from src.transform.utils_parquet import clean_table_path
 
-def load_facts():
-    con = get_connection()
+# fact_match / fact_player_season are Hive-partitioned by league_id / season_year
+FACTS = {
+    "fact_match": clean_table_path("fact_match"),
+    "fact_team_season": clean_table_path("fact_team_season"),
+    "fact_player_season": clean_table_path("fact_player_season"),
+}
 
-    clean_path = Path("data/clean")
+def load_facts(con=None, full=False):
+    """
+    Upsert fact tables from data/clean (full=True → DROP/CREATE).
 
-    facts = {
-        "fact_match": clean_path / "fact_match.parquet",
-        "fact_team_season": clean_path / "fact_team_season.parquet",
-        "fact_player_season": clean_path / "fact_player_season.parquet",
-    }
+    Partitioned facts are merged one changed league_id=/season_year=
+    directory at a time. Returns {table: changed parts} (see upsert_parquet).
+    """
+    if con is None:
+        with staged_database() as staged_con:
+            return load_facts(staged_con, full)
 
-    for table_name, parquet_path in facts.items():
-        load_parquet_as_table(con, table_name, parquet_path)
+    changes = {}
+    for table_name, parquet_path in FACTS.items():
+        with file_stage(f"load.{table_name}", table=table_name):
+            changes[table_name] = upsert_parquet(con, table_name, parquet_path,
+                                                 order_by=PARTITION_COLS.get(table_name), full=full)
 
-    con.close()
-    print("Facts loaded successfully.")
\ No newline at end of file
+    print("Facts loaded successfully.")
+    return changes
@@ -0,0 +1,158 @@
+from src.instrumentation import file_stage
+from src.load.utils_db import partition_predicate, staged_database, table_columns
+
+# Finished fixtures (standings-style aggregates only count these)
+PLAYED_STATUSES = "('FT', 'AET', 'PEN')"
+
+# Mart → fact it aggregates (partitioned by league_id / season_year), other
+# sources (any change → full rebuild), and SELECT with a {scope} placeholder
+MARTS = {
+    "mart_league_season": {
+        "fact": "fact_match",
+        "dimensions": ["dim_league"],
+        "alias": "m",
+        "sql": """
+            SELECT
+                m.league_id,
+                m.season_year,
+                l.league_name,
+                l.league_logo,
+                l.country_flag,
+                COUNT(*) AS matches,
+                SUM(m.goals_home) AS total_goals_home,
+                SUM(m.goals_away) AS total_goals_away,
+                SUM(m.goals_home + m.goals_away) AS total_goals,
+                AVG(m.goals_home) AS avg_goals_home,
+                AVG(m.goals_away) AS avg_goals_away,
+                AVG(m.goals_home + m.goals_away) AS avg_goals_per_match,
+                CASE
+                    WHEN AVG(m.goals_away) = 0 THEN NULL
+                    ELSE AVG(m.goals_home) / AVG(m.goals_away)
+                END AS home_advantage_index
+            FROM fact_match m
+            LEFT JOIN dim_league l ON m.league_id = l.league_id
+            WHERE {scope}
+            GROUP BY m.league_id, m.season_year, l.league_name, l.league_logo, l.country_flag
+        """,
+    },
+    "mart_team_season": {
+        "fact": "fact_match",
+        "dimensions": [],
+        "alias": None,
+        "sql": f"""
+            WITH sides AS (
+                SELECT league_id, season_year, home_team_id AS team_id,
+                       goals_home AS goals_for, goals_away AS goals_against, TRUE AS is_home
+                FROM fact_match
+                WHERE status IN {PLAYED_STATUSES} AND ({{scope}})
+                UNION ALL
+                SELECT league_id, season_year, away_team_id AS team_id,
+                       goals_away AS goals_for, goals_home AS goals_against, FALSE AS is_home
+                FROM fact_match
+                WHERE status IN {PLAYED_STATUSES} AND ({{scope}})
+            )
+            SELECT
+                team_id,
+                league_id,
+                season_year,
+                COUNT(*) AS matches_played,
+                COUNT(*) FILTER (WHERE goals_for > goals_against) AS wins,
+                COUNT(*) FILTER (WHERE goals_for = goals_against) AS draws,
+                COUNT(*) FILTER (WHERE goals_for < goals_against) AS losses,
+                3 * COUNT(*) FILTER (WHERE goals_for > goals_against)
+                  + COUNT(*) FILTER (WHERE goals_for = goals_against) AS points,
+                SUM(goals_for) AS goals_for,
+                SUM(goals_against) AS goals_against,
+                SUM(goals_for) - SUM(goals_against) AS goal_difference,
+                SUM(goals_for) FILTER (WHERE is_home) AS home_goals_for,
+                SUM(goals_for) FILTER (WHERE NOT is_home) AS away_goals_for
+            FROM sides
+            GROUP BY team_id, league_id, season_year
+        """,
+    },
+    "mart_player_season": {
+        "fact": "fact_player_season",
+        "dimensions": [],
+        "alias": None,
+        "sql": """
+            SELECT
+                player_id,
+                league_id,
+                season_year,
+                COUNT(DISTINCT team_id) AS teams,
+                SUM(appearances) AS appearances,
+                SUM(minutes) AS minutes,
+                SUM(goals) AS goals,
+                SUM(assists) AS assists,
+                SUM(yellow_cards) AS yellow_cards,
+                SUM(red_cards) AS red_cards,
+                AVG(TRY_CAST(rating AS DOUBLE)) AS avg_rating,
+                CASE
+                    WHEN SUM(minutes) > 0 THEN SUM(goals) * 90.0 / SUM(minutes)
+                END AS goals_per_90
+            FROM fact_player_season
+            WHERE {scope}
+            GROUP BY player_id, league_id, season_year
+        """,
+    },
+}
+
+
+def refresh_mart(con, mart_name, changes=None, full=False):
+    """
+    Rebuild or incrementally refresh one mart.
+
+    - Full rebuild when asked, when the mart doesn't exist yet, or when
+      one of its dimensions / its fact was fully reloaded
+    - Otherwise only the league-seasons whose fact partitions changed are
+      deleted and re-aggregated
+    """
+    mart = MARTS[mart_name]
+    changes = changes or {}
+    fact_parts = changes.get(mart["fact"], [])
+
+    rebuild = (
+        full
+        or not table_columns(con, mart_name)
+        or fact_parts is None
+        or "" in fact_parts
+        or any(changes.get(dim, []) != [] for dim in mart["dimensions"])
+    )
+
+    if rebuild:
+        con.execute(f"""
+            CREATE OR REPLACE TABLE {mart_name} AS
+            {mart["sql"].format(scope="TRUE")}
+            ORDER BY league_id, season_year
+        """)
+        rows = con.execute(f"SELECT count(*) FROM {mart_name}").fetchone()[0]
+        print(f"Built mart: {mart_name} ({rows} rows)")
+        return
+
+    if not fact_parts:
+        return
+
+    target_scope = " OR ".join(f"({partition_predicate(part)})" for part in fact_parts)
+    source_scope = " OR ".join(f"({partition_predicate(part, mart['alias'])})" for part in fact_parts)
+
+    con.execute(f"DELETE FROM {mart_name} WHERE {target_scope}")
+    con.execute(f"INSERT INTO {mart_name} {mart['sql'].format(scope=source_scope)}")
+    print(f"Refreshed mart: {mart_name} ({len(fact_parts)} league-season(s))")
+
+
+def load_marts(con=None, changes=None, full=False):
+    """
+    Materialize the pre-aggregated marts from the loaded facts.
+
+    `changes` is the {table: changed parts} returned by load_dimensions /
+    load_facts; without it (or with full=True) every mart is rebuilt.
+    """
+    if con is None:
+        with staged_database() as staged_con:
+            return load_marts(staged_con, changes, full=True)
+
+    for mart_name in MARTS:
+        with file_stage(f"load.{mart_name}", table=mart_name):
+            refresh_mart(con, mart_name, changes, full=full or changes is None)
+
+    print("Marts loaded successfully.")
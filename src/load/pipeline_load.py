@@ -1,11 +1,100 @@
-from src.load.load_dimensions import load_dimensions
-from src.load.load_facts import load_facts
+import argparse
 
-def run_load_pipeline():
+from src.instrumentation import set_profile_stage, stage
+from src.load.load_dimensions import DIMENSIONS, load_dimensions
+from src.load.load_facts import FACTS, load_facts
+from src.load.load_marts import MARTS, load_marts
+from src.load.utils_db import NATURAL_KEYS, parquet_scan, snapshot_is_current, staged_database, table_columns
+
+def validate_load(con):
+    """
+    Checks a staged database must pass before it is promoted.
+
+    - every dimension / fact table exists
+    - natural keys are unique
+    - every key in the clean layer made it into the table, and the table
+      holds no key the clean layer no longer has
+    - every mart exists, and mart_league_season covers every league-season
+    """
+    errors = []
+
+    for table_name, parquet_path in {**DIMENSIONS, **FACTS}.items():
+        if not table_columns(con, table_name):
+            errors.append(f"{table_name}: missing")
+            continue
+
+        keys = ", ".join(NATURAL_KEYS[table_name])
+        source = parquet_scan(parquet_path)
+        rows, distinct_keys, source_keys, missing, stale = con.execute(f"""
+            SELECT
+                (SELECT count(*) FROM {table_name}),
+                (SELECT count(DISTINCT row({keys})) FROM {table_name}),
+                (SELECT count(DISTINCT row({keys})) FROM {source}),
+                (SELECT count(*) FROM (SELECT {keys} FROM {source} EXCEPT SELECT {keys} FROM {table_name})),
+                (SELECT count(*) FROM (SELECT {keys} FROM {table_name} EXCEPT SELECT {keys} FROM {source}))
+        """).fetchone()
+
+        print(f"  {table_name}: {rows} rows ({source_keys} keys in data/clean)")
+
+        if rows != distinct_keys:
+            errors.append(f"{table_name}: {rows - distinct_keys} duplicate key(s) on ({keys})")
+        if missing:
+            errors.append(f"{table_name}: {missing} key(s) from data/clean missing")
+        if stale:
+            errors.append(f"{table_name}: {stale} key(s) no longer in data/clean")
+
+    for mart_name in MARTS:
+        if not table_columns(con, mart_name):
+            errors.append(f"{mart_name}: missing")
+
+    if not errors:
+        mart_rows, league_seasons = con.execute("""
+            SELECT
+                (SELECT count(*) FROM mart_league_season),
+                (SELECT count(DISTINCT (league_id, season_year)) FROM fact_match)
+        """).fetchone()
+        print(f"  mart_league_season: {mart_rows} rows ({league_seasons} league-seasons in fact_match)")
+        if mart_rows != league_seasons:
+            errors.append(f"mart_league_season: {mart_rows} rows for {league_seasons} league-seasons")
+
+    if errors:
+        raise ValueError("Load validation failed:\n  " + "\n  ".join(errors))
+
+def run_load_pipeline(full=False):
+    """
+    Load data/clean into a new DuckDB snapshot and promote it.
+
+    - The load runs against a copy of the current database (or an empty
+      one with full=True), so dashboard readers are never blocked
+    - Dimensions and facts are upserted in a single transaction, then the
+      marts are refreshed for the league-seasons that changed
+    - The snapshot is validated (validate_load) and only then promoted by
+      switching data/analytics.current; a failed load leaves the current
+      database untouched
+    - When the clean layer is unchanged since the current snapshot was
+      loaded, nothing is copied or promoted
+    - Timings / rows per stage go to the instrumentation log
+      (load.dimensions, load.facts, load.marts inside `load`)
+    """
     print("Starting Load Layer...")
-    load_dimensions()
-    load_facts()
+    if not full and snapshot_is_current({**DIMENSIONS, **FACTS}):
+        print("Clean layer unchanged since the last load — current snapshot kept.")
+        return
+    with stage("load", full=full):
+        with staged_database(full=full, validate=validate_load) as con:
+            with stage("load.dimensions"):
+                changes = load_dimensions(con, full)
+            with stage("load.facts"):
+                changes.update(load_facts(con, full))
+            with stage("load.marts"):
+                load_marts(con, changes, full)
     print("Load Layer completed successfully.")
 
 if __name__ == "__main__":
-    run_load_pipeline()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Load the clean layer into DuckDB")
+    parser.add_argument("--full", action="store_true", help="Rebuild every table in an empty snapshot instead of upserting")
+    parser.add_argument("--profile", metavar="STAGE", help="Profile one stage, e.g. load.facts (see settings.yaml instrumentation)")
+    args = parser.parse_args()
+
+    set_profile_stage(args.profile)
+    run_load_pipeline(full=args.full)
@@ -1,24 +1,488 @@
+import os
+import shutil
+import threading
+import time
+import uuid
+import weakref
+from contextlib import contextmanager
 import duckdb
+import yaml
 from pathlib import Path
+from src.instrumentation import count
+from src.transform.schemas import PARTITION_COLS, SCHEMAS
+
+SETTINGS_PATH = "config/settings.yaml"
+DATA_DIR = Path("data")
+
+# Snapshot the readers use (path relative to data/, e.g. "snapshots/analytics-….duckdb")
+POINTER_PATH = DATA_DIR / "analytics.current"
+LEGACY_DB_PATH = DATA_DIR / "analytics.duckdb"
+
+# Natural key of every table (upserts match on these columns)
+NATURAL_KEYS = {
+    "dim_team": ["team_id"],
+    "dim_player": ["player_id"],
+    "dim_venue": ["venue_id"],
+    "dim_league": ["league_id"],
+    "fact_match": ["fixture_id"],
+    "fact_team_season": ["team_id", "league_key", "season_year"],
+    "fact_player_season": ["player_id", "team_id", "league_id", "season_year"],
+}
+
+LOAD_STATE_TABLE = "_load_state"
+
+# DuckDB type of an integer partition column, by Arrow bit width
+HIVE_INT_TYPES = {16: "SMALLINT", 32: "INTEGER", 64: "BIGINT"}
+
+_shared_manager = None
+_shared_lock = threading.Lock()
+
+def load_db_settings(path=SETTINGS_PATH):
+    with open(path, "r") as f:
+        settings = yaml.safe_load(f)
+    return settings.get("database", {}) or {}
 
 def get_db_path():
-    """Return the path to the DuckDB analytics database."""
-    return Path("data") / "analytics.duckdb"
+    """
+    Return the path to the current DuckDB analytics database.
+
+    Resolves the data/analytics.current pointer written by the last
+    promoted load; falls back to data/analytics.duckdb before the first one.
+    """
+    if POINTER_PATH.exists():
+        snapshot = DATA_DIR / POINTER_PATH.read_text().strip()
+        if snapshot.exists():
+            return snapshot
+    return LEGACY_DB_PATH
+
+def duckdb_config(settings=None):
+    """DuckDB config from settings.yaml (database.threads / database.memory_limit)."""
+    settings = settings if settings is not None else load_db_settings()
+    config = {}
+    if settings.get("threads"):
+        config["threads"] = int(settings["threads"])
+    if settings.get("memory_limit"):
+        config["memory_limit"] = str(settings["memory_limit"])
+    return config
+
+def get_connection(db_path=None, read_only=False):
+    """
+    Open a dedicated DuckDB connection (the current snapshot by default).
 
-def get_connection():
-    """Create (or open) the DuckDB database."""
-    db_path = get_db_path()
+    Used by writers; readers should go through get_cursor() so they share
+    one database instance.
+    """
+    db_path = Path(db_path) if db_path else get_db_path()
     db_path.parent.mkdir(parents=True, exist_ok=True)
-    return duckdb.connect(str(db_path))
+    return duckdb.connect(str(db_path), read_only=read_only, config=duckdb_config())
+
+# -------------------------
+# CONNECTION MANAGER
+# -------------------------
+class SnapshotNotFoundError(FileNotFoundError):
+    """Raised when a reader asks for the current snapshot before any load has built one."""
+
+class ConnectionManager:
+    """
+    Process-wide DuckDB connections, one database instance per (path, mode).
+
+    - cursor() hands out cheap cursors on the shared instance; each cursor
+      can be used from its own thread
+    - Readers default to read_only=True on the current snapshot, so
+      dashboards and notebooks never take the write lock and can run
+      concurrently (also across processes)
+    - When the load promotes a new snapshot, the next cursor() opens it;
+      the previous instance is closed once no cursor on it is alive
+      (closing it earlier would close those cursors too)
+    - threads / memory_limit come from settings.yaml (database section)
+    """
+
+    def __init__(self, settings=None):
+        self.config = duckdb_config(settings)
+        self.lock = threading.Lock()
+        self.connections = {}  # mode → (db_path, connection, live cursors)
+        self.retired = []      # (connection, live cursors) of replaced snapshots
+
+    def _open(self, db_path, read_only):
+        mode = "read_only" if read_only else "read_write"
+        current = self.connections.get(mode)
+        if current is not None and current[0] == db_path:
+            return current
+
+        if read_only and not db_path.exists():
+            raise SnapshotNotFoundError(
+                f"No analytics database at {db_path}: run the load pipeline first "
+                "(python -m src.load.pipeline_load)."
+            )
+        con = duckdb.connect(str(db_path), read_only=read_only, config=self.config)
+        if current is not None:
+            self.retired.append(current[1:])
+        self.connections[mode] = (db_path, con, weakref.WeakSet())
+        return self.connections[mode]
+
+    def _close_idle(self):
+        """Close replaced instances whose cursors are all gone (their files can then be pruned)."""
+        still_used = []
+        for con, cursors in self.retired:
+            if len(cursors):
+                still_used.append((con, cursors))
+            else:
+                con.close()
+        self.retired = still_used
+
+    def connection(self, db_path=None, read_only=True):
+        db_path = Path(db_path) if db_path else get_db_path()
+        with self.lock:
+            _, con, _ = self._open(db_path, read_only)
+            self._close_idle()
+            return con
+
+    def cursor(self, db_path=None, read_only=True):
+        db_path = Path(db_path) if db_path else get_db_path()
+        with self.lock:
+            _, con, cursors = self._open(db_path, read_only)
+            self._close_idle()
+            cursor = con.cursor()
+            cursors.add(cursor)
+            return cursor
+
+    def close_all(self):
+        with self.lock:
+            for con, _ in self.retired:
+                con.close()
+            for _, con, _ in self.connections.values():
+                con.close()
+            self.connections = {}
+            self.retired = []
+
+def get_connection_manager():
+    """Return the process-wide ConnectionManager, creating it on first use."""
+    global _shared_manager
+
+    with _shared_lock:
+        if _shared_manager is None:
+            _shared_manager = ConnectionManager()
+        return _shared_manager
+
+def get_cursor(read_only=True):
+    """Cursor on the current analytics snapshot (read-only by default)."""
+    return get_connection_manager().cursor(read_only=read_only)
+
+# -------------------------
+# BLUE/GREEN SNAPSHOTS
+# -------------------------
+def new_snapshot_path():
+    snapshot_dir = Path(load_db_settings().get("snapshot_dir", DATA_DIR / "snapshots"))
+    snapshot_dir.mkdir(parents=True, exist_ok=True)
+    return snapshot_dir / f"analytics-{time.strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:6]}.duckdb"
+
+def remove_database(db_path):
+    for path in (Path(db_path), Path(f"{db_path}.wal")):
+        if path.exists():
+            path.unlink()
+
+def promote_snapshot(db_path):
+    """Point readers at a new snapshot (write-then-rename: the switch is atomic)."""
+    tmp_path = POINTER_PATH.with_suffix(".current.tmp")
+    tmp_path.write_text(Path(os.path.relpath(db_path, DATA_DIR)).as_posix())
+    os.replace(tmp_path, POINTER_PATH)
+
+def prune_snapshots(keep=None):
+    """Delete old snapshots, keeping the current one and the `keep` most recent."""
+    keep = keep if keep is not None else load_db_settings().get("keep_snapshots", 3)
+    current = get_db_path().resolve()
+    snapshot_dir = Path(load_db_settings().get("snapshot_dir", DATA_DIR / "snapshots"))
+
+    snapshots = sorted(snapshot_dir.glob("analytics-*.duckdb"), reverse=True)
+    for path in snapshots[keep:]:
+        if path.resolve() != current:
+            remove_database(path)
+
+def snapshot_is_current(sources):
+    """
+    True when the current snapshot already holds every clean-layer source.
+
+    `sources` is {table: parquet path}; each source's parts must match the
+    signatures recorded in _load_state. Checked on a short read-only
+    connection, so a no-change load costs no snapshot copy.
+    """
+    current = get_db_path()
+    if not current.exists():
+        return False
+
+    con = get_connection(current, read_only=True)
+    try:
+        if not con.execute("SELECT 1 FROM information_schema.tables WHERE table_name = ?",
+                           [LOAD_STATE_TABLE]).fetchone():
+            return False
+        loaded = {}
+        for table_name, part, signature in con.execute(
+            f"SELECT table_name, part, signature FROM {LOAD_STATE_TABLE}"
+        ).fetchall():
+            loaded.setdefault(table_name, {})[part] = signature
+    finally:
+        con.close()
+
+    for table_name, parquet_path in sources.items():
+        if not Path(parquet_path).exists() or source_parts(parquet_path) != loaded.get(table_name):
+            return False
+    return True
+
+@contextmanager
+def staged_database(full=False, validate=None):
+    """
+    Build a new database snapshot and promote it only if everything succeeds.
+
+    - Starts from a copy of the current database (so upserts stay
+      incremental), or from an empty file when full=True. The copy is the
+      price of never blocking readers: it costs a full read and write of
+      the database per load, so callers skip loads with nothing to do
+      (snapshot_is_current) rather than staging an unchanged copy
+    - Yields a connection inside one transaction
+    - Runs `validate(con)` after COMMIT; any exception discards the
+      staging file and leaves the current snapshot untouched
+    - Readers keep their snapshot; new connections get the promoted one
+    """
+    current = get_db_path()
+    staging = new_snapshot_path()
+    if not full and current.exists():
+        shutil.copyfile(current, staging)
+
+    con = get_connection(staging)
+    try:
+        with transaction(con):
+            yield con
+        if validate:
+            validate(con)
+        con.execute("CHECKPOINT")
+        con.close()
+    except BaseException:
+        con.close()
+        remove_database(staging)
+        raise
+
+    promote_snapshot(staging)
+    prune_snapshots()
+    print(f"Promoted snapshot: {staging}")
+
+@contextmanager
+def transaction(con):
+    """Run a block in one DuckDB transaction (readers keep seeing the previous state until COMMIT)."""
+    con.execute("BEGIN TRANSACTION")
+    try:
+        yield con
+    except BaseException:
+        con.execute("ROLLBACK")
+        raise
+    con.execute("COMMIT")
 
-def load_parquet_as_table(con, table_name, parquet_path):
+def hive_options(table_name):
     """
-    Load a Parquet file into DuckDB as a table.
+    read_parquet() options for a Hive-partitioned table.
+
+    Partition values only exist in directory names; hive_types gives them
+    their registry types (BIGINT league_id, SMALLINT season_year) instead of
+    the BIGINT DuckDB would infer, so facts join dimensions without casts.
+    """
+    schema = SCHEMAS[table_name]
+    types = ", ".join(
+        f"'{col}': {HIVE_INT_TYPES[schema.field(col).type.bit_width]}"
+        for col in PARTITION_COLS[table_name]
+    )
+    return f"hive_partitioning = true, hive_types = {{{types}}}"
+
+def parquet_scan(parquet_path, part=None):
+    """
+    read_parquet() expression for a clean-layer table.
+
+    Hive-partitioned datasets (a directory) are read with hive_partitioning,
+    so filters on league_id / season_year prune whole directories; `part`
+    (e.g. "league_id=140/season_year=2023") reads a single partition.
+    """
+    parquet_path = Path(parquet_path)
+    if parquet_path.is_dir():
+        pattern = f"{part}/*.parquet" if part else "**/*.parquet"
+        return f"read_parquet('{parquet_path.as_posix()}/{pattern}', {hive_options(parquet_path.name)})"
+    return f"read_parquet('{parquet_path.as_posix()}')"
+
+def load_parquet_as_table(con, table_name, parquet_path, order_by=None):
+    """
+    Load a Parquet file (or Hive-partitioned dataset) into DuckDB as a table.
     If the table exists, it will be replaced.
+
+    `order_by` clusters the rows (e.g. by league_id, season_year) so DuckDB's
+    min/max zone maps can skip row groups on those filters.
     """
+    order_clause = f"ORDER BY {', '.join(order_by)}" if order_by else ""
+
     con.execute(f"DROP TABLE IF EXISTS {table_name}")
     con.execute(f"""
         CREATE TABLE {table_name} AS
-        SELECT * FROM read_parquet('{parquet_path}')
+        SELECT * FROM {parquet_scan(parquet_path)}
+        {order_clause}
+    """)
+    print(f"Loaded table: {table_name}")
+
+# -------------------------
+# INCREMENTAL (UPSERT) LOAD
+# -------------------------
+def ensure_load_state(con):
+    """Bookkeeping table: which source file / partition was loaded in which version."""
+    con.execute(f"""
+        CREATE TABLE IF NOT EXISTS {LOAD_STATE_TABLE} (
+            table_name VARCHAR NOT NULL,
+            part       VARCHAR NOT NULL,
+            signature  VARCHAR NOT NULL,
+            loaded_at  TIMESTAMP DEFAULT current_timestamp,
+            PRIMARY KEY (table_name, part)
+        )
+    """)
+
+def source_parts(parquet_path):
+    """
+    {part: signature} for a clean-layer table.
+
+    - Single file: one part ("") signed by size + mtime
+    - Hive dataset: one part per partition directory ("league_id=140/season_year=2023")
+      signed by the names, sizes and mtimes of its files
+    """
+    parquet_path = Path(parquet_path)
+    if not parquet_path.is_dir():
+        stat = parquet_path.stat()
+        return {"": f"{stat.st_size}:{stat.st_mtime_ns}"}
+
+    parts = {}
+    for folder, _, files in os.walk(parquet_path):
+        files = sorted(f for f in files if f.endswith(".parquet"))
+        if not files:
+            continue
+        signature = ";".join(
+            f"{f}:{os.stat(os.path.join(folder, f)).st_size}:{os.stat(os.path.join(folder, f)).st_mtime_ns}"
+            for f in files
+        )
+        parts[Path(folder).relative_to(parquet_path).as_posix()] = signature
+    return parts
+
+def partition_predicate(part, alias=None):
+    """'league_id=140/season_year=2023' → "league_id = 140 AND season_year = 2023"."""
+    prefix = f"{alias}." if alias else ""
+    conditions = []
+    for item in part.split("/"):
+        column, value = item.split("=", 1)
+        if value == "__HIVE_DEFAULT_PARTITION__":
+            conditions.append(f"{prefix}{column} IS NULL")
+            continue
+        literal = value if value.lstrip("-").isdigit() else "'" + value.replace("'", "''") + "'"
+        conditions.append(f"{prefix}{column} = {literal}")
+    return " AND ".join(conditions)
+
+def table_columns(con, table_name):
+    rows = con.execute(
+        "SELECT column_name FROM information_schema.columns WHERE table_name = ? ORDER BY ordinal_position",
+        [table_name],
+    ).fetchall()
+    return [r[0] for r in rows]
+
+def table_column_types(con, table_name):
+    """{column: DuckDB type} of an existing table ({} when it doesn't exist)."""
+    return dict(con.execute(
+        "SELECT column_name, data_type FROM information_schema.columns WHERE table_name = ?",
+        [table_name],
+    ).fetchall())
+
+def upsert_rows(con, table_name, source_sql, keys, scope=None):
+    """
+    Merge the rows of `source_sql` into `table_name` on its natural key.
+
+    - Only rows that are new or differ from the stored version are written
+      (source EXCEPT target), so work is proportional to the delta
+    - `scope` (a predicate) limits the comparison to one partition; without
+      it the source is the whole table (dimensions, single-file facts)
+    - Rows (in scope) whose key vanished from the source are deleted
+
+    Returns the number of rows written.
+    """
+    columns = ", ".join(table_columns(con, table_name))
+    scope_clause = f"WHERE {scope}" if scope else ""
+    key_match = " AND ".join(f"t.{k} IS NOT DISTINCT FROM s.{k}" for k in keys)
+
+    con.execute(f"CREATE OR REPLACE TEMP TABLE _incoming AS SELECT {columns} FROM {source_sql}")
+    con.execute(f"""
+        CREATE OR REPLACE TEMP TABLE _changed AS
+        SELECT * FROM _incoming
+        EXCEPT
+        SELECT {columns} FROM {table_name} {scope_clause}
     """)
-    print(f"Loaded table: {table_name}")
\ No newline at end of file
+
+    con.execute(f"DELETE FROM {table_name} t USING _changed s WHERE {key_match}")
+    con.execute(f"INSERT INTO {table_name} SELECT * FROM _changed")
+
+    con.execute(f"""
+        DELETE FROM {table_name} t
+        WHERE {scope or 'true'}
+          AND NOT EXISTS (SELECT 1 FROM _incoming s WHERE {key_match})
+    """)
+
+    return con.execute("SELECT count(*) FROM _changed").fetchone()[0]
+
+def upsert_parquet(con, table_name, parquet_path, order_by=None, full=False):
+    """
+    Incremental load of a clean-layer table (runs inside the caller's transaction).
+
+    - Missing table, changed columns / column types or full=True → full (re)create
+    - Otherwise only sources whose signature changed since the last load
+      are merged: the whole file for dimensions, the changed
+      league_id=/season_year= directories for partitioned facts
+    - Partitions that disappeared from the clean layer are deleted
+
+    Returns the changed / removed parts ("" for single files, e.g.
+    "league_id=140/season_year=2023" for partitions), or None when the
+    table was fully recreated.
+    """
+    ensure_load_state(con)
+    parts = source_parts(parquet_path)
+    loaded = dict(con.execute(
+        f"SELECT part, signature FROM {LOAD_STATE_TABLE} WHERE table_name = ?", [table_name]
+    ).fetchall())
+
+    source_types = {r[0]: r[1] for r in con.execute(f"DESCRIBE SELECT * FROM {parquet_scan(parquet_path)}").fetchall()}
+    existing_types = table_column_types(con, table_name)
+
+    if full or source_types != existing_types:
+        load_parquet_as_table(con, table_name, parquet_path, order_by=order_by)
+        count("rows_loaded", con.execute(f"SELECT count(*) FROM {table_name}").fetchone()[0])
+        con.execute(f"DELETE FROM {LOAD_STATE_TABLE} WHERE table_name = ?", [table_name])
+        changed = parts
+        removed = []
+        touched = None
+    else:
+        changed = {part: sig for part, sig in parts.items() if loaded.get(part) != sig}
+        removed = [part for part in loaded if part not in parts]
+
+        keys = NATURAL_KEYS[table_name]
+        written = 0
+        for part in sorted(changed):
+            if part:
+                written += upsert_rows(con, table_name, parquet_scan(parquet_path, part), keys,
+                                       scope=partition_predicate(part))
+            else:
+                written += upsert_rows(con, table_name, parquet_scan(parquet_path), keys)
+
+        for part in removed:
+            if part:
+                con.execute(f"DELETE FROM {table_name} WHERE {partition_predicate(part)}")
+
+        count("rows_loaded", written)
+        print(f"Upserted table: {table_name} ({len(changed)} changed / {len(parts)} source part(s), "
+              f"{written} row(s) written, {len(removed)} removed)")
+        touched = sorted(set(changed) | set(removed))
+
+    for part in removed:
+        con.execute(f"DELETE FROM {LOAD_STATE_TABLE} WHERE table_name = ? AND part = ?", [table_name, part])
+    for part, signature in changed.items():
+        con.execute(
+            f"INSERT OR REPLACE INTO {LOAD_STATE_TABLE} (table_name, part, signature) VALUES (?, ?, ?)",
+            [table_name, part, signature],
+        )
+
+    return touched
@@ -0,0 +1,468 @@
+"""
+Single-command ETL: extract → transform → load as one dependency graph.
+
+    python -m src.orchestrator [--leagues la_liga,brasileirao | all] [--seasons 2023,2024]
+        [--engine pandas] [--jobs 4] [--layers extract,transform,load] [--resume] [--force]
+
+Nodes (per league for extract, global for players, transform and load):
+
+    extract.league:<league> ──► extract.matches:<league> ──► transform.matches ─┐
+            │                                                                    ├─► load.facts ─┐
+            └──────────────────► transform.leagues / transform.seasons ─┐       │               ├─► load.marts
+    extract.teams:<league> ──► extract.players ──► transform.players ───────────┼─► load.dimensions ┘
+            └────────────────────────────────────────────► transform.teams ────┘
+
+- Independent nodes run in parallel threads (--jobs); extract nodes of
+  different leagues share the process-wide API client, rate limiter and
+  quota. Player pages of every league come from one node draining the
+  shared queue round-robin across leagues (fetch_players_batch)
+- Transform / load nodes are skipped when their inputs are unchanged since
+  they last succeeded: manifest sha256 of the raw payloads for transforms,
+  clean-layer file signatures for the load
+- Load nodes share one staged snapshot, promoted (after validate_load) when
+  load.marts succeeds; a failed load node discards it
+- State is saved after every node (data/pipeline_state.json); --resume
+  repeats the last invocation and only runs the nodes it did not finish
+"""
+import argparse
+import contextvars
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import ExitStack
+from src.extract.api_client import QuotaExceededError
+from src.extract.fetch_league_data import fetch_league_data
+from src.extract.fetch_matches import fetch_matches, fetch_matches_delta
+from src.extract.fetch_players import fetch_players_batch
+from src.extract.fetch_teams import fetch_teams
+from src.extract.league_config import resolve_league_keys
+from src.extract.manifest import get_manifest
+from src.extract.raw_store import flush_raw
+from src.instrumentation import set_profile_stage, stage
+from src.load.load_dimensions import DIMENSIONS, load_dimensions
+from src.load.load_facts import FACTS, load_facts
+from src.load.load_marts import load_marts
+from src.load.pipeline_load import validate_load
+from src.load.utils_db import get_db_path, source_parts, staged_database
+from src.transform.engine_streaming import TRANSFORMS
+from src.transform.pipeline_transform import STEPS, run_transform_step
+from src.transform.schemas import SCHEMAS
+from src.transform.utils_parquet import clean_table_exists
+
+STATE_PATH = "data/pipeline_state.json"
+LAYERS = ["extract", "transform", "load"]
+
+# Node statuses: done / skipped (inputs unchanged) / partial (stopped by the
+# daily quota, downstream still runs on what is stored) / failed / blocked
+# (a dependency failed)
+DONE, SKIPPED, PARTIAL, FAILED, BLOCKED = "done", "skipped", "partial", "failed", "blocked"
+SUCCEEDED = (DONE, SKIPPED, PARTIAL)
+
+# Raw endpoint extracted by each per-league extract node
+EXTRACT_ENDPOINTS = {"league": "leagues", "matches": "fixtures", "teams": "teams", "players": "players"}
+
+# Transform steps each load node reads (through their clean tables)
+LOAD_INPUTS = {
+    "load.dimensions": ["leagues", "teams", "players"],
+    "load.facts": ["matches", "teams", "players"],
+}
+
+
+class Node:
+    """
+    One step of the graph.
+
+    - run(inputs) does the work; `inputs` holds the results of its dependencies
+    - fingerprint() describes its inputs (None → always runs); a node whose
+      fingerprint matches the one it last succeeded with is skipped
+    """
+
+    def __init__(self, name: str, run, deps=(), fingerprint=None):
+        self.name = name
+        self.run = run
+        self.deps = list(deps)
+        self.fingerprint = fingerprint
+
+
+# -------------------------
+# FINGERPRINTS
+# -------------------------
+def raw_fingerprint(step: str) -> str | None:
+    """Manifest content hashes of a transform step's raw inputs + its output schemas."""
+    endpoint, _, tables = TRANSFORMS[step]
+    if not all(clean_table_exists(table) for table in tables):
+        return None
+
+    digest = hashlib.sha256()
+    for table in tables:
+        digest.update(f"{table}:{SCHEMAS[table]}\n".encode("utf-8"))
+    entries = get_manifest().entries(endpoint)
+    for e in sorted(entries, key=lambda e: (e["league_key"], e["season"], e["team_id"], e["page"])):
+        digest.update(f"{e['league_key']}:{e['season']}:{e['team_id']}:{e['page']}:{e['sha256']}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def clean_fingerprint(tables: dict) -> str | None:
+    """Signatures of the clean-layer files a load node reads (see source_parts)."""
+    if not get_db_path().exists():
+        return None
+    try:
+        signatures = {name: source_parts(path) for name, path in tables.items()}
+    except FileNotFoundError:
+        return None
+    return hashlib.sha256(json.dumps(signatures, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+# -------------------------
+# LOAD SESSION
+# -------------------------
+class LoadSession:
+    """
+    Staged snapshot shared by the load nodes of a run.
+
+    - Opened by the first load node that runs, promoted by commit()
+      (load.marts), discarded by abort() when a load node fails
+    - Nodes use the connection one at a time (one DuckDB transaction)
+    """
+
+    def __init__(self, full: bool = False):
+        self.full = full
+        self.lock = threading.Lock()
+        self.stack = None
+        self.con = None
+        self.aborted = False
+
+    def connection(self):
+        if self.aborted:
+            raise RuntimeError("Load snapshot was discarded after an earlier load node failed")
+        if self.con is None:
+            self.stack = ExitStack()
+            self.con = self.stack.enter_context(staged_database(full=self.full, validate=validate_load))
+        return self.con
+
+    def commit(self):
+        """Validate and promote the snapshot (raises if validation fails)."""
+        if self.con is not None:
+            self.con = None
+            self.stack.close()
+
+    def abort(self, error: BaseException):
+        self.aborted = True
+        if self.con is not None:
+            self.con = None
+            self.stack.__exit__(type(error), error, error.__traceback__)
+
+
+# -------------------------
+# GRAPH
+# -------------------------
+def extract_node(kind: str, league_key: str, seasons: list | None, force_update: bool, live: bool):
+    def run(inputs):
+        with stage(f"extract.{kind}:{league_key}", league=league_key):
+            try:
+                # None → every season in settings.yaml (the fetchers' default)
+                for season in seasons or [None]:
+                    if kind == "league":
+                        fetch_league_data(league_key=league_key, season=season, force_update=force_update,
+                                          return_data=False)
+                    elif kind == "matches" and live:
+                        fetch_matches_delta(league_key=league_key, season=season)
+                    elif kind == "matches":
+                        fetch_matches(league_key=league_key, season=season, force_update=force_update,
+                                      return_data=False)
+                    else:
+                        fetch_teams(league_key=league_key, season=season, force_update=force_update,
+                                    return_data=False)
+            finally:
+                # Buffered raw responses (Parquet backend) must be in the manifest for downstream nodes
+                flush_raw()
+    return run
+
+
+def players_node(league_keys: list, seasons: list | None, force_update: bool):
+    def run(inputs):
+        with stage("extract.players", leagues=",".join(league_keys)):
+            try:
+                if not fetch_players_batch(league_keys, seasons, force_update):
+                    raise QuotaExceededError("Daily request limit reached (remaining player pages stay queued)")
+            finally:
+                flush_raw()
+    return run
+
+
+def transform_node(step: str, engine: str, workers: int | None, full: bool):
+    def run(inputs):
+        run_transform_step(step, engine=engine, workers=workers, full=full)
+    return run
+
+
+def load_node(name: str, session: LoadSession):
+    def run(inputs):
+        with session.lock, stage(name, full=session.full):
+            try:
+                con = session.connection()
+                if name == "load.dimensions":
+                    return load_dimensions(con, session.full)
+                if name == "load.facts":
+                    return load_facts(con, session.full)
+
+                # Skipped dimension / fact nodes contribute no changes
+                changes = {}
+                for result in inputs.values():
+                    changes.update(result or {})
+                load_marts(con, changes, session.full)
+                session.commit()
+            except BaseException as e:
+                session.abort(e)
+                raise
+    return run
+
+
+def build_graph(league_keys: list, seasons: list | None = None, layers=LAYERS, engine: str = "pandas",
+                workers: int | None = None, full: bool = False, force_update: bool = False,
+                live: bool = False) -> dict:
+    """{name: Node} for the requested leagues and layers."""
+    nodes = {}
+
+    if "extract" in layers:
+        for league_key in league_keys:
+            for kind in ["league", "matches", "teams"]:
+                # live refresh reads the season bounds
+                deps = [f"extract.league:{league_key}"] if kind == "matches" else []
+                nodes[f"extract.{kind}:{league_key}"] = Node(
+                    f"extract.{kind}:{league_key}", extract_node(kind, league_key, seasons, force_update, live), deps,
+                )
+        # players are fetched per team, for every league from one queue
+        nodes["extract.players"] = Node(
+            "extract.players", players_node(league_keys, seasons, force_update),
+            [f"extract.teams:{league_key}" for league_key in league_keys],
+        )
+
+    if "transform" in layers:
+        for step in STEPS:
+            endpoint = TRANSFORMS[step][0]
+            deps = [
+                name for name in nodes
+                if name.startswith("extract.") and EXTRACT_ENDPOINTS[name.split(".")[1].split(":")[0]] == endpoint
+            ]
+            nodes[f"transform.{step}"] = Node(
+                f"transform.{step}", transform_node(step, engine, workers, full), deps,
+                fingerprint=None if full else (lambda step=step: raw_fingerprint(step)),
+            )
+
+    if "load" in layers:
+        session = LoadSession(full)
+        for name, tables in [("load.dimensions", DIMENSIONS), ("load.facts", FACTS)]:
+            deps = [f"transform.{step}" for step in LOAD_INPUTS[name] if f"transform.{step}" in nodes]
+            nodes[name] = Node(name, load_node(name, session), deps,
+                               fingerprint=None if full else (lambda tables=tables: clean_fingerprint(tables)))
+        nodes["load.marts"] = Node(
+            "load.marts", load_node("load.marts", session), ["load.dimensions", "load.facts"],
+            fingerprint=None if full else (lambda: clean_fingerprint({**DIMENSIONS, **FACTS})),
+        )
+
+    return nodes
+
+
+# -------------------------
+# STATE
+# -------------------------
+def load_state(path: str = STATE_PATH) -> dict:
+    if not os.path.exists(path):
+        return {"nodes": {}, "last_run": None}
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def save_state(state: dict, path: str = STATE_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+# -------------------------
+# SCHEDULER
+# -------------------------
+def run_graph(nodes: dict, jobs: int = 4, force: bool = False, completed=(), run_args: dict | None = None,
+              state_path: str = STATE_PATH) -> dict:
+    """
+    Run the graph, `jobs` nodes at a time; returns {name: status}.
+
+    - A node starts once all its dependencies succeeded; nodes downstream
+      of a failure are blocked, independent branches keep going
+    - `completed`: nodes to skip outright (--resume); `run_args` is saved
+      with the run so --resume can repeat it
+    - Load nodes are recorded as done only once load.marts promoted the
+      snapshot they wrote to
+    """
+    state = load_state(state_path)
+    status, results = {}, {}
+    staged = []  # load nodes waiting for the snapshot to be promoted
+    pending = set(nodes)
+    running = {}
+
+    def execute(node, inputs):
+        if node.name in completed:
+            return SKIPPED, None, None
+        fingerprint = node.fingerprint() if node.fingerprint else None
+        previous = state["nodes"].get(node.name, {})
+        if not force and fingerprint and previous.get("fingerprint") == fingerprint:
+            print(f"--- {node.name}: inputs unchanged, skipped")
+            return SKIPPED, None, fingerprint
+
+        print(f"\n>>> {node.name}")
+        try:
+            result = node.run(inputs)
+        except QuotaExceededError as e:
+            print(f"--- {node.name}: quota exhausted ({e}), continuing with stored data")
+            return PARTIAL, None, None
+        # First run: outputs did not exist yet, fingerprint them now
+        if node.fingerprint and fingerprint is None:
+            fingerprint = node.fingerprint()
+        return DONE, result, fingerprint
+
+    def record(name, node_status, fingerprint=None, error=None):
+        status[name] = node_status
+        entry = {"status": node_status, "finished_at": time.time()}
+        if node_status in SUCCEEDED:
+            entry["fingerprint"] = fingerprint or state["nodes"].get(name, {}).get("fingerprint")
+        if error:
+            entry["error"] = error
+        state["nodes"][name] = entry
+        state["last_run"]["nodes"][name] = node_status
+
+    state["last_run"] = {"started_at": time.time(), "args": run_args, "nodes": {}}
+    save_state(state, state_path)
+
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        while pending or running:
+            for name in sorted(pending):
+                node = nodes[name]
+                dep_status = [status.get(dep) for dep in node.deps if dep in nodes]
+                if any(s in (FAILED, BLOCKED) for s in dep_status):
+                    pending.discard(name)
+                    record(name, BLOCKED)
+                    print(f"--- {name}: blocked by a failed dependency")
+                elif all(s in SUCCEEDED for s in dep_status):
+                    pending.discard(name)
+                    inputs = {dep: results.get(dep) for dep in node.deps}
+                    # each node gets its own copy of the context (instrumentation stage stack)
+                    running[executor.submit(contextvars.copy_context().run, execute, node, inputs)] = name
+
+            if not running:
+                continue
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                name = running.pop(future)
+                try:
+                    node_status, result, fingerprint = future.result()
+                except Exception as e:
+                    print(f"!!! {name} failed: {e.__class__.__name__}: {e}")
+                    record(name, FAILED, error=f"{e.__class__.__name__}: {e}")
+                    if name.startswith("load."):
+                        for staged_name, _ in staged:
+                            record(staged_name, FAILED, error="load snapshot discarded")
+                        staged.clear()
+                    continue
+
+                results[name] = result
+                if name.startswith("load.") and node_status == DONE and name != "load.marts":
+                    staged.append((name, fingerprint))
+                    status[name] = DONE
+                    continue
+                record(name, node_status, fingerprint)
+                if name == "load.marts" and node_status == DONE:
+                    for staged_name, staged_fingerprint in staged:
+                        record(staged_name, DONE, staged_fingerprint or nodes[staged_name].fingerprint())
+                    staged.clear()
+            save_state(state, state_path)
+
+    # Load nodes that ran but never reached a promoted snapshot
+    for name, _ in staged:
+        record(name, FAILED, error="load snapshot not promoted")
+    state["last_run"]["finished_at"] = time.time()
+    save_state(state, state_path)
+    return status
+
+
+def run_orchestrator(leagues="la_liga", seasons=None, layers=LAYERS, engine: str = "pandas",
+                     workers: int | None = None, jobs: int = 4, full: bool = False, force: bool = False,
+                     force_update: bool = False, live: bool = False, resume: bool = False) -> dict:
+    """
+    Run extract → transform → load for one or more leagues as a DAG.
+
+    `leagues` / `seasons` take the same values as the extract pipeline: a
+    key, a list / comma-separated string of keys or "all"; a season, a list
+    of seasons or None (every season in settings.yaml).
+
+    With `resume=True` the arguments of the last invocation are reused and
+    nodes it finished are not run again (the failing node and everything
+    downstream of it are). Returns {node: status}.
+    """
+    if isinstance(seasons, int):
+        seasons = [seasons]
+    args = {"leagues": leagues, "seasons": seasons, "layers": list(layers), "engine": engine, "workers": workers,
+            "full": full, "force_update": force_update, "live": live}
+    completed = set()
+    if resume:
+        last_run = load_state().get("last_run") or {}
+        if not last_run.get("args"):
+            raise ValueError("Nothing to resume: no previous orchestrator run recorded")
+        args = last_run["args"]
+        completed = {name for name, s in last_run["nodes"].items() if s in (DONE, SKIPPED)}
+        print(f">>> Resuming last run ({len(completed)} node(s) already finished)")
+
+    nodes = build_graph(resolve_league_keys(args["leagues"]), args.get("seasons"), args["layers"], args["engine"],
+                        args["workers"], args["full"], args["force_update"], args["live"])
+
+    print("\n==============================")
+    print("      ETL ORCHESTRATOR")
+    print("==============================\n")
+    print(f">>> {len(nodes)} node(s), up to {jobs} in parallel")
+
+    with stage("orchestrator", leagues=args["leagues"], engine=args["engine"]):
+        status = run_graph(nodes, jobs=jobs, force=force, completed=completed, run_args=args)
+
+    counts = {}
+    for s in status.values():
+        counts[s] = counts.get(s, 0) + 1
+    print("\n==============================")
+    print("   ORCHESTRATOR DONE: " + ", ".join(f"{n} {s}" for s, n in sorted(counts.items())))
+    print("==============================\n")
+    for name in sorted(n for n, s in status.items() if s in (FAILED, BLOCKED)):
+        print(f"  {name}: {status[name]}")
+    return status
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run extract → transform → load as one dependency graph")
+    parser.add_argument("--league", "--leagues", dest="leagues", default="la_liga",
+                        help="League key(s) from leagues.yaml, comma-separated, or 'all' (default: la_liga)")
+    parser.add_argument("--season", "--seasons", dest="seasons", type=lambda value: [int(s) for s in value.split(",")],
+                        help="Season(s) to extract, comma-separated (default: all in settings.yaml)")
+    parser.add_argument("--layers", default=",".join(LAYERS),
+                        help="Comma-separated subset of extract,transform,load (e.g. transform,load offline)")
+    parser.add_argument("--engine", choices=["pandas", "streaming", "incremental", "sql"], default="pandas",
+                        help="Transform engine")
+    parser.add_argument("--workers", type=int, help="Workers of the streaming / incremental / sql engines")
+    parser.add_argument("--jobs", type=int, default=4, help="Nodes run in parallel")
+    parser.add_argument("--full", action="store_true", help="Rebuild every transform partition and load a fresh snapshot")
+    parser.add_argument("--force", action="store_true", help="Run transform / load nodes even if inputs are unchanged")
+    parser.add_argument("--force-update", action="store_true", help="Re-fetch raw files that already exist")
+    parser.add_argument("--live", action="store_true", help="Refresh only live-season fixtures")
+    parser.add_argument("--resume", action="store_true", help="Repeat the last run, skipping the nodes it finished")
+    parser.add_argument("--profile", metavar="NODE", help="Profile one node, e.g. transform.players")
+    args = parser.parse_args()
+
+    set_profile_stage(args.profile)
+    status = run_orchestrator(
+        leagues=args.leagues, seasons=args.seasons, layers=args.layers.split(","), engine=args.engine,
+        workers=args.workers, jobs=args.jobs, full=args.full, force=args.force, force_update=args.force_update,
+        live=args.live, resume=args.resume,
+    )
+    raise SystemExit(1 if any(s in (FAILED, BLOCKED) for s in status.values()) else 0)
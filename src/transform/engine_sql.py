@@ -0,0 +1,415 @@
+import argparse
+import duckdb
+import pyarrow as pa
+from src.extract.manifest import get_manifest
+from src.transform.engine_streaming import CLEAN_PATH, POST_PROCESS, TRANSFORMS, parse_chunk
+from src.transform.schemas import (DATE_FORMAT, DEDUP_KEYS, DEDUP_LATEST, SCHEMAS, TIMESTAMP_FORMAT, drop_duplicates,
+                                   drop_duplicates_latest)
+from src.transform.utils_parquet import write_clean_table
+
+# Star-schema tables as column specs over the unnested raw JSON:
+# - "items": one row per element of `response`
+# - "sub": one row per element of item[sub] (e.g. statistics, seasons)
+# Column paths start at "item", "sub" or "entry" (manifest key columns:
+# league_key, season, team_id, page); unlisted columns are NULL.
+SQL_TABLES = {
+    "dim_league": {
+        "endpoint": "leagues",
+        "columns": {
+            "league_id": ("item", "league", "id"),
+            "league_name": ("item", "league", "name"),
+            "league_type": ("item", "league", "type"),
+            "league_logo": ("item", "league", "logo"),
+            "country_name": ("item", "country", "name"),
+            "country_code": ("item", "country", "code"),
+            "country_flag": ("item", "country", "flag"),
+        },
+    },
+    "dim_season": {
+        "endpoint": "leagues",
+        "sub": "seasons",
+        "columns": {
+            "league_id": ("item", "league", "id"),
+            "season_year": ("sub", "year"),
+            "start_date": ("sub", "start"),
+            "end_date": ("sub", "end"),
+            "is_current": ("sub", "current"),
+            "coverage_fixtures_events": ("sub", "coverage", "fixtures", "events"),
+            "coverage_fixtures_lineups": ("sub", "coverage", "fixtures", "lineups"),
+            "coverage_fixtures_statistics": ("sub", "coverage", "fixtures", "statistics"),
+            "coverage_fixtures_players": ("sub", "coverage", "fixtures", "players"),
+            "coverage_standings": ("sub", "coverage", "standings"),
+            "coverage_players": ("sub", "coverage", "players"),
+            "coverage_top_scorers": ("sub", "coverage", "top_scorers"),
+            "coverage_top_assists": ("sub", "coverage", "top_assists"),
+            "coverage_top_cards": ("sub", "coverage", "top_cards"),
+        },
+    },
+    "dim_team": {
+        "endpoint": "teams",
+        "columns": {
+            "team_id": ("item", "team", "id"),
+            "team_name": ("item", "team", "name"),
+            "team_country": ("item", "team", "country"),
+            "team_founded": ("item", "team", "founded"),
+            "team_logo": ("item", "team", "logo"),
+            "venue_id": ("item", "venue", "id"),
+        },
+    },
+    "dim_venue": {
+        "endpoint": "teams",
+        "columns": {
+            "venue_id": ("item", "venue", "id"),
+            "venue_name": ("item", "venue", "name"),
+            "venue_city": ("item", "venue", "city"),
+            "venue_capacity": ("item", "venue", "capacity"),
+            "venue_surface": ("item", "venue", "surface"),
+            "venue_address": ("item", "venue", "address"),
+            "venue_image": ("item", "venue", "image"),
+        },
+    },
+    "fact_team_season": {
+        "endpoint": "teams",
+        "columns": {
+            "team_id": ("item", "team", "id"),
+            "league_key": ("entry", "league_key"),
+            "season_year": ("entry", "season"),
+        },
+    },
+    "fact_match": {
+        "endpoint": "fixtures",
+        "columns": {
+            "fixture_id": ("item", "fixture", "id"),
+            "league_id": ("item", "league", "id"),
+            "season_year": ("entry", "season"),
+            "venue_id": ("item", "fixture", "venue", "id"),
+            "home_team_id": ("item", "teams", "home", "id"),
+            "away_team_id": ("item", "teams", "away", "id"),
+            "date": ("item", "fixture", "date"),
+            "status": ("item", "fixture", "status", "short"),
+            "referee": ("item", "fixture", "referee"),
+            "timezone": ("item", "fixture", "timezone"),
+            "goals_home": ("item", "goals", "home"),
+            "goals_away": ("item", "goals", "away"),
+            "halftime_home": ("item", "score", "halftime", "home"),
+            "halftime_away": ("item", "score", "halftime", "away"),
+            "fulltime_home": ("item", "score", "fulltime", "home"),
+            "fulltime_away": ("item", "score", "fulltime", "away"),
+            "extratime_home": ("item", "score", "extratime", "home"),
+            "extratime_away": ("item", "score", "extratime", "away"),
+            "penalty_home": ("item", "score", "penalty", "home"),
+            "penalty_away": ("item", "score", "penalty", "away"),
+        },
+    },
+    "dim_player": {
+        "endpoint": "players",
+        "columns": {
+            "player_id": ("item", "player", "id"),
+            "player_name": ("item", "player", "name"),
+            "firstname": ("item", "player", "firstname"),
+            "lastname": ("item", "player", "lastname"),
+            "nationality": ("item", "player", "nationality"),
+            "birth_date": ("item", "player", "birth", "date"),
+            "birth_place": ("item", "player", "birth", "place"),
+            "birth_country": ("item", "player", "birth", "country"),
+            "height": ("item", "player", "height"),
+            "weight": ("item", "player", "weight"),
+            "photo": ("item", "player", "photo"),
+        },
+    },
+    "fact_player_season": {
+        "endpoint": "players",
+        "sub": "statistics",
+        "columns": {
+            "player_id": ("item", "player", "id"),
+            "team_id": ("entry", "team_id"),
+            "league_id": ("sub", "league", "id"),
+            "season_year": ("entry", "season"),
+            "position": ("sub", "games", "position"),
+            "appearances": ("sub", "games", "appearences"),
+            "minutes": ("sub", "games", "minutes"),
+            "rating": ("sub", "games", "rating"),
+            "goals": ("sub", "goals", "total"),
+            "assists": ("sub", "goals", "assists"),
+            "yellow_cards": ("sub", "cards", "yellow"),
+            "red_cards": ("sub", "cards", "red"),
+        },
+    },
+}
+
+# Manifest entries registered in DuckDB (ord = read order, first wins on dedup)
+ENTRY_SCHEMA = pa.schema([
+    ("ord", pa.int64()),
+    ("path", pa.string()),
+    ("league_key", pa.string()),
+    ("season", pa.int64()),
+    ("team_id", pa.int64()),
+    ("page", pa.int64()),
+])
+
+
+# -------------------------
+# SQL BUILDING
+# -------------------------
+def sql_type(type_: pa.DataType) -> str:
+    if pa.types.is_int16(type_):
+        return "SMALLINT"
+    if pa.types.is_int32(type_):
+        return "INTEGER"
+    if pa.types.is_int64(type_):
+        return "BIGINT"
+    if pa.types.is_boolean(type_):
+        return "BOOLEAN"
+    if pa.types.is_decimal(type_):
+        return f"DECIMAL({type_.precision}, {type_.scale})"
+    return "VARCHAR"
+
+
+def column_sql(path, type_: pa.DataType) -> str:
+    """
+    Typed expression for one column spec (same parsing rules as
+    schemas.typed_array: unparseable dates / ratings become NULL).
+    """
+    if path is None:
+        value = "CAST(NULL AS VARCHAR)"
+    elif path[0] == "entry":
+        value = f"CAST(e.{path[1]} AS VARCHAR)"
+    else:
+        value = f"{path[0]} ->> '$.{'.'.join(path[1:])}'"
+
+    if pa.types.is_timestamp(type_):
+        return f"try_strptime({value}, '{TIMESTAMP_FORMAT}')"
+    if pa.types.is_date(type_):
+        return f"CAST(try_strptime({value}, '{DATE_FORMAT}') AS DATE)"
+    if sql_type(type_) == "VARCHAR":
+        return value
+    return f"TRY_CAST({value} AS {sql_type(type_)})"
+
+
+def table_sql(table: str) -> str:
+    """
+    SELECT for one star-schema table over the `payloads` relation,
+    de-duplicated on DEDUP_KEYS (first row in manifest order wins; for
+    DEDUP_LATEST tables the first row of the latest season) and returned
+    in manifest order, like the Python engines.
+    """
+    spec = SQL_TABLES[table]
+    schema = SCHEMAS[table]
+
+    columns = ",\n            ".join(
+        f"{column_sql(spec['columns'].get(field.name), field.type)} AS {field.name}" for field in schema
+    )
+    keys = ", ".join(DEDUP_KEYS[table] or schema.names)
+    order = "ord, item_ord, sub_ord"
+    if table in DEDUP_LATEST:
+        order = f"entry_season DESC, {order}"
+
+    sub = spec.get("sub")
+    if sub:
+        rows = f"""
+            SELECT e.*, item_ord,
+                   unnest(json_extract(item, '$.{sub}[*]')) AS sub,
+                   unnest(range(CAST(coalesce(json_array_length(item, '$.{sub}'), 0) AS BIGINT))) AS sub_ord
+            FROM items e
+        """
+    else:
+        rows = "SELECT e.*, 0 AS sub_ord FROM items e"
+
+    return f"""
+        WITH items AS (
+            SELECT e.*,
+                   unnest(json_extract(response, '$[*]')) AS item,
+                   unnest(range(CAST(coalesce(json_array_length(response), 0) AS BIGINT))) AS item_ord
+            FROM payloads e
+        ),
+        rows AS ({rows}),
+        typed AS (
+            SELECT
+            {columns},
+            ord, item_ord, sub_ord, e.season AS entry_season
+            FROM rows e
+        )
+        SELECT * EXCLUDE (ord, item_ord, sub_ord, entry_season)
+        FROM typed
+        QUALIFY row_number() OVER (PARTITION BY {keys} ORDER BY {order}) = 1
+        ORDER BY ord, item_ord, sub_ord
+    """
+
+
+def load_payloads_sql(con, endpoint: str) -> int:
+    """
+    Register the latest raw payload of every manifest entry as `payloads`
+    (key columns + `response` JSON).
+
+    - JSON files: read_json over the file list; keys come from the
+      manifest row matching each filename (no filename parsing)
+    - Parquet segments: read_parquet, keeping the last row of each key
+      within a segment (same rule as raw_store)
+    """
+    # Entries grouped by file in the order raw_store.load_payloads yields them,
+    # so "first row wins" picks the same duplicate as the Python engines
+    by_path = {}
+    for entry in get_manifest().entries(endpoint):
+        by_path.setdefault(entry["path"], []).append(entry)
+    entries = [entry for group in by_path.values() for entry in group]
+
+    con.register("entries", pa.Table.from_pylist(
+        [dict(entry, ord=i) for i, entry in enumerate(entries)], schema=ENTRY_SCHEMA,
+    ))
+
+    json_paths = sorted({e["path"] for e in entries if e["path"].endswith(".json")})
+    segment_paths = sorted({e["path"] for e in entries if not e["path"].endswith(".json")})
+
+    sources = []
+    if json_paths:
+        sources.append("""
+            SELECT e.*, r.response
+            FROM entries e
+            JOIN read_json($json_paths, columns = {'response': 'JSON'}, filename = true) r
+              ON r.filename = e.path
+        """)
+    if segment_paths:
+        sources.append("""
+            SELECT e.*, CAST(s.payload AS JSON) -> '$.response' AS response
+            FROM entries e
+            JOIN (
+                SELECT *
+                FROM read_parquet($segment_paths, filename = true, file_row_number = true)
+                QUALIFY row_number() OVER (
+                    PARTITION BY filename, league_key, season, team_id, page
+                    ORDER BY file_row_number DESC
+                ) = 1
+            ) s
+              ON s.filename = e.path AND s.league_key = e.league_key AND s.season = e.season
+             AND s.team_id = e.team_id AND s.page = e.page
+        """)
+
+    if not sources:
+        con.execute("CREATE OR REPLACE TEMP TABLE payloads AS "
+                    "SELECT *, CAST(NULL AS JSON) AS response FROM entries LIMIT 0")
+        return 0
+
+    params = {}
+    if json_paths:
+        params["json_paths"] = json_paths
+    if segment_paths:
+        params["segment_paths"] = segment_paths
+
+    con.execute(f"CREATE OR REPLACE TEMP TABLE payloads AS {' UNION ALL '.join(sources)}", params)
+    return len(entries)
+
+
+# -------------------------
+# ENGINE
+# -------------------------
+def sql_tables(step: str, workers: int | None = None) -> dict:
+    """{table: typed Arrow table} for a transform step, computed inside DuckDB."""
+    endpoint, _, tables = TRANSFORMS[step]
+
+    con = duckdb.connect()
+    try:
+        if workers:
+            con.execute(f"SET threads = {int(workers)}")
+        load_payloads_sql(con, endpoint)
+
+        results = {}
+        for table in tables:
+            result = con.execute(table_sql(table)).to_arrow_table().cast(SCHEMAS[table])
+            post_process = POST_PROCESS.get(table)
+            if post_process and result.num_rows:
+                result = post_process(result)
+            results[table] = result
+        return results
+    finally:
+        con.close()
+
+
+def run_sql_transform(step: str, workers: int | None = None, output_dir: str = CLEAN_PATH) -> dict:
+    """
+    SQL-native version of a transform step.
+
+    - Raw payloads are scanned by DuckDB (read_json / read_parquet) and
+      unnested (response, statistics, seasons) in SQL, multi-threaded,
+      without building Python dicts.
+    - Output tables match the pandas engine (types, dedup, row order).
+
+    Returns {table: rows_written}.
+    """
+    counts = {}
+    for table, result in sql_tables(step, workers).items():
+        write_clean_table(result, table, output_dir)
+        counts[table] = result.num_rows
+
+    summary = ", ".join(f"{rows} {table}" for table, rows in counts.items())
+    print(f"Saved {summary} rows (sql).")
+
+    return counts
+
+
+# -------------------------
+# PARITY CHECK (SQL vs Python builders)
+# -------------------------
+def python_tables(step: str) -> dict:
+    """Reference tables from the column builders shared by the pandas / streaming engines."""
+    endpoint, column_fn, tables = TRANSFORMS[step]
+    batches = parse_chunk(column_fn, get_manifest().entries(endpoint), tables)
+
+    results = {}
+    for table in tables:
+        result = pa.Table.from_batches([batches[table]])
+        if table in DEDUP_LATEST:
+            result = drop_duplicates_latest(result, DEDUP_KEYS[table]).select(SCHEMAS[table].names)
+        else:
+            result = drop_duplicates(result, DEDUP_KEYS[table])
+        post_process = POST_PROCESS.get(table)
+        if post_process and result.num_rows:
+            result = post_process(result)
+        results[table] = result
+    return results
+
+
+def _plain(table: pa.Table) -> pa.Table:
+    """Dictionary columns as plain strings (dictionaries differ between engines)."""
+    return pa.table({
+        name: column.cast(column.type.value_type) if pa.types.is_dictionary(column.type) else column
+        for name, column in zip(table.column_names, table.columns)
+    })
+
+
+def check_parity(steps: list | None = None, workers: int | None = None) -> bool:
+    """Compare the SQL engine with the Python builders table by table (values, types, order)."""
+    ok = True
+    for step in steps or list(TRANSFORMS):
+        expected = python_tables(step)
+        actual = sql_tables(step, workers)
+
+        for table in expected:
+            same = (actual[table].schema.equals(expected[table].schema)
+                    and _plain(actual[table]).equals(_plain(expected[table])))
+            ok = ok and same
+            status = "OK" if same else "MISMATCH"
+            print(f"  {table}: {status} ({actual[table].num_rows} sql / {expected[table].num_rows} python rows)")
+
+            if not same:
+                for name in expected[table].column_names:
+                    if not _plain(actual[table]).column(name).equals(_plain(expected[table]).column(name)):
+                        print(f"    column differs: {name}")
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="DuckDB SQL transform engine")
+    parser.add_argument("--check", action="store_true", help="Compare with the Python builders instead of writing")
+    parser.add_argument("--only", choices=list(TRANSFORMS), help="Run / check only a specific step")
+    parser.add_argument("--workers", type=int, help="DuckDB threads (default: all cores)")
+    args = parser.parse_args()
+
+    steps = [args.only] if args.only else list(TRANSFORMS)
+
+    if args.check:
+        if not check_parity(steps, args.workers):
+            raise SystemExit("SQL engine output differs from the pandas path.")
+        print("SQL engine matches the pandas path.")
+    else:
+        for step in steps:
+            run_sql_transform(step, args.workers)
@@ -0,0 +1,236 @@
+import os
+import shutil
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import pyarrow as pa
+import pyarrow.parquet as pq
+from src.extract.manifest import get_manifest
+from src.extract.raw_store import load_payloads
+from src.instrumentation import count
+from src.transform.schemas import (DEDUP_KEYS, DEDUP_LATEST, PARTITION_COLS, RANK_COLUMN, SCHEMAS, build_batch,
+                                   drop_duplicates_latest, from_pandas, to_pandas, with_rank)
+from src.transform.transform_leagues import enrich_leagues, league_columns
+from src.transform.transform_matches import match_columns
+from src.transform.transform_players import player_columns
+from src.transform.transform_seasons import season_columns
+from src.transform.transform_teams import team_columns
+from src.transform.utils_enrich import extend_new_rows, keep_latest_rows, latest_columns, new_rows_mask
+from src.transform.utils_parquet import clean_table_path, promote_dataset, write_partitioned
+
+CLEAN_PATH = "data/clean"
+
+# Transform step → (raw endpoint, column builder, output tables)
+TRANSFORMS = {
+    "leagues": ("leagues", league_columns, ["dim_league"]),
+    "seasons": ("leagues", season_columns, ["dim_season"]),
+    "teams": ("teams", team_columns, ["dim_team", "dim_venue", "fact_team_season"]),
+    "matches": ("fixtures", match_columns, ["fact_match"]),
+    "players": ("players", player_columns, ["dim_player", "fact_player_season"]),
+}
+
+
+def _enrich_league_table(table: pa.Table) -> pa.Table:
+    return from_pandas(enrich_leagues(to_pandas(table)), "dim_league")
+
+
+# Per-table hooks applied to de-duplicated rows before they are written
+POST_PROCESS = {
+    "dim_league": _enrich_league_table,
+}
+
+
+def parse_chunk(column_fn, entries: list, tables: list) -> dict:
+    """
+    Worker: parse a chunk of raw payloads into one Arrow RecordBatch per table
+    (typed with the schemas.py registry).
+
+    Rows already seen in the chunk are dropped here (first one wins), so
+    repeated players / pages are never built or sent back to the parent.
+    DEDUP_LATEST tables keep the row of the latest season instead, and
+    their batch carries that season as RANK_COLUMN.
+    """
+    columns = {table: {} for table in tables}
+    seen = {table: set() for table in tables}
+    latest = {table: {} for table in tables if table in DEDUP_LATEST}
+    names = {}
+
+    for entry, data in load_payloads(entries):
+        for table, table_columns in column_fn(entry, data).items():
+            keys = DEDUP_KEYS[table] or list(table_columns)
+            if table in latest:
+                names.setdefault(table, list(table_columns))
+                keep_latest_rows(latest[table], table_columns, keys, entry["season"])
+            else:
+                extend_new_rows(columns[table], table_columns, keys, seen[table])
+
+    batches = {table: build_batch(columns[table], table) for table in tables if table not in latest}
+    for table, rows in latest.items():
+        table_columns, ranks = latest_columns(rows, names.get(table, []))
+        batches[table] = with_rank(build_batch(table_columns, table), ranks)
+    return {table: batches[table] for table in tables}
+
+
+def chunk_entries(entries: list, files_per_task: int):
+    """
+    Group manifest entries into worker tasks.
+
+    Entries sharing a Parquet segment stay in the same task so each
+    segment is read once.
+    """
+    chunk = []
+    current_path = None
+
+    for entry in entries:
+        same_segment = not entry["path"].endswith(".json") and entry["path"] == current_path
+        if len(chunk) >= files_per_task and not same_segment:
+            yield chunk
+            chunk = []
+        chunk.append(entry)
+        current_path = entry["path"]
+
+    if chunk:
+        yield chunk
+
+
+class StreamingTableWriter:
+    """
+    Incremental Parquet writer for one output table.
+
+    - Drops rows whose dedup key was already written (first one wins,
+      like drop_duplicates in the pandas path)
+    - Buffers batches until `batch_size` rows, then writes one row group
+      (partitioned facts: one file per partition per flush)
+    - Writes to a temp file / directory and swaps it in on close
+    """
+
+    def __init__(self, table: str, output_dir: str = CLEAN_PATH, batch_size: int = 50_000):
+        self.table = table
+        self.schema = SCHEMAS[table]
+        self.keys = DEDUP_KEYS[table] or self.schema.names
+        self.batch_size = batch_size
+        self.post_process = POST_PROCESS.get(table)
+
+        os.makedirs(output_dir, exist_ok=True)
+        self.output_path = clean_table_path(table, output_dir)
+        self.tmp_path = f"{self.output_path}.tmp"
+        self.partitioned = table in PARTITION_COLS
+
+        if self.partitioned:
+            shutil.rmtree(self.tmp_path, ignore_errors=True)
+            self.writer = None
+        else:
+            self.writer = pq.ParquetWriter(self.tmp_path, self.schema)
+        self.flushes = 0
+        self.latest = table in DEDUP_LATEST
+        self.seen = set()
+        self.pending = []
+        self.pending_rows = 0
+        self.rows_written = 0
+
+    def write(self, batch: pa.RecordBatch):
+        if self.latest:
+            return self._write_latest(batch)
+
+        key_columns = {name: batch.column(name).to_pylist() for name in self.keys}
+        mask = new_rows_mask(key_columns, self.keys, self.seen)
+
+        table = pa.Table.from_batches([batch.filter(pa.array(mask, type=pa.bool_()))], schema=self.schema)
+        if table.num_rows == 0:
+            return
+
+        if self.post_process:
+            table = self.post_process(table)
+
+        self.pending.append(table)
+        self.pending_rows += table.num_rows
+
+        if self.pending_rows >= self.batch_size:
+            self.flush()
+
+    def _write_latest(self, batch: pa.RecordBatch):
+        """
+        DEDUP_LATEST tables: a later batch can replace any earlier row, so
+        rows stay pending until close(), compacted to one row per key
+        whenever batch_size new rows have arrived.
+        """
+        self.pending.append(pa.Table.from_batches([batch]))
+        self.pending_rows += batch.num_rows
+        if self.pending_rows >= self.batch_size:
+            self._compact()
+
+    def _compact(self):
+        compacted = drop_duplicates_latest(pa.concat_tables(self.pending), self.keys)
+        self.pending = [compacted]
+        self.pending_rows = 0
+
+    def flush(self):
+        if self.latest and self.pending:
+            self._compact()
+            table = self.pending[0].drop_columns([RANK_COLUMN])
+            self.pending = [self.post_process(table) if self.post_process else table]
+            self.pending_rows = table.num_rows
+        if not self.pending:
+            return
+        if self.partitioned:
+            write_partitioned(pa.concat_tables(self.pending), self.table, self.tmp_path,
+                              basename_template=f"part-{self.flushes}-{{i}}.parquet")
+        else:
+            self.writer.write_table(pa.concat_tables(self.pending))
+        self.flushes += 1
+        self.rows_written += self.pending_rows
+        self.pending = []
+        self.pending_rows = 0
+
+    def close(self) -> int:
+        self.flush()
+        if self.partitioned:
+            promote_dataset(self.tmp_path, self.output_path)
+        else:
+            self.writer.close()
+            os.replace(self.tmp_path, self.output_path)
+        count("rows_written", self.rows_written)
+        return self.rows_written
+
+
+def run_streaming_transform(step: str, workers: int | None = None, files_per_task: int = 50,
+                            batch_size: int = 50_000, output_dir: str = CLEAN_PATH) -> dict:
+    """
+    Parallel, streaming version of a transform step.
+
+    - Raw payloads are parsed in a process pool; each worker returns Arrow
+      record batches for its chunk of files.
+    - Results are consumed in submission order through a bounded window of
+      in-flight tasks, de-duplicated and appended to Parquet with a
+      streaming writer.
+    - Peak memory depends on batch_size / files_per_task and the dedup key
+      sets, not on the size of the raw tree.
+
+    Returns {table: rows_written}.
+    """
+    endpoint, column_fn, tables = TRANSFORMS[step]
+    entries = get_manifest().entries(endpoint)
+
+    writers = {table: StreamingTableWriter(table, output_dir, batch_size) for table in tables}
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = workers * 2
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        in_flight = deque()
+
+        for chunk in chunk_entries(entries, files_per_task):
+            in_flight.append(pool.submit(parse_chunk, column_fn, chunk, tables))
+
+            if len(in_flight) >= max_in_flight:
+                for table, batch in in_flight.popleft().result().items():
+                    writers[table].write(batch)
+
+        while in_flight:
+            for table, batch in in_flight.popleft().result().items():
+                writers[table].write(batch)
+
+    counts = {table: writer.close() for table, writer in writers.items()}
+
+    summary = ", ".join(f"{rows} {table}" for table, rows in counts.items())
+    print(f"Saved {summary} rows (streaming, {workers} workers).")
+
+    return counts
@@ -0,0 +1,223 @@
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+import pyarrow as pa
+import pyarrow.parquet as pq
+from src.extract.manifest import get_manifest
+from src.transform.engine_streaming import CLEAN_PATH, POST_PROCESS, TRANSFORMS, parse_chunk
+from src.transform.schemas import DEDUP_KEYS, DEDUP_LATEST, PARTITION_COLS, SCHEMAS, drop_duplicates
+from src.transform.utils_parquet import clean_table_exists, write_clean_table
+
+PROCESSED_PATH = "data/processed"
+STATE_PATH = os.path.join(PROCESSED_PATH, "transform_state.json")
+
+# Steps may run in parallel threads (orchestrator); each one rewrites the state file
+_state_lock = threading.Lock()
+
+
+# -------------------------
+# STATE (which raw inputs built which partition)
+# -------------------------
+def load_state(path: str = STATE_PATH) -> dict:
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def save_state(state: dict, path: str = STATE_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def group_partitions(entries: list) -> dict:
+    """Group manifest entries by output partition: {(league_key, season): [entries]}."""
+    partitions = {}
+    for entry in entries:
+        partitions.setdefault((entry["league_key"], entry["season"]), []).append(entry)
+    return partitions
+
+
+def partition_fingerprint(entries: list, tables: list = ()) -> str:
+    """
+    Content hash of a partition's raw inputs (manifest sha256 of every
+    file/page) and of the output schemas, so a type change in schemas.py
+    rebuilds partition files written with the old types.
+    """
+    digest = hashlib.sha256()
+    for table in tables:
+        digest.update(f"{table}:{SCHEMAS[table]}\n".encode("utf-8"))
+    for entry in sorted(entries, key=lambda e: (e["team_id"], e["page"])):
+        digest.update(f"{entry['team_id']}:{entry['page']}:{entry['sha256']}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def partition_path(table: str, league_key: str, season: int, root: str = PROCESSED_PATH) -> str:
+    return os.path.join(root, table, f"{league_key}_{season}.parquet")
+
+
+def _write_atomic(table: pa.Table, path: str):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    pq.write_table(table, tmp_path)
+    os.replace(tmp_path, path)
+
+
+# -------------------------
+# PARTITIONS
+# -------------------------
+def build_partition(step: str, league_key: str, season: int, entries: list, root: str = PROCESSED_PATH):
+    """
+    Worker: re-parse one league-season and overwrite its intermediate files
+    (one per output table).
+    """
+    _, column_fn, tables = TRANSFORMS[step]
+    batches = parse_chunk(column_fn, entries, tables)
+
+    for table in tables:
+        # One season per partition: the season rank of DEDUP_LATEST rows isn't needed on disk
+        batch = batches[table].select(SCHEMAS[table].names)
+        _write_atomic(pa.Table.from_batches([batch], schema=SCHEMAS[table]),
+                      partition_path(table, league_key, season, root))
+
+
+def partition_keys(table: str, league_key: str, season: int, root: str = PROCESSED_PATH) -> set:
+    """Output partition keys (e.g. (league_id, season_year)) of one raw partition file."""
+    columns = PARTITION_COLS[table]
+    part = pq.read_table(partition_path(table, league_key, season, root), columns=columns)
+    return set(zip(*(part.column(col).to_pylist() for col in columns)))
+
+
+def touched_partitions(table: str, partitions: list, root: str = PROCESSED_PATH) -> set:
+    """Output partition keys (e.g. (league_id, season_year)) present in rebuilt raw partitions."""
+    touched = set()
+    for league_key, season in partitions:
+        touched |= partition_keys(table, league_key, season, root)
+    return touched
+
+
+def _filter_partitions(table: pa.Table, name: str, keys: set) -> pa.Table:
+    """Rows of `table` whose partition key is in `keys`."""
+    columns = PARTITION_COLS[name]
+    row_keys = zip(*(table.column(col).to_pylist() for col in columns))
+    return table.filter(pa.array([key in keys for key in row_keys], type=pa.bool_()))
+
+
+def assemble_table(table: str, partitions: list, root: str = PROCESSED_PATH,
+                   output_dir: str = CLEAN_PATH, changed: list | None = None) -> int:
+    """
+    Rebuild a clean table from its partition files.
+
+    Partitions are concatenated in manifest order and de-duplicated like
+    the pandas path (first occurrence wins; DEDUP_LATEST tables take the
+    latest season first), so the output is the same as a full rebuild. For Hive-partitioned facts, passing `changed` reads
+    only the partition files that feed the output partitions those raw
+    partitions touch, de-duplicates within them and rewrites just those
+    directories. Returns the number of rows written.
+    """
+    schema = SCHEMAS[table]
+    if table in DEDUP_LATEST:
+        sources = sorted(partitions, key=lambda p: (-p[1], p[0]))
+    else:
+        sources = sorted(partitions)
+
+    only = None
+    if changed is not None and table in PARTITION_COLS:
+        only = touched_partitions(table, changed, root)
+        sources = [(league_key, season) for league_key, season in sources
+                   if partition_keys(table, league_key, season, root) & only]
+
+    parts = [pq.read_table(partition_path(table, league_key, season, root), schema=schema)
+             for league_key, season in sources]
+    if only is not None:
+        parts = [_filter_partitions(part, table, only) for part in parts]
+
+    combined = pa.concat_tables(parts) if parts else schema.empty_table()
+    result = drop_duplicates(combined, DEDUP_KEYS[table])
+
+    post_process = POST_PROCESS.get(table)
+    if post_process and result.num_rows:
+        result = post_process(result)
+
+    write_clean_table(result, table, output_dir, partitions=only)
+    return result.num_rows
+
+
+def run_incremental_transform(step: str, workers: int | None = None, full: bool = False,
+                              root: str = PROCESSED_PATH, output_dir: str = CLEAN_PATH) -> dict:
+    """
+    Incremental version of a transform step.
+
+    - Raw inputs are grouped into league-season partitions; each partition
+      is fingerprinted from the manifest hashes of its files/pages.
+    - Only partitions whose fingerprint changed (or that are new) are
+      re-parsed into data/processed/{table}/{league_key}_{season}.parquet.
+    - Hive-partitioned facts only rewrite the league_id/season_year
+      directories those partitions feed.
+    - Partitions whose raw inputs disappeared are dropped.
+    - Clean tables are re-assembled from the partition files only when
+      something changed (or the output is missing).
+    - `full=True` ignores the saved state and rebuilds every partition.
+
+    Returns {"changed": n, "unchanged": n, "removed": n}.
+    """
+    endpoint, _, tables = TRANSFORMS[step]
+    partitions = group_partitions(get_manifest().entries(endpoint))
+
+    state = load_state()
+    previous = {} if full else state.get(step, {})
+
+    fingerprints = {
+        f"{league_key}_{season}": partition_fingerprint(entries, tables)
+        for (league_key, season), entries in partitions.items()
+    }
+
+    changed = [
+        (league_key, season) for league_key, season in partitions
+        if previous.get(f"{league_key}_{season}") != fingerprints[f"{league_key}_{season}"]
+        or any(not os.path.exists(partition_path(t, league_key, season, root)) for t in tables)
+    ]
+    removed = [name for name in previous if name not in fingerprints]
+
+    if changed:
+        workers = workers or min(len(changed), os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(build_partition, step, league_key, season, partitions[(league_key, season)], root)
+                for league_key, season in changed
+            ]
+            for future in futures:
+                future.result()
+
+    for name in removed:
+        for table in tables:
+            path = os.path.join(root, table, f"{name}.parquet")
+            if os.path.exists(path):
+                os.remove(path)
+
+    outputs_missing = any(not clean_table_exists(t, output_dir) for t in tables)
+
+    if changed or removed or outputs_missing:
+        # Removed inputs or a missing output need a full rewrite of partitioned facts
+        only_changed = None if removed or outputs_missing else changed
+        counts = {
+            table: assemble_table(table, list(partitions), root, output_dir, changed=only_changed)
+            for table in tables
+        }
+        summary = ", ".join(f"{rows} {table}" for table, rows in counts.items())
+        print(f"Wrote {summary} rows ({len(changed)} partition(s) rebuilt, "
+              f"{len(partitions) - len(changed)} unchanged, {len(removed)} removed).")
+    else:
+        print(f"  {step}: {len(partitions)} partition(s) unchanged — nothing to do.")
+
+    with _state_lock:
+        state = load_state()
+        state[step] = fingerprints
+        save_state(state)
+
+    return {"changed": len(changed), "unchanged": len(partitions) - len(changed), "removed": len(removed)}
@@ -1,16 +1,42 @@
 import argparse
 
+from src.instrumentation import set_profile_stage, stage
 from src.transform.transform_leagues import transform_leagues
 from src.transform.transform_seasons import transform_seasons
 from src.transform.transform_teams import transform_teams
 from src.transform.transform_matches import transform_matches
 from src.transform.transform_players import transform_players
+from src.transform.engine_streaming import TRANSFORMS, run_streaming_transform
+from src.transform.incremental import run_incremental_transform
+from src.transform.engine_sql import run_sql_transform
 
 
-def run_transform_pipeline(only: str | None = None):
+STEPS = ["leagues", "seasons", "teams", "matches", "players"]
+
+# pandas engine: one function per step
+PANDAS_STEPS = {
+    "leagues": transform_leagues,
+    "seasons": transform_seasons,
+    "teams": transform_teams,
+    "matches": transform_matches,
+    "players": transform_players,
+}
+
+
+def run_transform_pipeline(only: str | None = None, engine: str = "pandas", workers: int | None = None,
+                           full: bool = False):
     """
     Orchestrate all Transform steps (STAR schema).
 
+    Engines:
+      - pandas: one process, one DataFrame per table (default)
+      - streaming: process pool + incremental Parquet writer (bounded memory)
+      - incremental: only league-seasons whose raw inputs changed are
+        re-parsed (data/processed/); `full=True` rebuilds every partition
+      - sql: DuckDB read_json / unnest over the raw tree (multi-threaded,
+        no Python dicts); `python -m src.transform.engine_sql --check`
+        verifies parity with the pandas path
+
     Dimensions:
       - dim_league
       - dim_season
@@ -28,45 +54,68 @@ def run_transform_pipeline(only: str | None = None):
     print("      TRANSFORM PIPELINE")
     print("==============================\n")
 
-    # DIM LEAGUE
-    if only is None or only == "leagues":
-        print(">>> Transforming dim_league")
-        transform_leagues()
-
-    # DIM SEASON
-    if only is None or only == "seasons":
-        print(">>> Transforming dim_season")
-        transform_seasons()
-
-    # TEAMS / VENUES / FACT TEAM SEASON
-    if only is None or only == "teams":
-        print(">>> Transforming dim_team, dim_venue, fact_team_season")
-        transform_teams()
-
-    # FACT MATCH
-    if only is None or only == "matches":
-        print(">>> Transforming fact_match")
-        transform_matches()
-
-    # PLAYERS
-    if only is None or only == "players":
-        print(">>> Transforming dim_player, fact_player_season")
-        transform_players()
+    with stage("transform", engine=engine):
+        for step in STEPS:
+            if only is None or only == step:
+                print(f">>> Transforming {step} ({engine}): {', '.join(TRANSFORMS[step][2])}")
+                run_transform_step(step, engine=engine, workers=workers, full=full)
 
     print("\n==============================")
     print("   TRANSFORM PIPELINE DONE")
     print("==============================\n")
 
 
+def run_transform_step(step: str, engine: str = "pandas", workers: int | None = None, full: bool = False):
+    """One transform step with the chosen engine, timed as transform.<step>."""
+    with stage(f"transform.{step}", engine=engine):
+        if engine == "streaming":
+            run_streaming_transform(step, workers=workers)
+        elif engine == "sql":
+            run_sql_transform(step, workers=workers)
+        elif engine == "incremental":
+            run_incremental_transform(step, workers=workers, full=full)
+        else:
+            PANDAS_STEPS[step]()
+
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Run the Transform (STAR schema) pipeline")
 
     parser.add_argument(
         "--only",
-        choices=["leagues", "seasons", "teams", "matches", "players"],
+        choices=STEPS,
         help="Run only a specific transform step",
     )
 
+    parser.add_argument(
+        "--engine",
+        choices=["pandas", "streaming", "incremental", "sql"],
+        default="pandas",
+        help="Transform engine (streaming = parallel parse + incremental Parquet writes, "
+             "incremental = only re-parse league-seasons whose raw inputs changed, "
+             "sql = DuckDB read_json over the raw tree)",
+    )
+
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="Worker processes for the streaming / incremental engines, DuckDB threads for sql "
+             "(default: CPU count)",
+    )
+
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Incremental engine: ignore saved state and rebuild every partition",
+    )
+
+    parser.add_argument(
+        "--profile",
+        metavar="STAGE",
+        help="Profile one stage, e.g. transform.players (cProfile or pyinstrument, see settings.yaml)",
+    )
+
     args = parser.parse_args()
 
-    run_transform_pipeline(only=args.only)
\ No newline at end of file
+    set_profile_stage(args.profile)
+    run_transform_pipeline(only=args.only, engine=args.engine, workers=args.workers, full=args.full)
\ No newline at end of file
@@ -0,0 +1,259 @@
+from decimal import Decimal, InvalidOperation
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+# -------------------------
+# COLUMN TYPES
+# -------------------------
+ID = pa.int64()                                    # API ids (nullable)
+YEAR = pa.int16()
+COUNT = pa.int16()                                 # goals, cards, appearances
+CATEGORY = pa.dictionary(pa.int32(), pa.string())  # low-cardinality strings
+DATE = pa.date32()                                 # "YYYY-MM-DD"
+TIMESTAMP = pa.timestamp("ms", tz="UTC")           # ISO 8601 with offset (Parquet has no seconds unit)
+RATING = pa.decimal128(9, 6)                       # "7.266667"
+
+# Text formats the raw API uses for parsed types
+TIMESTAMP_FORMAT = "%Y-%m-%dT%H:%M:%S%z"
+DATE_FORMAT = "%Y-%m-%d"
+
+# -------------------------
+# STAR SCHEMA TABLES (Arrow)
+# -------------------------
+SCHEMAS = {
+    "dim_league": pa.schema([
+        ("league_id", ID),
+        ("league_name", pa.string()),
+        ("league_type", CATEGORY),
+        ("league_logo", pa.string()),
+        ("country_name", CATEGORY),
+        ("country_code", CATEGORY),
+        ("country_flag", pa.string()),
+        ("scope", CATEGORY),
+        ("region", CATEGORY),
+    ]),
+    "dim_season": pa.schema([
+        ("league_id", ID),
+        ("season_year", YEAR),
+        ("start_date", DATE),
+        ("end_date", DATE),
+        ("is_current", pa.bool_()),
+        ("coverage_fixtures_events", pa.bool_()),
+        ("coverage_fixtures_lineups", pa.bool_()),
+        ("coverage_fixtures_statistics", pa.bool_()),
+        ("coverage_fixtures_players", pa.bool_()),
+        ("coverage_standings", pa.bool_()),
+        ("coverage_players", pa.bool_()),
+        ("coverage_top_scorers", pa.bool_()),
+        ("coverage_top_assists", pa.bool_()),
+        ("coverage_top_cards", pa.bool_()),
+    ]),
+    "dim_team": pa.schema([
+        ("team_id", ID),
+        ("team_name", pa.string()),
+        ("team_country", CATEGORY),
+        ("team_founded", YEAR),
+        ("team_logo", pa.string()),
+        ("venue_id", ID),
+    ]),
+    "dim_venue": pa.schema([
+        ("venue_id", ID),
+        ("venue_name", pa.string()),
+        ("venue_city", pa.string()),
+        ("venue_capacity", pa.int32()),
+        ("venue_surface", CATEGORY),
+        ("venue_address", pa.string()),
+        ("venue_image", pa.string()),
+    ]),
+    "dim_player": pa.schema([
+        ("player_id", ID),
+        ("player_name", pa.string()),
+        ("firstname", pa.string()),
+        ("lastname", pa.string()),
+        ("nationality", CATEGORY),
+        ("birth_date", DATE),
+        ("birth_place", pa.string()),
+        ("birth_country", CATEGORY),
+        ("height", pa.string()),
+        ("weight", pa.string()),
+        ("photo", pa.string()),
+    ]),
+    "fact_team_season": pa.schema([
+        ("team_id", ID),
+        ("league_key", CATEGORY),
+        ("season_year", YEAR),
+    ]),
+    "fact_match": pa.schema([
+        ("fixture_id", ID),
+        ("league_id", ID),
+        ("season_year", YEAR),
+        ("venue_id", ID),
+        ("home_team_id", ID),
+        ("away_team_id", ID),
+        ("date", TIMESTAMP),
+        ("status", CATEGORY),
+        ("referee", pa.string()),
+        ("timezone", CATEGORY),
+        ("goals_home", COUNT),
+        ("goals_away", COUNT),
+        ("halftime_home", COUNT),
+        ("halftime_away", COUNT),
+        ("fulltime_home", COUNT),
+        ("fulltime_away", COUNT),
+        ("extratime_home", COUNT),
+        ("extratime_away", COUNT),
+        ("penalty_home", COUNT),
+        ("penalty_away", COUNT),
+    ]),
+    "fact_player_season": pa.schema([
+        ("player_id", ID),
+        ("team_id", ID),
+        ("league_id", ID),
+        ("season_year", YEAR),
+        ("position", CATEGORY),
+        ("appearances", COUNT),
+        ("minutes", pa.int32()),
+        ("rating", RATING),
+        ("goals", COUNT),
+        ("assists", COUNT),
+        ("yellow_cards", COUNT),
+        ("red_cards", COUNT),
+    ]),
+}
+
+# Columns each table is de-duplicated on (None → the whole row)
+DEDUP_KEYS = {
+    "dim_league": ["league_id"],
+    "dim_season": ["league_id", "season_year"],
+    "dim_team": ["team_id"],
+    "dim_venue": ["venue_id"],
+    "dim_player": ["player_id"],
+    "fact_team_season": None,
+    "fact_match": ["fixture_id"],
+    "fact_player_season": ["player_id", "team_id", "league_id", "season_year"],
+}
+
+# Tables whose duplicates are resolved by recency: the row from the latest
+# season (manifest entry) wins, ties go to the first one seen. Engines carry
+# that season next to the rows as RANK_COLUMN until the table is de-duplicated.
+DEDUP_LATEST = {"dim_player"}
+RANK_COLUMN = "__season"
+
+# Fact tables written as Hive-partitioned datasets (data/clean/{table}/league_id=/season_year=/)
+PARTITION_COLS = {
+    "fact_match": ["league_id", "season_year"],
+    "fact_player_season": ["league_id", "season_year"],
+}
+
+# Sort order inside each partition (tight min/max statistics per row group)
+SORT_KEYS = {
+    "fact_match": ["date", "fixture_id"],
+    "fact_player_season": ["team_id", "player_id"],
+}
+
+# Arrow → pandas nullable dtypes (ints stay ints when nulls appear)
+PANDAS_DTYPES = {
+    pa.int16(): pd.Int16Dtype(),
+    pa.int32(): pd.Int32Dtype(),
+    pa.int64(): pd.Int64Dtype(),
+    pa.bool_(): pd.BooleanDtype(),
+}
+
+
+# -------------------------
+# TYPED BUILDERS
+# -------------------------
+def _parse_decimals(values: list, type_: pa.DataType) -> pa.Array:
+    """Decimal strings / numbers → decimal array (unparseable values → null)."""
+    quantum = Decimal(1).scaleb(-type_.scale)
+    parsed = []
+    for value in values:
+        try:
+            parsed.append(None if value in (None, "") else Decimal(str(value)).quantize(quantum))
+        except (InvalidOperation, ValueError):
+            parsed.append(None)
+    return pa.array(parsed, type=type_)
+
+
+def typed_array(values: list, type_: pa.DataType) -> pa.Array:
+    """
+    Python values from the raw JSON → an Arrow array of the registry type.
+
+    Timestamps, dates and decimals are parsed from their API text format;
+    malformed values become null instead of failing the whole table.
+    """
+    if pa.types.is_timestamp(type_):
+        return pc.strptime(pa.array(values, type=pa.string()), format=TIMESTAMP_FORMAT,
+                           unit=type_.unit, error_is_null=True)
+    if pa.types.is_date(type_):
+        parsed = pc.strptime(pa.array(values, type=pa.string()), format=DATE_FORMAT,
+                             unit="s", error_is_null=True)
+        return parsed.cast(type_)
+    if pa.types.is_decimal(type_):
+        return _parse_decimals(values, type_)
+    return pa.array(values, type=type_)
+
+
+def build_batch(columns: dict, name: str) -> pa.RecordBatch:
+    """
+    Typed RecordBatch for a star-schema table from {column: [values]}.
+
+    Columns missing from `columns` (e.g. dim_league scope / region, added
+    by enrichment) start out null.
+    """
+    schema = SCHEMAS[name]
+    num_rows = len(next(iter(columns.values()), []))
+
+    return pa.RecordBatch.from_arrays(
+        [typed_array(columns.get(field.name, [None] * num_rows), field.type) for field in schema],
+        schema=schema,
+    )
+
+
+def build_table(columns: dict, name: str) -> pa.Table:
+    return pa.Table.from_batches([build_batch(columns, name)], schema=SCHEMAS[name])
+
+
+def to_pandas(table: pa.Table) -> pd.DataFrame:
+    """Arrow → pandas keeping registry types (nullable ints, categoricals, tz-aware timestamps)."""
+    return table.to_pandas(types_mapper=PANDAS_DTYPES.get)
+
+
+def from_pandas(df: pd.DataFrame, name: str) -> pa.Table:
+    """pandas → Arrow, cast to the registry schema of `name`."""
+    return pa.Table.from_pandas(df, schema=SCHEMAS[name], preserve_index=False)
+
+
+def drop_duplicates(table: pa.Table, keys: list | None = None) -> pa.Table:
+    """
+    Arrow equivalent of DataFrame.drop_duplicates(subset=keys): the first
+    row of every key wins and row order is kept. No pandas round-trip, so
+    registry types survive unchanged.
+    """
+    keys = keys or table.column_names
+    if table.num_rows == 0:
+        return table
+
+    # Chunks of a dictionary column may carry different dictionaries (one per batch)
+    indexed = table.select(keys).unify_dictionaries().append_column("__row", pa.array(range(table.num_rows), type=pa.int64()))
+    first = indexed.group_by(keys, use_threads=False).aggregate([("__row", "min")])
+    rows = first.column("__row_min")
+    return table.take(pc.take(rows, pc.sort_indices(rows)))
+
+
+def drop_duplicates_latest(table: pa.Table, keys: list) -> pa.Table:
+    """
+    drop_duplicates where the row with the highest RANK_COLUMN (season)
+    wins per key (ties: the first row). The rank column is kept.
+    """
+    if table.num_rows == 0:
+        return table
+    # sort_indices is stable: rows of the same season keep their order
+    latest_first = table.take(pc.sort_indices(table, sort_keys=[(RANK_COLUMN, "descending")]))
+    return drop_duplicates(latest_first, keys)
+
+
+def with_rank(batch: pa.RecordBatch, ranks: list) -> pa.RecordBatch:
+    """`batch` plus the RANK_COLUMN (season of the entry each row came from)."""
+    return batch.append_column(RANK_COLUMN, pa.array(ranks, type=YEAR))
@@ -1,9 +1,10 @@
-import json
-import os
 import pandas as pd
-import yaml
+from src.extract.league_config import load_league_config
+from src.extract.raw_store import iter_raw
+from src.transform.schemas import build_table, drop_duplicates, from_pandas, to_pandas
+from src.transform.utils_enrich import columns_from, enrich_from_lookup, extend_columns, fill_missing
+from src.transform.utils_parquet import write_clean_table
 
-RAW_PATH = "data/raw/leagues"
 CLEAN_PATH = "data/clean"
 YAML_PATH = "config/leagues.yaml"
 
@@ -16,38 +17,52 @@ REGION_PLACEHOLDERS = {
     "Global": "https://upload.wikimedia.org/wikipedia/en/3/36/FIFA_logo.svg",
 }
 
-def load_yaml_metadata():
-    with open(YAML_PATH, "r") as f:
-        data = yaml.safe_load(f)
+def load_league_metadata(path: str = YAML_PATH) -> pd.DataFrame:
+    """
+    leagues.yaml as a small lookup table: league_id, scope, region.
+
+    The YAML is parsed once per process (league_config memo), so streaming
+    batches and pool workers don't re-read it for every dim_league batch.
+    """
+    data = load_league_config(path)
 
-    meta = {}
-    for key, league in data.items():  # sem "leagues:"
-        league_id = league["league_id"]
-        meta[league_id] = {
-            "scope": league.get("scope"),
-            "region": league.get("region"),
-        }
-    return meta
+    return pd.DataFrame(
+        [
+            {"league_id": league["league_id"], "scope": league.get("scope"), "region": league.get("region")}
+            for league in data.values()  # sem "leagues:"
+        ],
+        columns=["league_id", "scope", "region"],
+    )
 
 
-def enrich_league(row, yaml_meta):
-    meta = yaml_meta.get(row["league_id"], {})
+def league_columns(entry, data):
+    """Columns contributed by one raw leagues payload: {"dim_league": {column: [values]}}."""
+    items = data.get("response", [])
 
-    row["scope"] = meta.get("scope")
-    row["region"] = meta.get("region")
+    return {"dim_league": columns_from(items, {
+        "league_id": ("league", "id"),
+        "league_name": ("league", "name"),
+        "league_type": ("league", "type"),
+        "league_logo": ("league", "logo"),
+        "country_name": ("country", "name"),
+        "country_code": ("country", "code"),
+        "country_flag": ("country", "flag"),
+    })}
 
-    # 1. Se a API já trouxe country_flag → manter
-    if row.get("country_flag"):
-        return row
 
-    # 2. Se domestic e sem flag → usar placeholder da região
-    if row["scope"] == "domestic":
-        row["country_flag"] = REGION_PLACEHOLDERS.get(row["region"])
-        return row
+def enrich_leagues(df, league_meta=None):
+    """
+    Add scope / region from leagues.yaml and fill missing flags (vectorized).
+
+    - scope / region: one left join on league_id
+    - country_flag: the API flag when present, otherwise the placeholder
+      of the league's region (domestic without flag, continental, global)
+    """
+    league_meta = league_meta if league_meta is not None else load_league_metadata()
 
-    # 3. Se continental/global → sempre placeholder
-    row["country_flag"] = REGION_PLACEHOLDERS.get(row["region"])
-    return row
+    df = enrich_from_lookup(df, league_meta, on="league_id")
+    df["country_flag"] = fill_missing(df["country_flag"], df["region"].map(REGION_PLACEHOLDERS))
+    return df
 
 
 def transform_leagues():
@@ -64,44 +79,20 @@ def transform_leagues():
       - country_code
       - country_flag
     """
-    yaml_meta = load_yaml_metadata()
-    rows = []
-
-    for filename in os.listdir(RAW_PATH):
-        if not filename.endswith(".json"):
-            continue
-
-        path = os.path.join(RAW_PATH, filename)
-
-        with open(path, "r") as f:
-            data = json.load(f)
-
-        for item in data.get("response", []):
-            league = item.get("league", {})
-            country = item.get("country", {})
-
-            rows.append({
-                "league_id": league.get("id"),
-                "league_name": league.get("name"),
-                "league_type": league.get("type"),
-                "league_logo": league.get("logo"),
-                "country_name": country.get("name"),
-                "country_code": country.get("code"),
-                "country_flag": country.get("flag"),
-            })
+    columns = {}
 
-    df = pd.DataFrame(rows).drop_duplicates(subset=["league_id"])
+    for entry, data in iter_raw("leagues"):
+        extend_columns(columns, league_columns(entry, data)["dim_league"])
 
-    df = df.apply(lambda row: enrich_league(row, yaml_meta), axis=1)
+    table = drop_duplicates(build_table(columns, "dim_league"), ["league_id"])
 
-    os.makedirs(CLEAN_PATH, exist_ok=True)
-    output_path = os.path.join(CLEAN_PATH, "dim_league.parquet")
+    df = enrich_leagues(to_pandas(table), load_league_metadata())
 
-    df.to_parquet(output_path, index=False)
+    output_path = write_clean_table(from_pandas(df, "dim_league"), "dim_league", CLEAN_PATH)
     print(f"Saved {len(df)} leagues to {output_path}")
 
     return df
 
 
 if __name__ == "__main__":
-    transform_leagues()
\ No newline at end of file
+    transform_leagues()
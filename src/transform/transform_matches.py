@@ -1,17 +1,53 @@
-import json
-import os
-import pandas as pd
-from src.transform.utils_filename import parse_generic_filename
+from src.extract.raw_store import iter_raw
+from src.transform.schemas import build_table, drop_duplicates, to_pandas
+from src.transform.utils_enrich import columns_from, extend_columns
+from src.transform.utils_parquet import write_clean_table
 
-RAW_PATH = "data/raw/matches"
 CLEAN_PATH = "data/clean"
 
 
+def match_columns(entry, data):
+    """Columns contributed by one raw fixtures payload: {"fact_match": {column: [values]}}."""
+    items = data.get("response", [])
+
+    return {"fact_match": columns_from(items, {
+        # IDs
+        "fixture_id": ("fixture", "id"),
+        "league_id": ("league", "id"),
+        "season_year": entry["season"],
+        "venue_id": ("fixture", "venue", "id"),
+
+        # Teams
+        "home_team_id": ("teams", "home", "id"),
+        "away_team_id": ("teams", "away", "id"),
+
+        # Match metadata
+        "date": ("fixture", "date"),
+        "status": ("fixture", "status", "short"),
+        "referee": ("fixture", "referee"),
+        "timezone": ("fixture", "timezone"),
+
+        # Goals
+        "goals_home": ("goals", "home"),
+        "goals_away": ("goals", "away"),
+
+        # Score breakdown
+        "halftime_home": ("score", "halftime", "home"),
+        "halftime_away": ("score", "halftime", "away"),
+        "fulltime_home": ("score", "fulltime", "home"),
+        "fulltime_away": ("score", "fulltime", "away"),
+        "extratime_home": ("score", "extratime", "home"),
+        "extratime_away": ("score", "extratime", "away"),
+        "penalty_home": ("score", "penalty", "home"),
+        "penalty_away": ("score", "penalty", "away"),
+    })}
+
+
 def transform_matches():
     """
     Build fact_match from raw match JSON files.
 
-    Output: data/clean/fact_match.parquet
+    Output: data/clean/fact_match/league_id=*/season_year=*/ (Hive-partitioned)
 
     Columns include:
       - fixture_id
@@ -35,67 +71,17 @@ def transform_matches():
       - penalty_away
     """
 
-    rows = []
-
-    for filename in os.listdir(RAW_PATH):
-        if not filename.endswith(".json"):
-            continue
-
-        league_key, season_year = parse_generic_filename(filename)
-
-        path = os.path.join(RAW_PATH, filename)
-
-        with open(path, "r") as f:
-            data = json.load(f)
-
-        for item in data.get("response", []):
-            fixture = item.get("fixture", {})
-            league = item.get("league", {})
-            teams = item.get("teams", {})
-            goals = item.get("goals", {})
-            score = item.get("score", {})
-
-            rows.append({
-                # IDs
-                "fixture_id": fixture.get("id"),
-                "league_id": league.get("id"),
-                "season_year": season_year,
-                "venue_id": fixture.get("venue", {}).get("id"),
-
-                # Teams
-                "home_team_id": teams.get("home", {}).get("id"),
-                "away_team_id": teams.get("away", {}).get("id"),
-
-                # Match metadata
-                "date": fixture.get("date"),
-                "status": fixture.get("status", {}).get("short"),
-                "referee": fixture.get("referee"),
-                "timezone": fixture.get("timezone"),
-
-                # Goals
-                "goals_home": goals.get("home"),
-                "goals_away": goals.get("away"),
-
-                # Score breakdown
-                "halftime_home": score.get("halftime", {}).get("home"),
-                "halftime_away": score.get("halftime", {}).get("away"),
-                "fulltime_home": score.get("fulltime", {}).get("home"),
-                "fulltime_away": score.get("fulltime", {}).get("away"),
-                "extratime_home": score.get("extratime", {}).get("home"),
-                "extratime_away": score.get("extratime", {}).get("away"),
-                "penalty_home": score.get("penalty", {}).get("home"),
-                "penalty_away": score.get("penalty", {}).get("away"),
-            })
+    columns = {}
 
-    df = pd.DataFrame(rows).drop_duplicates(subset=["fixture_id"])
+    for entry, data in iter_raw("fixtures"):
+        extend_columns(columns, match_columns(entry, data)["fact_match"])
 
-    os.makedirs(CLEAN_PATH, exist_ok=True)
-    output_path = os.path.join(CLEAN_PATH, "fact_match.parquet")
+    table = drop_duplicates(build_table(columns, "fact_match"), ["fixture_id"])
 
-    df.to_parquet(output_path, index=False)
-    print(f"Saved {len(df)} matches to {output_path}")
+    output_path = write_clean_table(table, "fact_match", CLEAN_PATH)
+    print(f"Saved {table.num_rows} matches to {output_path}")
 
-    return df
+    return to_pandas(table)
 
 
 if __name__ == "__main__":
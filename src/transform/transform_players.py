@@ -1,11 +1,54 @@
-import json
-import os
-import pandas as pd
-from src.transform.utils_filename import parse_player_filename
+from src.extract.raw_store import iter_raw
+from src.transform.schemas import DEDUP_KEYS, DEDUP_LATEST, build_table, to_pandas
+from src.transform.utils_enrich import columns_from, extend_new_rows, keep_latest_rows, latest_columns, pluck
+from src.transform.utils_parquet import write_clean_table
 
-RAW_PATH = "data/raw/players"
 CLEAN_PATH = "data/clean"
 
+def player_columns(entry, data):
+    """Columns contributed by one raw players payload, keyed by output table."""
+    items = data.get("response", [])
+
+    # one (player, statistics) pair per fact row
+    pairs = [(item, stats) for item in items for stats in item.get("statistics", []) or []]
+    stat_players = [item for item, _ in pairs]
+    stats = [stats for _, stats in pairs]
+
+    # FACT PLAYER SEASON (key columns come from the manifest, no filename parsing)
+    fact_player_season = {"player_id": pluck(stat_players, ("player", "id"))}
+    fact_player_season.update(columns_from(stats, {
+        "team_id": entry["team_id"],
+        "league_id": ("league", "id"),
+        "season_year": entry["season"],
+        "position": ("games", "position"),
+        "appearances": ("games", "appearences"),
+        "minutes": ("games", "minutes"),
+        "rating": ("games", "rating"),
+        "goals": ("goals", "total"),
+        "assists": ("goals", "assists"),
+        "yellow_cards": ("cards", "yellow"),
+        "red_cards": ("cards", "red"),
+    }))
+
+    return {
+        # DIM PLAYER
+        "dim_player": columns_from(items, {
+            "player_id": ("player", "id"),
+            "player_name": ("player", "name"),
+            "firstname": ("player", "firstname"),
+            "lastname": ("player", "lastname"),
+            "nationality": ("player", "nationality"),
+            "birth_date": ("player", "birth", "date"),
+            "birth_place": ("player", "birth", "place"),
+            "birth_country": ("player", "birth", "country"),
+            "height": ("player", "height"),
+            "weight": ("player", "weight"),
+            "photo": ("player", "photo"),
+        }),
+        "fact_player_season": fact_player_season,
+    }
+
+
 def transform_players():
     """
     Build:
@@ -13,77 +56,44 @@ def transform_players():
       - fact_player_season
 
     from raw player JSON files.
+
+    Rows are de-duplicated while streaming over the pages: the same player
+    appears on many teams / seasons / pages, so only unique rows and one
+    key per unique row are ever held in memory.
+      - dim_player: player_id, the row from the latest season wins
+        (running {player_id: (season, row)})
+      - fact_player_season: player_id, team_id, league_id, season_year
+        (first one wins)
     """
 
-    dim_player_rows = []
-    fact_player_season_rows = []
-
-    for filename in os.listdir(RAW_PATH):
-        if not filename.endswith(".json"):
-            continue
-
-        # filename parsing
-        league_key, season_year, team_id, _ = parse_player_filename(filename)
-
-        path = os.path.join(RAW_PATH, filename)
-
-        with open(path, "r") as f:
-            data = json.load(f)
-
-        for item in data.get("response", []):
-            player = item.get("player", {})
-            stats_list = item.get("statistics", [])
-
-            # DIM PLAYER
-            dim_player_rows.append({
-                "player_id": player.get("id"),
-                "player_name": player.get("name"),
-                "firstname": player.get("firstname"),
-                "lastname": player.get("lastname"),
-                "nationality": player.get("nationality"),
-                "birth_date": player.get("birth", {}).get("date"),
-                "birth_place": player.get("birth", {}).get("place"),
-                "birth_country": player.get("birth", {}).get("country"),
-                "height": player.get("height"),
-                "weight": player.get("weight"),
-                "photo": player.get("photo"),
-            })
-
-            # FACT PLAYER SEASON
-            for stats in stats_list:
-                league = stats.get("league", {})
-                games = stats.get("games", {})
-                goals = stats.get("goals", {})
-                cards = stats.get("cards", {})
-
-                fact_player_season_rows.append({
-                    "player_id": player.get("id"),
-                    "team_id": team_id,
-                    "league_id": league.get("id"),
-                    "season_year": season_year,
-                    "position": games.get("position"),
-                    "appearances": games.get("appearences"),
-                    "minutes": games.get("minutes"),
-                    "rating": games.get("rating"),
-                    "goals": goals.get("total"),
-                    "assists": goals.get("assists"),
-                    "yellow_cards": cards.get("yellow"),
-                    "red_cards": cards.get("red"),
-                })
-
-    # Convert to DataFrames
-    dim_player = pd.DataFrame(dim_player_rows).drop_duplicates(subset=["player_id"])
-    fact_player_season = pd.DataFrame(fact_player_season_rows).drop_duplicates()
+    tables = {"dim_player": {}, "fact_player_season": {}}
+    seen = {table: set() for table in tables}
+    latest = {table: {} for table in tables if table in DEDUP_LATEST}
+    names = {}
 
-    # Save outputs
-    os.makedirs(CLEAN_PATH, exist_ok=True)
+    for entry, data in iter_raw("players"):
+        for table, columns in player_columns(entry, data).items():
+            if table in latest:
+                names.setdefault(table, list(columns))
+                keep_latest_rows(latest[table], columns, DEDUP_KEYS[table], entry["season"])
+            else:
+                extend_new_rows(tables[table], columns, DEDUP_KEYS[table], seen[table])
 
-    dim_player.to_parquet(os.path.join(CLEAN_PATH, "dim_player.parquet"), index=False)
-    fact_player_season.to_parquet(os.path.join(CLEAN_PATH, "fact_player_season.parquet"), index=False)
+    for table, rows in latest.items():
+        if table in names:
+            tables[table], _ = latest_columns(rows, names[table])
+
+    # Typed Arrow tables (schemas.py)
+    dim_player = build_table(tables["dim_player"], "dim_player")
+    fact_player_season = build_table(tables["fact_player_season"], "fact_player_season")
+
+    # Save outputs
+    write_clean_table(dim_player, "dim_player", CLEAN_PATH)
+    write_clean_table(fact_player_season, "fact_player_season", CLEAN_PATH)
 
-    print(f"Saved {len(dim_player)} players and {len(fact_player_season)} player-season rows.")
+    print(f"Saved {dim_player.num_rows} players and {fact_player_season.num_rows} player-season rows.")
 
-    return dim_player, fact_player_season
+    return to_pandas(dim_player), to_pandas(fact_player_season)
 
 
 if __name__ == "__main__":
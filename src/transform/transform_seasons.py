@@ -1,11 +1,42 @@
-import json
-import os
-import pandas as pd
+from src.extract.raw_store import iter_raw
+from src.transform.schemas import build_table, drop_duplicates, to_pandas
+from src.transform.utils_enrich import columns_from, extend_columns, pluck
+from src.transform.utils_parquet import write_clean_table
 
-RAW_PATH = "data/raw/leagues"
 CLEAN_PATH = "data/clean"
 
 
+def season_columns(entry, data):
+    """Columns contributed by one raw leagues payload: {"dim_season": {column: [values]}}."""
+    # one (league, season) pair per output row
+    pairs = [
+        (item, season)
+        for item in data.get("response", [])
+        for season in item.get("seasons", []) or []
+    ]
+    items = [item for item, _ in pairs]
+    seasons = [season for _, season in pairs]
+
+    columns = {"league_id": pluck(items, ("league", "id"))}
+    columns.update(columns_from(seasons, {
+        "season_year": ("year",),
+        "start_date": ("start",),
+        "end_date": ("end",),
+        "is_current": ("current",),
+        "coverage_fixtures_events": ("coverage", "fixtures", "events"),
+        "coverage_fixtures_lineups": ("coverage", "fixtures", "lineups"),
+        "coverage_fixtures_statistics": ("coverage", "fixtures", "statistics"),
+        "coverage_fixtures_players": ("coverage", "fixtures", "players"),
+        "coverage_standings": ("coverage", "standings"),
+        "coverage_players": ("coverage", "players"),
+        "coverage_top_scorers": ("coverage", "top_scorers"),
+        "coverage_top_assists": ("coverage", "top_assists"),
+        "coverage_top_cards": ("coverage", "top_cards"),
+    }))
+
+    return {"dim_season": columns}
+
+
 def transform_seasons():
     """
     Build dim_season from raw league JSON files.
@@ -28,56 +59,17 @@ def transform_seasons():
       - coverage_top_cards
     """
 
-    rows = []
-
-    for filename in os.listdir(RAW_PATH):
-        if not filename.endswith(".json"):
-            continue
-
-        path = os.path.join(RAW_PATH, filename)
-
-        with open(path, "r") as f:
-            data = json.load(f)
-
-        for item in data.get("response", []):
-            league = item.get("league", {})
-            league_id = league.get("id")
-
-            for season in item.get("seasons", []):
-                year = season.get("year")
-                start = season.get("start")
-                end = season.get("end")
-                current = season.get("current")
-
-                coverage = season.get("coverage", {})
-                fixtures_cov = coverage.get("fixtures", {})
-
-                rows.append({
-                    "league_id": league_id,
-                    "season_year": year,
-                    "start_date": start,
-                    "end_date": end,
-                    "is_current": current,
-                    "coverage_fixtures_events": fixtures_cov.get("events"),
-                    "coverage_fixtures_lineups": fixtures_cov.get("lineups"),
-                    "coverage_fixtures_statistics": fixtures_cov.get("statistics"),
-                    "coverage_fixtures_players": fixtures_cov.get("players"),
-                    "coverage_standings": coverage.get("standings"),
-                    "coverage_players": coverage.get("players"),
-                    "coverage_top_scorers": coverage.get("top_scorers"),
-                    "coverage_top_assists": coverage.get("top_assists"),
-                    "coverage_top_cards": coverage.get("top_cards"),
-                })
+    columns = {}
 
-    df = pd.DataFrame(rows).drop_duplicates(subset=["league_id", "season_year"])
+    for entry, data in iter_raw("leagues"):
+        extend_columns(columns, season_columns(entry, data)["dim_season"])
 
-    os.makedirs(CLEAN_PATH, exist_ok=True)
-    output_path = os.path.join(CLEAN_PATH, "dim_season.parquet")
+    table = drop_duplicates(build_table(columns, "dim_season"), ["league_id", "season_year"])
 
-    df.to_parquet(output_path, index=False)
-    print(f"Saved {len(df)} league-season rows to {output_path}")
+    output_path = write_clean_table(table, "dim_season", CLEAN_PATH)
+    print(f"Saved {table.num_rows} league-season rows to {output_path}")
 
-    return df
+    return to_pandas(table)
 
 
 if __name__ == "__main__":
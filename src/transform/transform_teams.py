@@ -1,11 +1,51 @@
-import json
-import os
-import pandas as pd
-from src.transform.utils_filename import parse_generic_filename
+from src.extract.raw_store import iter_raw
+from src.transform.schemas import build_table, drop_duplicates, to_pandas
+from src.transform.utils_enrich import columns_from, extend_columns
+from src.transform.utils_parquet import write_clean_table
 
-RAW_PATH = "data/raw/teams"
 CLEAN_PATH = "data/clean"
 
+def team_columns(entry, data):
+    """Columns contributed by one raw teams payload, keyed by output table."""
+    items = data.get("response", [])
+
+    return {
+        # -------------------------
+        # DIM TEAM
+        # -------------------------
+        "dim_team": columns_from(items, {
+            "team_id": ("team", "id"),
+            "team_name": ("team", "name"),
+            "team_country": ("team", "country"),
+            "team_founded": ("team", "founded"),
+            "team_logo": ("team", "logo"),
+            "venue_id": ("venue", "id"),
+        }),
+
+        # -------------------------
+        # DIM VENUE
+        # -------------------------
+        "dim_venue": columns_from(items, {
+            "venue_id": ("venue", "id"),
+            "venue_name": ("venue", "name"),
+            "venue_city": ("venue", "city"),
+            "venue_capacity": ("venue", "capacity"),
+            "venue_surface": ("venue", "surface"),
+            "venue_address": ("venue", "address"),
+            "venue_image": ("venue", "image"),
+        }),
+
+        # -------------------------
+        # FACT TEAM SEASON
+        # -------------------------
+        "fact_team_season": columns_from(items, {
+            "team_id": ("team", "id"),
+            "league_key": entry["league_key"],
+            "season_year": entry["season"],
+        }),
+    }
+
+
 def transform_teams():
     """
     Build:
@@ -16,77 +56,26 @@ def transform_teams():
     from raw team JSON files.
     """
 
-    dim_team_rows = []
-    dim_venue_rows = []
-    fact_team_season_rows = []
-
-    for filename in os.listdir(RAW_PATH):
-        if not filename.endswith(".json"):
-            continue
-
-        league_key, season_year = parse_generic_filename(filename)
-
-        path = os.path.join(RAW_PATH, filename)
-
-        with open(path, "r") as f:
-            data = json.load(f)
-
-        for item in data.get("response", []):
-            team = item.get("team", {})
-            venue = item.get("venue", {})
-
-            team_id = team.get("id")
-            venue_id = venue.get("id")
-
-            # -------------------------
-            # DIM TEAM
-            # -------------------------
-            dim_team_rows.append({
-                "team_id": team_id,
-                "team_name": team.get("name"),
-                "team_country": team.get("country"),
-                "team_founded": team.get("founded"),
-                "team_logo": team.get("logo"),
-                "venue_id": venue_id,
-            })
-
-            # -------------------------
-            # DIM VENUE
-            # -------------------------
-            dim_venue_rows.append({
-                "venue_id": venue_id,
-                "venue_name": venue.get("name"),
-                "venue_city": venue.get("city"),
-                "venue_capacity": venue.get("capacity"),
-                "venue_surface": venue.get("surface"),
-                "venue_address": venue.get("address"),
-                "venue_image": venue.get("image"),
-            })
-
-            # -------------------------
-            # FACT TEAM SEASON
-            # -------------------------
-            fact_team_season_rows.append({
-                "team_id": team_id,
-                "league_key": league_key,
-                "season_year": season_year,
-            })
-
-    # Convert to DataFrames
-    dim_team = pd.DataFrame(dim_team_rows).drop_duplicates(subset=["team_id"])
-    dim_venue = pd.DataFrame(dim_venue_rows).drop_duplicates(subset=["venue_id"])
-    fact_team_season = pd.DataFrame(fact_team_season_rows).drop_duplicates()
+    tables = {"dim_team": {}, "dim_venue": {}, "fact_team_season": {}}
 
-    # Save outputs
-    os.makedirs(CLEAN_PATH, exist_ok=True)
+    for entry, data in iter_raw("teams"):
+        for table, columns in team_columns(entry, data).items():
+            extend_columns(tables[table], columns)
 
-    dim_team.to_parquet(os.path.join(CLEAN_PATH, "dim_team.parquet"), index=False)
-    dim_venue.to_parquet(os.path.join(CLEAN_PATH, "dim_venue.parquet"), index=False)
-    fact_team_season.to_parquet(os.path.join(CLEAN_PATH, "fact_team_season.parquet"), index=False)
+    # Typed Arrow tables (schemas.py)
+    dim_team = drop_duplicates(build_table(tables["dim_team"], "dim_team"), ["team_id"])
+    dim_venue = drop_duplicates(build_table(tables["dim_venue"], "dim_venue"), ["venue_id"])
+    fact_team_season = drop_duplicates(build_table(tables["fact_team_season"], "fact_team_season"))
+
+    # Save outputs
+    write_clean_table(dim_team, "dim_team", CLEAN_PATH)
+    write_clean_table(dim_venue, "dim_venue", CLEAN_PATH)
+    write_clean_table(fact_team_season, "fact_team_season", CLEAN_PATH)
 
-    print(f"Saved {len(dim_team)} teams, {len(dim_venue)} venues, {len(fact_team_season)} team-season rows.")
+    print(f"Saved {dim_team.num_rows} teams, {dim_venue.num_rows} venues, "
+          f"{fact_team_season.num_rows} team-season rows.")
 
-    return dim_team, dim_venue, fact_team_season
+    return to_pandas(dim_team), to_pandas(dim_venue), to_pandas(fact_team_season)
 
 
 if __name__ == "__main__":
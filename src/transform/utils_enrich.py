@@ -0,0 +1,111 @@
+import pandas as pd
+
+
+# -------------------------
+# COLUMN-WISE EXTRACTION (raw JSON → {column: [values]})
+# -------------------------
+def pluck(items: list, path: tuple) -> list:
+    """
+    Values at `path` for every item, e.g. pluck(items, ("fixture", "id")).
+
+    Missing keys and null parents give None (no KeyError / AttributeError).
+    """
+    values = []
+    for item in items:
+        value = item
+        for key in path:
+            value = value.get(key) if isinstance(value, dict) else None
+        values.append(value)
+    return values
+
+
+def columns_from(items: list, spec: dict) -> dict:
+    """
+    Build one list per output column instead of one dict per row.
+
+    `spec` maps column → path tuple (plucked from each item) or → a
+    constant repeated for every item (e.g. the season from the manifest).
+    Column order follows `spec`.
+    """
+    return {
+        column: pluck(items, path) if isinstance(path, tuple) else [path] * len(items)
+        for column, path in spec.items()
+    }
+
+
+def extend_columns(target: dict, columns: dict) -> dict:
+    """Append the column lists of `columns` to `target` (in place)."""
+    for column, values in columns.items():
+        target.setdefault(column, []).extend(values)
+    return target
+
+
+def new_rows_mask(columns: dict, keys: list, seen: set) -> list:
+    """
+    One flag per row: True the first time its key is met (first one wins).
+
+    `seen` is updated in place, so it can span many pages / batches and
+    only ever holds one key per unique row.
+    """
+    mask = []
+    for key in zip(*(columns[k] for k in keys)):
+        is_new = key not in seen
+        if is_new:
+            seen.add(key)
+        mask.append(is_new)
+    return mask
+
+
+def extend_new_rows(target: dict, columns: dict, keys: list, seen: set) -> dict:
+    """extend_columns, skipping rows whose key is already in `seen` (streaming dedup)."""
+    mask = new_rows_mask(columns, keys, seen)
+    if all(mask):
+        return extend_columns(target, columns)
+    return extend_columns(target, {
+        column: [value for value, keep in zip(values, mask) if keep]
+        for column, values in columns.items()
+    })
+
+
+def keep_latest_rows(latest: dict, columns: dict, keys: list, rank) -> dict:
+    """
+    Running {key: (rank, row)}: per key, the row with the highest `rank`
+    (e.g. the season of the page it came from) wins; ties keep the first
+    one seen. Holds one row (a tuple in column order) per unique key.
+    `latest` is updated in place.
+    """
+    rows = zip(*columns.values())
+    for key, row in zip(zip(*(columns[k] for k in keys)), rows):
+        kept = latest.get(key)
+        if kept is None or rank > kept[0]:
+            latest[key] = (rank, row)
+    return latest
+
+
+def latest_columns(latest: dict, names: list) -> tuple:
+    """keep_latest_rows result → ({column: [values]}, [rank per row])."""
+    rows = [row for _, row in latest.values()]
+    columns = {name: [row[i] for row in rows] for i, name in enumerate(names)}
+    return columns, [rank for rank, _ in latest.values()]
+
+
+# -------------------------
+# LOOKUP ENRICHMENT
+# -------------------------
+def enrich_from_lookup(df: pd.DataFrame, lookup: pd.DataFrame, on: str) -> pd.DataFrame:
+    """
+    Left-join a small lookup table (e.g. leagues.yaml metadata) in one merge.
+
+    Lookup columns replace same-named columns of `df`; row order and
+    index of `df` are preserved.
+    """
+    overlap = [c for c in lookup.columns if c != on and c in df.columns]
+    merged = df.drop(columns=overlap).merge(lookup, on=on, how="left", sort=False)
+    merged.index = df.index
+    return merged
+
+
+def fill_missing(values: pd.Series, fallback: pd.Series) -> pd.Series:
+    """Keep `values` where present (not null / not empty), else take `fallback`."""
+    present = values.notna() & (values.astype("string") != "")
+    return values.where(present, fallback)
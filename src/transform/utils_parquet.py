@@ -0,0 +1,150 @@
+import os
+import shutil
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from src.instrumentation import count, file_stage
+from src.transform.schemas import PARTITION_COLS, SCHEMAS, SORT_KEYS
+
+CLEAN_PATH = "data/clean"
+
+# Rows per Parquet row group (unit of min/max statistics and of pruning)
+ROW_GROUP_SIZE = 128_000
+
+
+def clean_table_path(table: str, output_dir: str = CLEAN_PATH) -> str:
+    """data/clean/{table}/ for partitioned facts, data/clean/{table}.parquet otherwise."""
+    if table in PARTITION_COLS:
+        return os.path.join(output_dir, table)
+    return os.path.join(output_dir, f"{table}.parquet")
+
+
+def clean_table_exists(table: str, output_dir: str = CLEAN_PATH) -> bool:
+    return os.path.exists(clean_table_path(table, output_dir))
+
+
+def sort_for_write(table: pa.Table, name: str) -> pa.Table:
+    keys = PARTITION_COLS.get(name, []) + SORT_KEYS.get(name, [])
+    if not keys or table.num_rows == 0:
+        return table
+    return table.sort_by([(key, "ascending") for key in keys])
+
+
+def replace_path(tmp_path: str, path: str):
+    """Swap a freshly written file or directory into place."""
+    if os.path.isdir(path):
+        old_path = f"{path}.old"
+        shutil.rmtree(old_path, ignore_errors=True)
+        os.replace(path, old_path)
+        os.replace(tmp_path, path)
+        shutil.rmtree(old_path, ignore_errors=True)
+    else:
+        os.replace(tmp_path, path)
+
+
+def promote_dataset(tmp_path: str, path: str):
+    """Swap a rebuilt dataset directory in and drop the pre-partitioning single file."""
+    os.makedirs(tmp_path, exist_ok=True)
+    replace_path(tmp_path, path)
+
+    legacy_path = f"{path}.parquet"
+    if os.path.exists(legacy_path):
+        os.remove(legacy_path)
+
+
+def write_partitioned(table: pa.Table, name: str, root: str, basename_template: str = "part-{i}.parquet",
+                      existing_data_behavior: str = "overwrite_or_ignore"):
+    """
+    Write a table as a Hive-partitioned dataset (e.g. league_id=140/season_year=2023/).
+
+    Rows are sorted by partition + sort keys, so each file's row groups
+    carry narrow statistics on the sort columns.
+    """
+    partition_cols = PARTITION_COLS[name]
+    partitioning = ds.partitioning(
+        pa.schema([table.schema.field(col) for col in partition_cols]),
+        flavor="hive",
+    )
+
+    ds.write_dataset(
+        sort_for_write(table, name),
+        root,
+        format="parquet",
+        partitioning=partitioning,
+        basename_template=basename_template,
+        existing_data_behavior=existing_data_behavior,
+        preserve_order=True,
+        max_rows_per_group=ROW_GROUP_SIZE,
+        min_rows_per_group=min(ROW_GROUP_SIZE, max(table.num_rows, 1)),
+        file_options=ds.ParquetFileFormat().make_write_options(write_statistics=True),
+    )
+
+
+def write_clean_table(table: pa.Table, name: str, output_dir: str = CLEAN_PATH, partitions=None) -> str:
+    """
+    Write a clean-layer table atomically.
+
+    - Dimensions: a single Parquet file (temp file + rename)
+    - Partitioned facts: a Hive dataset rebuilt in a temp directory and
+      swapped in; with `partitions` (set of partition key tuples) only
+      those partition directories are rewritten in place
+    """
+    with file_stage(f"write.{name}", table=name):
+        path = _write_clean_table(table, name, output_dir, partitions)
+        count("rows_written", table.num_rows)
+    return path
+
+
+def _write_clean_table(table: pa.Table, name: str, output_dir: str, partitions) -> str:
+    path = clean_table_path(name, output_dir)
+    os.makedirs(output_dir, exist_ok=True)
+
+    if name not in PARTITION_COLS:
+        tmp_path = f"{path}.tmp"
+        pq.write_table(sort_for_write(table, name), tmp_path, row_group_size=ROW_GROUP_SIZE)
+        os.replace(tmp_path, path)
+        return path
+
+    partition_cols = PARTITION_COLS[name]
+
+    if partitions is not None and os.path.isdir(path):
+        keys = list(zip(*(table.column(col).to_pylist() for col in partition_cols)))
+        mask = pa.array([key in partitions for key in keys], type=pa.bool_())
+        write_partitioned(table.filter(mask), name, path, existing_data_behavior="delete_matching")
+
+        # Partitions that no longer have any rows
+        present = set(keys)
+        for key in partitions:
+            if key not in present:
+                parts = [f"{col}={value}" for col, value in zip(partition_cols, key)]
+                shutil.rmtree(os.path.join(path, *parts), ignore_errors=True)
+        return path
+
+    tmp_path = f"{path}.tmp"
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    write_partitioned(table, name, tmp_path)
+    promote_dataset(tmp_path, path)
+    return path
+
+
+def read_clean_table(name: str, columns: list | None = None, filters=None,
+                     output_dir: str = CLEAN_PATH) -> pa.Table:
+    """
+    Read a clean-layer table; filters on partition columns prune whole
+    directories, filters on other columns use row-group statistics.
+    """
+    path = clean_table_path(name, output_dir)
+
+    if name in PARTITION_COLS and os.path.isdir(path):
+        schema = SCHEMAS[name]
+        partitioning = ds.partitioning(
+            pa.schema([schema.field(col) for col in PARTITION_COLS[name]]),
+            flavor="hive",
+        )
+        table = pq.read_table(path, columns=columns, filters=filters, partitioning=partitioning)
+        return table.select(columns or [col for col in schema.names if col in table.column_names])
+
+    # Single-file table (dimensions, or facts written before partitioning)
+    if not os.path.exists(path):
+        path = f"{path}.parquet"
+    return pq.read_table(path, columns=columns, filters=filters)
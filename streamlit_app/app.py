@@ -1,14 +1,22 @@
-import streamlit as st
-import duckdb
+import sys
 from pathlib import Path
-import pandas as pd
+import streamlit as st
 import altair as alt
 
+sys.path.append(str(Path(__file__).resolve().parents[1]))  # repo root (src.*)
+from streamlit_app.data_access import (  # noqa: E402
+    current_snapshot,
+    load_league_season_stats,
+    load_leagues,
+    load_seasons,
+)
+from src.load.utils_db import SnapshotNotFoundError  # noqa: E402
+
 # -----------------------------------------
-# Connect to DuckDB
+# Data access: cached, parameterized queries on the current snapshot
+# (DuckDB only runs when the filters or the snapshot change)
 # -----------------------------------------
-db_path = Path("data") / "analytics.duckdb"
-con = duckdb.connect(str(db_path))
+snapshot = current_snapshot()
 
 st.title("⚽ Global Football Analytics Dashboard")
 
@@ -17,12 +25,12 @@ st.title("⚽ Global Football Analytics Dashboard")
 # -----------------------------------------
 st.sidebar.header("Filters")
 
-# Load leagues
-leagues_df = con.execute("""
-    SELECT league_id, league_name, league_logo, country_flag
-    FROM dim_league
-    ORDER BY league_name
-""").df()
+# Load leagues (the first query: fails on a fresh checkout that was never loaded)
+try:
+    leagues_df = load_leagues(snapshot)
+except SnapshotNotFoundError as e:
+    st.error(str(e))
+    st.stop()
 
 selected_leagues = st.sidebar.multiselect(
     "Select Leagues",
@@ -30,17 +38,16 @@ selected_leagues = st.sidebar.multiselect(
     default=leagues_df["league_name"].tolist()[:3]
 )
 
-selected_league_ids = leagues_df[
+selected_league_ids = tuple(int(i) for i in leagues_df[
     leagues_df["league_name"].isin(selected_leagues)
-]["league_id"].tolist()
+]["league_id"])
+
+if not selected_league_ids:
+    st.info("Select at least one league.")
+    st.stop()
 
 # Load seasons for selected leagues
-seasons_df = con.execute(f"""
-    SELECT DISTINCT season_year
-    FROM fact_match
-    WHERE league_id IN ({','.join(map(str, selected_league_ids))})
-    ORDER BY season_year
-""").df()
+seasons_df = load_seasons(snapshot, selected_league_ids)
 
 selected_seasons = st.sidebar.multiselect(
     "Select Seasons",
@@ -48,34 +55,14 @@ selected_seasons = st.sidebar.multiselect(
     default=seasons_df["season_year"].tolist()[-3:]
 )
 
+if not selected_seasons:
+    st.info("Select at least one season.")
+    st.stop()
+
 # -----------------------------------------
 # Query aggregated data
 # -----------------------------------------
-query = f"""
-SELECT
-    m.season_year,
-    l.league_name,
-    l.league_logo,
-    l.country_flag,
-    SUM(m.goals_home) AS total_goals_home,
-    SUM(m.goals_away) AS total_goals_away,
-    SUM(m.goals_home + m.goals_away) AS total_goals,
-    AVG(m.goals_home) AS avg_goals_home,
-    AVG(m.goals_away) AS avg_goals_away,
-    AVG(m.goals_home + m.goals_away) AS avg_goals_per_match,
-    CASE 
-        WHEN AVG(m.goals_away) = 0 THEN NULL
-        ELSE AVG(m.goals_home) / AVG(m.goals_away)
-    END AS home_advantage_index
-FROM fact_match m
-LEFT JOIN dim_league l ON m.league_id = l.league_id
-WHERE m.league_id IN ({','.join(map(str, selected_league_ids))})
-  AND m.season_year IN ({','.join(map(str, selected_seasons))})
-GROUP BY m.season_year, l.league_name, l.league_logo, l.country_flag
-ORDER BY season_year, league_name;
-"""
-
-df = con.execute(query).df()
+df = load_league_season_stats(snapshot, selected_league_ids, tuple(int(s) for s in selected_seasons))
 
 # -----------------------------------------
 # Header with logos
@@ -0,0 +1,51 @@
+import streamlit as st
+from src.load.utils_db import get_connection_manager, get_db_path
+from streamlit_app.queries import LEAGUE_SEASON_STATS_SQL, LEAGUES_SQL, SEASONS_SQL
+
+# Cached results expire after this long, and immediately when a new snapshot is promoted
+CACHE_TTL_SECONDS = 600
+
+
+@st.cache_resource
+def connection_manager():
+    """One shared DuckDB instance per server process (not per session or rerun)."""
+    return get_connection_manager()
+
+
+def current_snapshot() -> str:
+    """
+    Path of the promoted snapshot.
+
+    Passed to every cached query so a new load (new snapshot) is a new
+    cache key: stale results are never served after a refresh.
+    """
+    return str(get_db_path())
+
+
+def run_query(snapshot: str, sql: str, params: dict | None = None):
+    cursor = connection_manager().cursor(snapshot)
+    try:
+        return cursor.execute(sql, params or {}).df()
+    finally:
+        cursor.close()
+
+
+# -------------------------
+# CACHED QUERIES (keyed on snapshot + filter values)
+# -------------------------
+@st.cache_data(ttl=CACHE_TTL_SECONDS, show_spinner=False)
+def load_leagues(snapshot: str):
+    return run_query(snapshot, LEAGUES_SQL)
+
+
+@st.cache_data(ttl=CACHE_TTL_SECONDS, show_spinner=False)
+def load_seasons(snapshot: str, league_ids: tuple):
+    return run_query(snapshot, SEASONS_SQL, {"league_ids": list(league_ids)})
+
+
+@st.cache_data(ttl=CACHE_TTL_SECONDS, show_spinner=False)
+def load_league_season_stats(snapshot: str, league_ids: tuple, seasons: tuple):
+    return run_query(snapshot, LEAGUE_SEASON_STATS_SQL, {
+        "league_ids": list(league_ids),
+        "seasons": list(seasons),
+    })
@@ -0,0 +1,36 @@
+"""
+Dashboard SQL (no Streamlit import, so benchmarks and notebooks can run it).
+"""
+
+LEAGUES_SQL = """
+    SELECT league_id, league_name, league_logo, country_flag
+    FROM dim_league
+    ORDER BY league_name
+"""
+
+# Both queries read the pre-aggregated mart (one row per league-season)
+SEASONS_SQL = """
+    SELECT DISTINCT season_year
+    FROM mart_league_season
+    WHERE league_id IN (SELECT unnest($league_ids))
+    ORDER BY season_year
+"""
+
+LEAGUE_SEASON_STATS_SQL = """
+    SELECT
+        season_year,
+        league_name,
+        league_logo,
+        country_flag,
+        total_goals_home,
+        total_goals_away,
+        total_goals,
+        avg_goals_home,
+        avg_goals_away,
+        avg_goals_per_match,
+        home_advantage_index
+    FROM mart_league_season
+    WHERE league_id IN (SELECT unnest($league_ids))
+      AND season_year IN (SELECT unnest($seasons))
+    ORDER BY season_year, league_name
+"""
@@ -0,0 +1,138 @@
+"""
+Local stand-in for API-Football, for tests that run the real APIClient.
+
+StubAPI serves synthetic payloads (benchmarks/synthetic.py) from an
+http.server on 127.0.0.1 and logs every request it receives; `script`
+lets a test queue canned answers (HTTP errors, API `errors` objects)
+ahead of the normal payloads. api_workspace writes a config/ whose
+api_base_url points at the stub.
+"""
+import json
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlparse
+import yaml
+from benchmarks.synthetic import (COUNTRIES, prepare_workspace, synthetic_fixtures, synthetic_league,
+                                  synthetic_page, synthetic_teams)
+
+TEAMS_PER_LEAGUE = 3
+PAGES_PER_TEAM = 2
+PLAYERS_PER_PAGE = 3
+
+
+def team_ids(league_id: int) -> list:
+    return [league_id * 100 + t for t in range(TEAMS_PER_LEAGUE)]
+
+
+def synthetic_payload(endpoint: str, params: dict) -> dict:
+    """The payload the stub answers for a request (seeded per request, so repeatable)."""
+    league_id = int(params.get("league") or params["id"])
+    season = int(params["season"])
+    rng = random.Random(f"{endpoint}:{sorted(params.items())}")
+    country = COUNTRIES[0]
+
+    if endpoint == "leagues":
+        return synthetic_league(rng, league_id, country, season, current=False)
+    if endpoint == "teams":
+        return synthetic_teams(rng, league_id, season, team_ids(league_id), country)
+    if endpoint == "fixtures":
+        return synthetic_fixtures(rng, league_id, season, team_ids(league_id), current=False)
+    if endpoint == "players":
+        return synthetic_page(rng, int(params["page"]), PLAYERS_PER_PAGE, int(params["team"]),
+                              league_id, season, pages=PAGES_PER_TEAM)
+    raise KeyError(endpoint)
+
+
+class StubAPI:
+    """
+    Threaded HTTP server answering /{endpoint}?{params} like API-Football.
+
+    - requests: (monotonic arrival time, endpoint, params) of every request
+    - script: queued (status, body, headers) answers, served before the
+      synthetic payloads; body may be a dict (sent as JSON) or a string
+    """
+
+    def __init__(self):
+        self.requests = []
+        self.script = []
+        self.lock = threading.Lock()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def request_keys(self) -> list:
+        """(endpoint, sorted params) of every request received, in arrival order."""
+        with self.lock:
+            return [(endpoint, tuple(sorted(params.items()))) for _, endpoint, params in self.requests]
+
+    def answer(self, endpoint: str, params: dict):
+        with self.lock:
+            self.requests.append((time.monotonic(), endpoint, params))
+            if self.script:
+                return self.script.pop(0)
+        return 200, synthetic_payload(endpoint, params), {}
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                url = urlparse(self.path)
+                status, body, headers = stub.answer(url.path.strip("/"), dict(parse_qsl(url.query)))
+
+                raw = (json.dumps(body) if isinstance(body, dict) else body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(raw)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(raw)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+def api_workspace(root: str, base_url: str, leagues: dict, seasons: list, **sections) -> str:
+    """
+    config/ for a workspace whose extractors talk to `base_url`.
+
+    `leagues` is {league_key: league_id}; `sections` override whole
+    settings.yaml sections (e.g. rate_limit={...}). The response cache is
+    off unless a `cache` section is passed.
+    """
+    prepare_workspace(root)
+    settings_path = os.path.join(root, "config", "settings.yaml")
+    with open(settings_path, "r") as f:
+        settings = yaml.safe_load(f)
+
+    settings["api_base_url"] = base_url
+    settings["seasons"] = list(seasons)
+    settings["cache"] = {"enabled": False}
+    settings.update(sections)
+
+    with open(settings_path, "w") as f:
+        yaml.safe_dump(settings, f, sort_keys=False)
+
+    league_meta = {key: {"league_id": league_id, "scope": "domestic", "region": "Europe"}
+                   for key, league_id in leagues.items()}
+    with open(os.path.join(root, "config", "leagues.yaml"), "w") as f:
+        yaml.safe_dump(league_meta, f, sort_keys=False)
+    return root
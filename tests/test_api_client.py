@@ -0,0 +1,121 @@
+"""
+APIClient retry / backoff / quota paths against a local stub of the API.
+
+Each test queues canned answers on tests/stub_api.py and checks what the
+client did with them. Sleeps and rate-limiter pauses are recorded instead
+of waited out, and every client gets its own token bucket and quota
+tracker (the shared ones are process-wide).
+"""
+import pytest
+from src.extract import api_client as api_client_module
+from src.extract.api_client import APIClient, APIError, QuotaExceededError
+from src.extract.rate_limiter import QuotaTracker, TokenBucket
+from tests.stub_api import StubAPI, api_workspace
+
+LEAGUES = {"stub_a": 901}
+PARAMS = {"league": 901, "season": 2023}
+
+
+@pytest.fixture
+def stub():
+    with StubAPI() as server:
+        yield server
+
+
+@pytest.fixture
+def client(stub, tmp_path, monkeypatch):
+    """APIClient on the stub: 3 retries, no real sleeping, recorded pauses."""
+    api_workspace(str(tmp_path), stub.base_url, LEAGUES, [2023],
+                  http={"max_retries": 3, "backoff_base_seconds": 1, "backoff_max_seconds": 8,
+                        "timeout_seconds": 5})
+    monkeypatch.setenv("API_KEY", "test")
+    client = APIClient(settings_path=str(tmp_path / "config" / "settings.yaml"))
+
+    client.rate_limiter = TokenBucket(rate=1000, capacity=1000)
+    client.quota = QuotaTracker()
+    client.sleeps = []
+    client.pauses = []
+    monkeypatch.setattr(api_client_module.time, "sleep", client.sleeps.append)
+    monkeypatch.setattr(client.rate_limiter, "pause", client.pauses.append)
+    return client
+
+
+@pytest.mark.parametrize("status", [429, 500, 502, 503, 504])
+def test_retryable_status_is_retried(stub, client, status):
+    stub.script = [(status, "busy", {}), (status, "busy", {})]
+
+    data = client.get("teams", PARAMS)
+
+    assert data["response"]
+    assert len(stub.requests) == 3
+    assert len(client.sleeps) == 2
+    # Full jitter: each delay within the exponential cap of its attempt
+    assert all(0 <= delay <= 2 ** attempt for attempt, delay in enumerate(client.sleeps))
+
+
+def test_retry_after_header_wins(stub, client):
+    stub.script = [(429, "slow down", {"Retry-After": "7"})]
+
+    client.get("teams", PARAMS)
+
+    assert client.sleeps == [7.0]
+
+
+def test_retries_exhausted_raise(stub, client):
+    stub.script = [(503, "down", {})] * 4
+
+    with pytest.raises(APIError):
+        client.get("teams", PARAMS)
+    assert len(stub.requests) == 4
+
+
+def test_non_retryable_status_raises_at_once(stub, client):
+    stub.script = [(404, "not found", {})]
+
+    with pytest.raises(APIError):
+        client.get("teams", PARAMS)
+    assert len(stub.requests) == 1
+    assert client.sleeps == []
+
+
+def test_rate_limit_error_pauses_and_continues(stub, client):
+    stub.script = [(200, {"errors": {"rateLimit": "Too many requests"}, "response": []}, {})]
+
+    data = client.get("teams", PARAMS)
+
+    assert data["response"]
+    assert client.pauses == [60]
+    assert len(stub.requests) == 2
+
+
+def test_minute_quota_header_pauses_the_bucket(stub, client):
+    stub.script = [(200, {"errors": [], "response": [{"team": {"id": 1}}]}, {"X-RateLimit-Remaining": "0"})]
+
+    client.get("teams", PARAMS)
+
+    assert client.pauses == [60]
+
+
+def test_daily_quota_error_raises(stub, client):
+    stub.script = [(200, {"errors": {"requests": "You have reached the request limit for the day"},
+                          "response": []}, {})]
+
+    with pytest.raises(QuotaExceededError):
+        client.get("teams", PARAMS)
+    assert client.quota.daily_exhausted()
+
+    # The next call stops before spending a request
+    with pytest.raises(QuotaExceededError):
+        client.get("teams", PARAMS)
+    assert len(stub.requests) == 1
+
+
+def test_daily_reserve_stops_before_the_limit(stub, client):
+    client.quota = QuotaTracker(daily_reserve=5)
+    stub.script = [(200, {"errors": [], "response": [{"team": {"id": 1}}]},
+                    {"x-ratelimit-requests-limit": "100", "x-ratelimit-requests-remaining": "5"})]
+
+    client.get("teams", PARAMS)
+    with pytest.raises(QuotaExceededError):
+        client.get("teams", PARAMS)
+    assert len(stub.requests) == 1
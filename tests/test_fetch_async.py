@@ -0,0 +1,98 @@
+"""
+AsyncExtractor against a local stub of the API (tests/stub_api.py).
+
+The real APIClient, token bucket, raw store and manifest run in a fresh
+process (they are process-wide and bound to the working directory) over
+several leagues and seasons; the stub logs what actually hit the wire.
+"""
+import asyncio
+import os
+from collections import Counter
+import pytest
+from benchmarks.bench_pipeline import in_fresh_process
+from tests.stub_api import PAGES_PER_TEAM, StubAPI, api_workspace, team_ids
+
+LEAGUES = {"stub_a": 901, "stub_b": 902}
+SEASONS = [2022, 2023]
+REQUESTS_PER_MINUTE = 1200  # 20 requests/s: fast enough for a test, slow enough to measure
+BURST = 1
+
+
+def run_extraction(root: str) -> list:
+    """Extract every league and season into `root`; returns the manifest keys stored."""
+    from src.extract.fetch_async import run_async_extraction
+    from src.extract.manifest import RAW_DIRS, get_manifest
+
+    os.chdir(root)
+    os.environ.setdefault("API_KEY", "test")
+    asyncio.run(run_async_extraction(list(LEAGUES), SEASONS, force_update=False, only=None))
+
+    manifest = get_manifest()
+    return [(endpoint, e["league_key"], e["season"], e["team_id"], e["page"])
+            for endpoint in RAW_DIRS for e in manifest.entries(endpoint)]
+
+
+def expected_requests() -> list:
+    keys = []
+    for league_id in LEAGUES.values():
+        for season in SEASONS:
+            keys.append(("leagues", (("id", str(league_id)), ("season", str(season)))))
+            keys.append(("fixtures", (("league", str(league_id)), ("season", str(season)))))
+            keys.append(("teams", (("league", str(league_id)), ("season", str(season)))))
+            for team_id in team_ids(league_id):
+                for page in range(1, PAGES_PER_TEAM + 1):
+                    keys.append(("players", tuple(sorted({
+                        "league": str(league_id), "team": str(team_id),
+                        "season": str(season), "page": str(page),
+                    }.items()))))
+    return keys
+
+
+def expected_entries() -> list:
+    entries = []
+    for league_key, league_id in LEAGUES.items():
+        for season in SEASONS:
+            entries += [(endpoint, league_key, season, 0, 0) for endpoint in ("leagues", "fixtures", "teams")]
+            entries += [("players", league_key, season, team_id, page)
+                        for team_id in team_ids(league_id) for page in range(1, PAGES_PER_TEAM + 1)]
+    return entries
+
+
+@pytest.fixture(scope="module")
+def extraction(tmp_path_factory):
+    root = str(tmp_path_factory.mktemp("extract"))
+    with StubAPI() as stub:
+        api_workspace(root, stub.base_url, LEAGUES, SEASONS,
+                      rate_limit={"requests_per_minute": REQUESTS_PER_MINUTE, "burst": BURST,
+                                  "max_concurrency": 4, "daily_reserve": 0})
+        stored = in_fresh_process(run_extraction, root)
+    return stub, stored
+
+
+def test_every_page_requested_exactly_once(extraction):
+    stub, _ = extraction
+    received = Counter(stub.request_keys())
+
+    assert sorted(received) == sorted(expected_requests())
+    assert set(received.values()) == {1}
+
+
+def test_every_page_stored_exactly_once(extraction):
+    _, stored = extraction
+
+    assert sorted(stored) == sorted(expected_entries())
+
+
+def test_request_rate_within_limit(extraction):
+    stub, _ = extraction
+    rate = REQUESTS_PER_MINUTE / 60
+    arrivals = sorted(arrived for arrived, _, _ in stub.requests)
+
+    # Token bucket: any window of w seconds holds at most burst + rate * w requests
+    # (one extra for the jitter between leaving the bucket and reaching the server)
+    window = 1.0
+    for i, start in enumerate(arrivals):
+        in_window = sum(1 for t in arrivals[i:] if t < start + window)
+        assert in_window <= BURST + rate * window + 1
+
+    assert arrivals[-1] - arrivals[0] >= (len(arrivals) - BURST) / rate * 0.9
@@ -0,0 +1,83 @@
+"""
+Partial rewrites of partitioned facts (write_clean_table with `partitions`).
+
+Only the league_id=/season_year= directories named in `partitions` may
+change; every other partition file must stay byte-identical.
+"""
+import os
+import pyarrow as pa
+import pytest
+from src.transform.schemas import build_table
+from src.transform.utils_parquet import clean_table_path, read_clean_table, write_clean_table
+
+PARTITIONS = [(140, 2022), (140, 2023), (39, 2023)]
+
+
+def matches(partitions: list, referee: str) -> pa.Table:
+    """Two fact_match rows per partition, fixture ids unique across partitions."""
+    columns = {"fixture_id": [], "league_id": [], "season_year": [], "referee": []}
+    for n, (league_id, season) in enumerate(partitions):
+        for i in range(2):
+            columns["fixture_id"].append(league_id * 100_000 + season * 10 + n * 2 + i)
+            columns["league_id"].append(league_id)
+            columns["season_year"].append(season)
+            columns["referee"].append(referee)
+    return build_table(columns, "fact_match")
+
+
+def snapshot(path: str) -> dict:
+    """{partition directory: {file name: bytes}} of a dataset."""
+    files = {}
+    for dirpath, _, names in os.walk(path):
+        for name in names:
+            partition = os.path.relpath(dirpath, path)
+            with open(os.path.join(dirpath, name), "rb") as f:
+                files.setdefault(partition, {})[name] = f.read()
+    return files
+
+
+def partition_dir(league_id: int, season: int) -> str:
+    return os.path.join(f"league_id={league_id}", f"season_year={season}")
+
+
+@pytest.fixture
+def dataset(tmp_path):
+    output_dir = str(tmp_path)
+    write_clean_table(matches(PARTITIONS, "before"), "fact_match", output_dir)
+    return output_dir
+
+
+def test_partial_rewrite_touches_only_its_partitions(dataset):
+    path = clean_table_path("fact_match", dataset)
+    before = snapshot(path)
+    touched = (140, 2023)
+
+    write_clean_table(matches(PARTITIONS, "after"), "fact_match", dataset, partitions={touched})
+
+    after = snapshot(path)
+    assert set(after) == set(before)
+    for key in PARTITIONS:
+        if key == touched:
+            continue
+        assert after[partition_dir(*key)] == before[partition_dir(*key)]
+
+    table = read_clean_table("fact_match", output_dir=dataset)
+    referees = {(league_id, season): referee for league_id, season, referee in zip(
+        table.column("league_id").to_pylist(), table.column("season_year").to_pylist(),
+        table.column("referee").to_pylist())}
+    assert referees == {(140, 2022): "before", (140, 2023): "after", (39, 2023): "before"}
+    assert table.num_rows == 2 * len(PARTITIONS)
+
+
+def test_partial_rewrite_drops_emptied_partitions(dataset):
+    path = clean_table_path("fact_match", dataset)
+    before = snapshot(path)
+    emptied = (39, 2023)
+
+    remaining = [key for key in PARTITIONS if key != emptied]
+    write_clean_table(matches(remaining, "after"), "fact_match", dataset, partitions={emptied})
+
+    after = snapshot(path)
+    assert partition_dir(*emptied) not in after
+    for key in remaining:
+        assert after[partition_dir(*key)] == before[partition_dir(*key)]